@@ -0,0 +1,85 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable
+
+
+def document(size: int) -> "dict[str, Any]":
+    return {
+        "project": {
+            "name": "meles",
+            "version": "1.2.3",
+            "items": [
+                {"id": i, "name": f"item-{i}", "tags": ["a", "b", "c"]}
+                for i in range(size)
+            ],
+        }
+    }
+
+
+def _to_toml(document: "dict[str, Any]") -> str:
+    lines = [
+        "[project]",
+        f'name = "{document["project"]["name"]}"',
+        f'version = "{document["project"]["version"]}"',
+    ]
+    for item in document["project"]["items"]:
+        lines += [
+            "[[project.items]]",
+            f"id = {item['id']}",
+            f'name = "{item["name"]}"',
+            'tags = ["a", "b", "c"]',
+        ]
+    return "\n".join(lines)
+
+
+def _to_xml(document: "dict[str, Any]") -> str:
+    items = "".join(
+        f"<item id=\"{item['id']}\"><name>{item['name']}</name></item>"
+        for item in document["project"]["items"]
+    )
+    return (
+        f"<project><name>{document['project']['name']}</name>"
+        f"<version>{document['project']['version']}</version>{items}</project>"
+    )
+
+
+def _to_yaml(document: "dict[str, Any]") -> str:
+    lines = [
+        "project:",
+        f"  name: {document['project']['name']}",
+        f"  version: \"{document['project']['version']}\"",
+        "  items:",
+    ]
+    for item in document["project"]["items"]:
+        lines += [f"    - id: {item['id']}", f"      name: {item['name']}"]
+    return "\n".join(lines)
+
+
+FORMATS: "dict[str, tuple[str, Callable[[dict[str, Any]], str], str]]" = {
+    "json": ("application/json", json.dumps, "$.project.version"),
+    "yaml": ("application/x-yaml", _to_yaml, "$.project.version"),
+    "toml": ("application/toml", _to_toml, "$.project.version"),
+    "xml": ("text/xml", _to_xml, "./version"),
+}
+SIZES: "dict[str, int]" = {"small": 10, "large": 5000}
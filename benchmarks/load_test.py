@@ -0,0 +1,421 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import json
+import logging
+import os
+import random
+import sys
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from statistics import quantiles
+from threading import Event, Lock, Thread
+from time import monotonic, perf_counter, sleep
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import urlopen
+from urllib.error import HTTPError
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+os.environ.setdefault("MELES_ENVIRONMENT", "PRODUCTION")
+
+from meles.app import get_app  # noqa: E402
+from meles.core import LOGGER_NAME, SharedMetrics, Url, config  # noqa: E402
+from meles.family.nuget import NugetFamily  # noqa: E402
+from meles.family.shield import ShieldFamily  # noqa: E402
+
+from _payloads import FORMATS, document  # noqa: E402
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable
+
+
+class _UpstreamStats:
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.calls: "Counter[str]" = Counter()
+
+    def count(self, kind: str) -> None:
+        with self.__lock:
+            self.calls[kind] += 1
+
+
+class _UpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        routes: "Callable[[str, str], tuple[str, str, bytes] | None]",
+        stats: "_UpstreamStats",
+        latency: float,
+        error_rate: float,
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), _UpstreamRequestHandler)
+        self.routes = routes
+        self.stats = stats
+        self.latency = latency
+        self.error_rate = error_rate
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def start(self) -> None:
+        Thread(target=self.serve_forever, daemon=True).start()
+
+
+class _UpstreamRequestHandler(BaseHTTPRequestHandler):
+    server: "_UpstreamServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        if self.server.latency > 0:
+            sleep(self.server.latency)
+
+        routed = self.server.routes(url.path, url.query)
+        if routed is None:
+            self.server.stats.count("not_found")
+            self.send_error(404)
+            return
+
+        kind, content_type, body = routed
+        self.server.stats.count(kind)
+        if random.random() < self.server.error_rate:
+            self.server.stats.count("injected_error")
+            self.send_error(503)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: "Any") -> None:
+        pass
+
+
+class _FakeNugetFeed:
+    def __init__(self, versions: int) -> None:
+        self.base_url = ""
+        self.__versions = [f"{v // 10}.{v % 10}.0" for v in range(1, versions + 1)]
+
+    def __call__(self, path: str, query: str) -> "tuple[str, str, bytes] | None":
+        if path == "/v3/index.json":
+            return (
+                "service_index",
+                "application/json",
+                self.__json(
+                    {
+                        "resources": [
+                            {
+                                "@id": self.base_url + "flat/",
+                                "@type": "PackageBaseAddress/3.0.0",
+                            },
+                            {
+                                "@id": self.base_url + "query",
+                                "@type": "SearchQueryService",
+                            },
+                        ]
+                    }
+                ),
+            )
+
+        if path.startswith("/flat/") and path.endswith("/index.json"):
+            return (
+                "flat_container",
+                "application/json",
+                self.__json({"versions": self.__versions}),
+            )
+
+        if path == "/query":
+            names = [
+                name.removeprefix("packageid:")
+                for name in parse_qs(query)["q"][0].split(" ")
+            ]
+            return (
+                "search",
+                "application/json",
+                self.__json(
+                    {
+                        "totalHits": len(names),
+                        "data": [
+                            {
+                                "id": name,
+                                "versions": [
+                                    {"version": version, "downloads": 10}
+                                    for version in self.__versions
+                                ],
+                            }
+                            for name in names
+                        ],
+                    }
+                ),
+            )
+
+        return None
+
+    @staticmethod
+    def __json(content: "Any") -> bytes:
+        return json.dumps(content).encode("utf-8")
+
+
+class _FakeDocuments:
+    def __init__(self, size: int) -> None:
+        self.__documents: "dict[str, tuple[str, bytes]]" = {
+            f"/document.{name}": (content_type, convert(document(size)).encode())
+            for name, (content_type, convert, _) in FORMATS.items()
+        }
+
+    def __call__(self, path: str, _: str) -> "tuple[str, str, bytes] | None":
+        if path not in self.__documents:
+            return None
+        content_type, body = self.__documents[path]
+        return "document", content_type, body
+
+
+class _LoadTestConfig:
+    def __init__(self, feed_url: str) -> None:
+        self.__feed_url = feed_url
+
+    def setup(self, app: "Any") -> bool:
+        app.add_family(NugetFamily(Url.static(self.__feed_url).source))
+        app.add_family(ShieldFamily())
+        return True
+
+    def __getattr__(self, name: str) -> "Any":
+        if name == "dynamic":
+            return self
+        return getattr(config, name)
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, *_: "Any") -> None:
+        pass
+
+
+def _start_meles(feed_url: str) -> str:
+    app = get_app(_LoadTestConfig(feed_url))  # type: ignore
+    for handler in logging.getLogger(LOGGER_NAME).handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(open(os.devnull, "w"))  # noqa: SIM115
+    server = make_server(
+        "127.0.0.1",
+        0,
+        app,
+        server_class=_ThreadingWSGIServer,
+        handler_class=_QuietWSGIRequestHandler,
+    )
+    Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _create_workload(
+    documents_url: str, packages: int, cache_seconds: "int | None"
+) -> "Callable[[], str]":
+    paths: "list[str]" = []
+    for index in range(packages):
+        for route in ("v", "vpre", "dt"):
+            paths.append(f"/nuget/{route}/Package.{index}?")
+    for name, (_, _, query) in FORMATS.items():
+        paths.append(
+            f"/dynamic/{name}?"
+            + urlencode({"url": f"{documents_url}document.{name}", "query": query})
+        )
+    if cache_seconds is not None:
+        paths = [f"{path}&cacheSeconds={cache_seconds}" for path in paths]
+
+    # Popular badges are requested far more often than the long tail.
+    weights = [1.0 / (rank + 1) for rank in range(len(paths))]
+    random.shuffle(paths)
+    return lambda: random.choices(paths, weights)[0]
+
+
+class _Results:
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.latencies: "list[float]" = []
+        self.statuses: "Counter[int]" = Counter()
+
+    def record(self, latency: float, status: int) -> None:
+        with self.__lock:
+            self.latencies.append(latency)
+            self.statuses[status] += 1
+
+
+def _request(base_url: str, path: str, results: "_Results") -> None:
+    started = perf_counter()
+    try:
+        with urlopen(base_url + path, timeout=30) as response:
+            response.read()
+            status = response.status
+    except HTTPError as exc:
+        status = exc.code
+    results.record(perf_counter() - started, status)
+
+
+def _run_closed(
+    base_url: str,
+    next_path: "Callable[[], str]",
+    concurrency: int,
+    duration: float,
+    results: "_Results",
+) -> None:
+    deadline = monotonic() + duration
+
+    def _worker() -> None:
+        while monotonic() < deadline:
+            _request(base_url, next_path(), results)
+
+    workers = [Thread(target=_worker) for _ in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def _run_open(
+    base_url: str,
+    next_path: "Callable[[], str]",
+    concurrency: int,
+    duration: float,
+    rate: float,
+    results: "_Results",
+) -> None:
+    stopped = Event()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = monotonic()
+        sent = 0
+        while not stopped.is_set():
+            elapsed = monotonic() - started
+            if elapsed >= duration:
+                break
+            due = int(elapsed * rate) - sent
+            for _ in range(due):
+                executor.submit(_request, base_url, next_path(), results)
+            sent += max(due, 0)
+            stopped.wait(1.0 / rate if rate > 0 else 0.01)
+
+
+def _cache_hit_ratio() -> "float | None":
+    hits = misses = 0.0
+    for metric in SharedMetrics.registry.collect():
+        for sample in metric.samples:
+            if sample.name != "meles_badge_cache_requests_total":
+                continue
+            if sample.labels["result"] == "hit":
+                hits += sample.value
+            elif sample.labels["result"] == "miss":
+                misses += sample.value
+    return hits / (hits + misses) if hits + misses else None
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Runs meles against local fake upstreams")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--model",
+        choices=("closed", "open"),
+        default="closed",
+        help="closed: each client waits for its response before sending the next "
+        "request, open: requests are sent at a fixed --rate",
+    )
+    parser.add_argument("--rate", type=float, default=100.0, help="Requests/s")
+    parser.add_argument(
+        "--target",
+        help="Base URL of an already running meles instance that is configured "
+        "for the fake feed, which is then printed on start-up",
+    )
+    parser.add_argument("--packages", type=int, default=50)
+    parser.add_argument("--versions", type=int, default=100)
+    parser.add_argument("--document-size", type=int, default=100)
+    parser.add_argument("--cache-seconds", type=int, help="cacheSeconds of badges")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Upstream latency in seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of failing upstream calls"
+    )
+    parser.add_argument("--output", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    stats = _UpstreamStats()
+    feed = _FakeNugetFeed(args.versions)
+    nuget = _UpstreamServer(feed, stats, args.latency, args.error_rate)
+    feed.base_url = nuget.base_url
+    documents = _UpstreamServer(
+        _FakeDocuments(args.document_size), stats, args.latency, args.error_rate
+    )
+    nuget.start()
+    documents.start()
+
+    feed_url = nuget.base_url + "v3/index.json"
+    base_url: str = args.target or _start_meles(feed_url)
+    if args.target:
+        sys.stderr.write(f"Fake NuGet feed: {feed_url}\n")
+
+    results = _Results()
+    next_path = _create_workload(documents.base_url, args.packages, args.cache_seconds)
+    started = monotonic()
+    if args.model == "closed":
+        _run_closed(base_url, next_path, args.concurrency, args.duration, results)
+    else:
+        _run_open(
+            base_url, next_path, args.concurrency, args.duration, args.rate, results
+        )
+    elapsed = monotonic() - started
+
+    latencies = sorted(results.latencies)
+    percentiles = quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    report: "dict[str, Any]" = {
+        "model": args.model,
+        "concurrency": args.concurrency,
+        "duration_seconds": elapsed,
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_seconds": {
+            "p50": percentiles[49],
+            "p90": percentiles[89],
+            "p99": percentiles[98],
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "statuses": {str(k): v for k, v in sorted(results.statuses.items())},
+        "cache_hit_ratio": None if args.target else _cache_hit_ratio(),
+        "upstream_calls": dict(stats.calls),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n", "utf-8")
+    else:
+        sys.stdout.write(output + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import json
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from timeit import Timer
+from typing import TYPE_CHECKING
+
+from meles.sources.nuget import NuGetV3PackageSearch, NuGetV3SearchResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable
+
+
+def _synthetic_payload(hits: int, versions: int) -> "dict[str, Any]":
+    # Mirrors the shape of https://azuresearch-usnc.nuget.org/query?q=json&take=20
+    def _hit(i: int) -> "dict[str, Any]":
+        package_id = f"Sample.Package{i}"
+        return {
+            "@id": f"https://api.nuget.org/v3/registration5-gz-semver2/{package_id.lower()}/index.json",
+            "@type": "Package",
+            "registration": f"https://api.nuget.org/v3/registration5-gz-semver2/{package_id.lower()}/index.json",
+            "id": package_id,
+            "version": f"{versions}.0.0",
+            "description": "A package used to measure the cost of parsing search responses. "
+            * 4,
+            "summary": "",
+            "title": package_id,
+            "iconUrl": f"https://api.nuget.org/v3-flatcontainer/{package_id.lower()}/icon",
+            "licenseUrl": "https://licenses.nuget.org/MIT",
+            "projectUrl": "https://example.org/",
+            "tags": ["json", "serialization", "benchmark", "sample"],
+            "authors": ["meles"],
+            "owners": ["meles"],
+            "totalDownloads": versions * 1000,
+            "verified": True,
+            "packageTypes": [{"name": "Dependency"}],
+            "versions": [
+                {
+                    "version": f"{v}.0.0",
+                    "downloads": v * 10,
+                    "@id": f"https://api.nuget.org/v3/registration5-gz-semver2/{package_id.lower()}/{v}.0.0.json",
+                }
+                for v in range(1, versions + 1)
+            ],
+            "vulnerabilities": [],
+        }
+
+    return {"totalHits": hits, "data": [_hit(i) for i in range(hits)]}
+
+
+def _full(payload: "dict[str, Any]", package_id: str) -> "list[tuple[str, int]]":
+    response = NuGetV3SearchResponse.parse(payload)
+    assert response is not None
+    return [
+        (v.version, v.downloads)
+        for p in response.data
+        if p.id == package_id
+        for v in p.versions
+    ]
+
+
+def _lean(payload: "dict[str, Any]", package_id: str) -> "list[tuple[str, int]]":
+    record = NuGetV3PackageSearch.parse(payload, [package_id]).find(package_id)
+    return [] if record is None else [(v.version, v.downloads) for v in record.versions]
+
+
+def _measure(
+    func: "Callable[[dict[str, Any], str], Any]",
+    payload: "dict[str, Any]",
+    package_id: str,
+    number: int,
+) -> "dict[str, float]":
+    timer = Timer(lambda: func(payload, package_id))
+    best = min(timer.repeat(repeat=5, number=number)) / number
+
+    tracemalloc.start()
+    func(payload, package_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": float(peak)}
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Compares full and lean NuGet search parsing")
+    parser.add_argument(
+        "--payload", type=Path, help="Search response recorded from a real feed"
+    )
+    parser.add_argument(
+        "--package", default="Sample.Package0", help="Package id to resolve"
+    )
+    parser.add_argument("--hits", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=300)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    payload: "dict[str, Any]" = (
+        json.loads(args.payload.read_text("utf-8"))
+        if args.payload is not None
+        else _synthetic_payload(args.hits, args.versions)
+    )
+
+    assert _full(payload, args.package) == _lean(payload, args.package)
+
+    results = {
+        "full": _measure(_full, payload, args.package, args.number),
+        "lean": _measure(_lean, payload, args.package, args.number),
+    }
+    results["ratio"] = {
+        k: results["lean"][k] / results["full"][k] if results["full"][k] else 0.0
+        for k in results["full"]
+    }
+
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import json
+import logging
+import os
+import platform
+import sys
+from argparse import ArgumentParser
+from importlib.metadata import version
+from itertools import count
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlparse
+
+os.environ.setdefault("MELES_ENVIRONMENT", "PRODUCTION")
+
+from falcon.testing import TestClient  # noqa: E402
+
+from meles.app import get_app  # noqa: E402
+from meles.core import LOGGER_NAME, RequestHandler, Response  # noqa: E402
+from meles.sources.nuget import SharedSearchBatcher  # noqa: E402
+
+from _payloads import FORMATS, SIZES, document  # noqa: E402
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable
+
+    from meles.core import Request
+
+_FEED = "https://api.nuget.org/v3/index.json"
+_FLAT_CONTAINER = "https://api.nuget.org/v3-flatcontainer/"
+_SEARCH = "https://azuresearch-usnc.nuget.org/query"
+_DOCUMENTS = "https://documents.test/"
+
+
+def _response(url: str, content_type: str, body: "str | bytes") -> "Response":
+    data = body.encode("utf-8") if isinstance(body, str) else body
+    return Response(url, {"Content-Type": content_type}, 200, data)
+
+
+class _CannedRequestHandler(RequestHandler):
+    documents: "dict[str, tuple[str, bytes]]" = {}
+
+    def handle_request(self, request: "Request") -> "Response":
+        url = str(request.url)
+        if url == _FEED:
+            return _response(
+                url,
+                "application/json",
+                json.dumps(
+                    {
+                        "resources": [
+                            {
+                                "@id": _FLAT_CONTAINER,
+                                "@type": "PackageBaseAddress/3.0.0",
+                            },
+                            {"@id": _SEARCH, "@type": "SearchQueryService"},
+                        ]
+                    }
+                ),
+            )
+
+        if url.startswith(_FLAT_CONTAINER):
+            return _response(
+                url,
+                "application/json",
+                json.dumps(
+                    {"versions": [f"{v}.0.{p}" for v in range(30) for p in range(10)]}
+                ),
+            )
+
+        if url.startswith(_SEARCH):
+            query = parse_qs(urlparse(url).query)["q"][0]
+            names = [name.removeprefix("packageid:") for name in query.split(" ")]
+            return _response(
+                url,
+                "application/json",
+                json.dumps(
+                    {
+                        "totalHits": len(names),
+                        "data": [
+                            {
+                                "id": name,
+                                "versions": [
+                                    {"version": f"{v}.0.0", "downloads": v * 10}
+                                    for v in range(1, 300)
+                                ],
+                            }
+                            for name in names
+                        ],
+                    }
+                ),
+            )
+
+        content_type, body = self.documents[url.split("?")[0]]
+        return _response(url, content_type, body)
+
+
+def _prepare_documents() -> None:
+    for name, (content_type, convert, _) in FORMATS.items():
+        for size_name, size in SIZES.items():
+            _CannedRequestHandler.documents[f"{_DOCUMENTS}{size_name}.{name}"] = (
+                content_type,
+                convert(document(size)).encode("utf-8"),
+            )
+
+
+def _cases() -> "dict[str, Callable[[int], tuple[str, dict[str, str]]]]":
+    cases: "dict[str, Callable[[int], tuple[str, dict[str, str]]]]" = {
+        "badge_hit": lambda _: ("/badge/build-passing-green", {}),
+        "badge_miss": lambda i: (f"/badge/build-{i}-green", {}),
+        "nuget_version": lambda i: (f"/nuget/v/Package.{i}", {}),
+        "nuget_downloads": lambda i: (f"/nuget/dt/Package.{i}", {}),
+    }
+    for name, (_, _, query) in FORMATS.items():
+        for size_name in SIZES:
+            cases[
+                f"dynamic_{name}_{size_name}"
+            ] = lambda i, name=name, size_name=size_name, query=query: (
+                f"/dynamic/{name}",
+                {
+                    "url": f"{_DOCUMENTS}{size_name}.{name}?run={i}",
+                    "query": query,
+                    "label": "version",
+                },
+            )
+    return cases
+
+
+def _run(
+    client: "TestClient",
+    request: "Callable[[int], tuple[str, dict[str, str]]]",
+    iterations: int,
+    numbers: "count[int]",
+) -> "dict[str, float]":
+    timings: "list[float]" = []
+    for _ in range(iterations):
+        path, params = request(next(numbers))
+        started = perf_counter()
+        result = client.simulate_get(path, params=params)
+        timings.append(perf_counter() - started)
+        if result.status_code != 200:
+            raise RuntimeError(f"{path} returned {result.status}: {result.text}")
+
+    percentiles = quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+    return {
+        "iterations": float(iterations),
+        "mean_seconds": mean(timings),
+        "p50_seconds": percentiles[49],
+        "p95_seconds": percentiles[94],
+        "requests_per_second": iterations / sum(timings),
+    }
+
+
+def _set_logging(enabled: bool) -> None:
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.disabled = not enabled
+
+
+def main() -> int:
+    cases = _cases()
+    parser = ArgumentParser(description="Measures the request hot paths of meles")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--case", action="append", choices=sorted(cases))
+    parser.add_argument("--output", type=Path, help="Write results to this file")
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=0.0,
+        help="Window of the NuGet search batcher in seconds",
+    )
+    args = parser.parse_args()
+
+    _prepare_documents()
+    app = get_app(request_handler_factory=_CannedRequestHandler)
+    for handler in logging.getLogger(LOGGER_NAME).handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(open(os.devnull, "w"))  # noqa: SIM115
+    SharedSearchBatcher.window = args.batch_window
+    client = TestClient(app)
+    numbers: "count[int]" = count()
+
+    results: "dict[str, Any]" = {
+        "meta": {
+            "meles": version("meles"),
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+        },
+        "cases": {},
+    }
+    for name in args.case or sorted(cases):
+        _run(client, cases[name], min(args.iterations, 10), numbers)
+        results["cases"][name] = _run(client, cases[name], args.iterations, numbers)
+
+    _set_logging(False)
+    results["cases"]["badge_miss_without_logging"] = _run(
+        client, cases["badge_miss"], args.iterations, numbers
+    )
+    _set_logging(True)
+
+    output = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n", "utf-8")
+    else:
+        sys.stdout.write(output + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,13 +18,16 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 import logging
+import sys
+from argparse import ArgumentParser
 from typing import TYPE_CHECKING
 from wsgiref.simple_server import WSGIRequestHandler, make_server
 
 from .app import get_app
-from .core import LOGGER_NAME, config, setup_logger
+from .core import LOGGER_NAME, config, measure_startup, setup_logger
 
 if TYPE_CHECKING:  # pragma: no cover
+    from argparse import Namespace
     from typing import Any
 
 
@@ -39,7 +42,21 @@ class _StructuredLoggingWSGIRequestHandler(WSGIRequestHandler):
         )
 
 
+def _parse_arguments() -> "Namespace":
+    parser = ArgumentParser(prog="meles")
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="Print the time spent importing modules and creating the app and exit",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    if _parse_arguments().startup_report:
+        print(measure_startup().format())
+        sys.exit(0)
+
     setup_logger(config.env.is_development)
     logger = logging.getLogger(LOGGER_NAME)
     if config.env.is_development:
@@ -25,35 +25,58 @@ from falcon.inspect import inspect_routes  # type: ignore
 from falcon_caching import Cache  # type: ignore
 
 from .core import (
+    AdmissionController,
+    AdmissionMiddleware,
+    CacheMemoryAccount,
+    CacheSnapshot,
+    ClientRateLimitMiddleware,
+    DeadlineMiddleware,
     Generator,
     HasConfigItems,
     LogRecordingMiddleware,
+    RateLimiter,
     RequestHandler,
     RequestIDMiddleware,
     SharedCache,
+    SharedMemoryAccountant,
+    SharedRefreshScheduler,
+    SharedUpstreamCache,
+    SharedUpstreamRateLimiter,
     SupportsFalconGetRequest,
     SupportsResourceGeneration,
     Urllib3RequestHandler,
     config,
+    get_multiprocess_directory,
+    register_process_cleanup,
     setup_logger,
 )
 from .resources import (
     AllResources,
     HealthResource,
+    MemoryResource,
+    ProfileResource,
     PrometheusMiddleware,
+    RequestProfiler,
     SystemResource,
 )
 
 if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any
+
     from typing_extensions import Iterator
 
 
 class _MelesApp(App):
     __resources: "list[SupportsFalconGetRequest]" = []
     __cache: "Cache" = SharedCache
+    __config: "HasConfigItems | None" = None
     __generator_factory: "type[Generator]" = Generator
     __request_handler_factory: "type[RequestHandler]" = Urllib3RequestHandler
 
+    def __init__(self, *args: "Any", **kwargs: "Any") -> None:
+        super().__init__(*args, **kwargs)
+        self.__resources = []
+
     @property
     def cache(self) -> "Cache":
         return self.__cache
@@ -62,6 +85,14 @@ class _MelesApp(App):
     def cache(self, cache: "Cache") -> None:
         self.__cache = cache
 
+    @property
+    def config(self) -> "HasConfigItems | None":
+        return self.__config
+
+    @config.setter
+    def config(self, cfg: "HasConfigItems | None") -> None:
+        self.__config = cfg
+
     @property
     def request_handler_factory(self) -> "type[RequestHandler]":
         return self.__request_handler_factory
@@ -86,7 +117,10 @@ class _MelesApp(App):
 
     def add_family(self, family: "SupportsResourceGeneration") -> None:
         for resource in family.get_resources(
-            self.cache, self.generator_factory, self.request_handler_factory
+            self.cache,
+            self.generator_factory,
+            self.request_handler_factory,
+            self.config,
         ):
             self.add_resource(resource)
 
@@ -101,10 +135,39 @@ def get_app(
     generator_factory: "type[Generator]" = Generator,
     request_handler_factory: "type[RequestHandler]" = Urllib3RequestHandler,
 ) -> _MelesApp:
+    # Read the environment once; the app only uses the snapshot taken here.
+    cfg.reload()
     setup_logger(cfg.env.is_development)
     prom: "PrometheusMiddleware" = PrometheusMiddleware()
-    app = _MelesApp(middleware=[RequestIDMiddleware(), LogRecordingMiddleware(), prom])
+    middleware: "list[Any]" = [RequestIDMiddleware()]
+    if cfg.deadline.seconds > 0 or cfg.deadline.header is not None:
+        middleware.append(DeadlineMiddleware(cfg.deadline.seconds, cfg.deadline.header))
+    if cfg.admission.max_in_flight > 0:
+        middleware.append(
+            AdmissionMiddleware(AdmissionController(cfg.admission.max_in_flight))
+        )
+    rate_limit_store: "Cache | None" = (
+        cache if cfg.rate_limit.store == "cache" else None
+    )
+    SharedUpstreamRateLimiter.configure(
+        cfg.rate_limit.upstream_rate, cfg.rate_limit.upstream_burst, rate_limit_store
+    )
+    SharedUpstreamCache.configure(cfg.upstream_cache.max_entries)
+    if cfg.rate_limit.client_rate > 0:
+        client_limiter = RateLimiter("client")
+        client_limiter.configure(
+            cfg.rate_limit.client_rate, cfg.rate_limit.client_burst, rate_limit_store
+        )
+        middleware.append(
+            ClientRateLimitMiddleware(
+                client_limiter,
+                cfg.rate_limit.client_header,
+                cfg.rate_limit.client_trusted_hops,
+            )
+        )
+    app = _MelesApp(middleware=[*middleware, LogRecordingMiddleware(), prom])
     app.cache = cache
+    app.config = cfg
     app.generator_factory = generator_factory
     app.request_handler_factory = request_handler_factory
 
@@ -116,6 +179,8 @@ def get_app(
 
     if cfg.env.use_prometheus:
         app.add_route("/metrics", prom)
+        if get_multiprocess_directory() is not None:
+            register_process_cleanup()
 
     if cfg.env.use_health_check:
         app.add_route("/health", HealthResource())
@@ -125,8 +190,27 @@ def get_app(
 
     app.add_route("/system", SystemResource(_get_routes))
 
+    if cfg.debug.token:
+        profiler: "RequestProfiler" = RequestProfiler()
+        app.add_middleware(profiler)
+        app.add_route("/debug/profile", ProfileResource(cfg.debug, profiler))
+        app.add_route("/debug/memory", MemoryResource(cfg.debug, cfg.memory))
+
     res_folder: "Path" = Path(__file__).absolute().parent / "_res"
 
     app.add_static_route("/", res_folder)
 
+    if cfg.snapshot.path is not None:
+        snapshot = CacheSnapshot(cfg.snapshot.path)
+        snapshot.load(cache)
+        snapshot.start(cache, cfg.snapshot.interval)
+
+    cache_account: "CacheMemoryAccount" = CacheMemoryAccount(cache)
+    if cache_account.is_supported:
+        SharedMemoryAccountant.register("badges", cache_account)
+    SharedMemoryAccountant.register("upstream-responses", SharedUpstreamCache)
+    SharedMemoryAccountant.start(cfg.memory)
+
+    SharedRefreshScheduler.start(cfg.refresh)
+
     return app
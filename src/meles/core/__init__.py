@@ -17,27 +17,83 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
+from ._admission import AdmissionController, AdmissionMiddleware
 from ._color import Color, ColorValues
-from ._config import HasConfigItems, config
-from ._connect import Request, RequestHandler, Response, Urllib3RequestHandler
+from ._config import (
+    HasConfigItems,
+    ProvidesAdmissionConfig,
+    ProvidesCustomBackendConfig,
+    ProvidesDeadlineConfig,
+    ProvidesDebugConfig,
+    ProvidesMemoryConfig,
+    ProvidesNegativeCacheConfig,
+    ProvidesRateLimitConfig,
+    ProvidesUpstreamCacheConfig,
+    config,
+)
+from ._connect import (
+    AsyncRequestHandler,
+    Request,
+    RequestHandler,
+    Response,
+    SharedAsyncRequestHandler,
+    Urllib3RequestHandler,
+)
 from ._context import RequestIDMiddleware
 from ._data import BadgeData
-from ._error import ProcessingError
+from ._deadline import (
+    Deadline,
+    DeadlineMiddleware,
+    current_deadline,
+    deadline_scope,
+)
+from ._error import BadgeProcessingError, LoadSheddingError, ProcessingError
+from ._executor import BoundedExecutor
 from ._falcon import (
     SharedCache,
     SupportsFalconGetRequest,
     SupportsResourceGeneration,
     SupportsResources,
+    create_cache,
 )
+from ._bucket import TokenBucket
 from ._generator import Generator
+from ._http_cache import CachedResponse, SharedUpstreamCache, UpstreamResponseCache
 from ._icons import Icon, Icons
+from ._loop import BackgroundLoop, SharedBackgroundLoop
 from ._log import LOGGER_NAME, LogRecordingMiddleware, get_log_extras, setup_logger
+from ._memory import (
+    CacheMemoryAccount,
+    MemoryAccountant,
+    SharedMemoryAccountant,
+    SupportsMemoryAccounting,
+    estimate_size,
+)
+from ._metrics import (
+    BadgeMetrics,
+    SharedMetrics,
+    generate_metrics,
+    get_multiprocess_directory,
+    register_process_cleanup,
+)
+from ._mmap_cache import MMAP_CACHE_TYPE, MmapCache
+from ._ratelimit import (
+    ClientRateLimitMiddleware,
+    RateLimiter,
+    SharedUpstreamRateLimiter,
+)
+from ._refresh import RefreshScheduler, SharedRefreshScheduler
+from ._snapshot import CacheSnapshot, SnapshotSection, register_snapshot_section
+from ._startup import ImportTime, StartupReport, measure_startup
 from ._url import TemplateUrlSource, Url, UrlBuilder, UrlSourceBase
 
 __all__ = [
     BadgeData.__name__,
     Generator.__name__,
     ProcessingError.__name__,
+    BadgeProcessingError.__name__,
+    LoadSheddingError.__name__,
+    BoundedExecutor.__name__,
     Color.__name__,
     ColorValues.__name__,
     UrlBuilder.__name__,
@@ -48,6 +104,13 @@ __all__ = [
     RequestHandler.__name__,
     Request.__name__,
     Response.__name__,
+    AsyncRequestHandler.__name__,
+    CachedResponse.__name__,
+    UpstreamResponseCache.__name__,
+    "SharedUpstreamCache",
+    "SharedAsyncRequestHandler",
+    BackgroundLoop.__name__,
+    "SharedBackgroundLoop",
     Icons.__name__,
     Icon.__name__,
     "config",
@@ -55,10 +118,49 @@ __all__ = [
     get_log_extras.__name__,
     "LOGGER_NAME",
     RequestIDMiddleware.__name__,
+    Deadline.__name__,
+    DeadlineMiddleware.__name__,
+    current_deadline.__name__,
+    deadline_scope.__name__,
+    AdmissionController.__name__,
+    AdmissionMiddleware.__name__,
     LogRecordingMiddleware.__name__,
     "SharedCache",
     SupportsResources.__name__,
     SupportsResourceGeneration.__name__,
     SupportsFalconGetRequest.__name__,
     HasConfigItems.__name__,
+    ProvidesNegativeCacheConfig.__name__,
+    ProvidesDebugConfig.__name__,
+    ProvidesMemoryConfig.__name__,
+    ProvidesCustomBackendConfig.__name__,
+    ProvidesAdmissionConfig.__name__,
+    ProvidesRateLimitConfig.__name__,
+    ProvidesDeadlineConfig.__name__,
+    ProvidesUpstreamCacheConfig.__name__,
+    RefreshScheduler.__name__,
+    "SharedRefreshScheduler",
+    TokenBucket.__name__,
+    RateLimiter.__name__,
+    "SharedUpstreamRateLimiter",
+    ClientRateLimitMiddleware.__name__,
+    CacheSnapshot.__name__,
+    SnapshotSection.__name__,
+    register_snapshot_section.__name__,
+    ImportTime.__name__,
+    StartupReport.__name__,
+    measure_startup.__name__,
+    create_cache.__name__,
+    MmapCache.__name__,
+    "MMAP_CACHE_TYPE",
+    BadgeMetrics.__name__,
+    "SharedMetrics",
+    generate_metrics.__name__,
+    get_multiprocess_directory.__name__,
+    register_process_cleanup.__name__,
+    CacheMemoryAccount.__name__,
+    MemoryAccountant.__name__,
+    "SharedMemoryAccountant",
+    SupportsMemoryAccounting.__name__,
+    estimate_size.__name__,
 ]
@@ -0,0 +1,83 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from contextlib import contextmanager
+from math import ceil
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Final, Iterator
+
+    from falcon import Request, Response  # type: ignore
+
+# Weight of the latest call in the moving average of the upstream latency.
+_LATENCY_WEIGHT: "Final[float]" = 0.2
+
+
+class AdmissionController:
+    def __init__(
+        self, max_in_flight: int, clock: "Callable[[], float]" = monotonic
+    ) -> None:
+        self.__max_in_flight = max_in_flight
+        self.__clock = clock
+        self.__lock = Lock()
+        self.__in_flight: int = 0
+        self.__latency: float = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+
+    @property
+    def latency(self) -> float:
+        return self.__latency
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, ceil(self.__latency))
+
+    @contextmanager
+    def admit(self) -> "Iterator[bool]":
+        with self.__lock:
+            admitted = self.__in_flight < self.__max_in_flight
+            if admitted:
+                self.__in_flight += 1
+
+        if not admitted:
+            yield False
+            return
+
+        started: float = self.__clock()
+        try:
+            yield True
+        finally:
+            elapsed: float = self.__clock() - started
+            with self.__lock:
+                self.__in_flight -= 1
+                self.__latency += (elapsed - self.__latency) * _LATENCY_WEIGHT
+
+
+class AdmissionMiddleware:
+    def __init__(self, controller: "AdmissionController") -> None:
+        self.__controller = controller
+
+    def process_request(self, req: "Request", _: "Response") -> None:
+        req.context.admission = self.__controller
@@ -0,0 +1,73 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: "Callable[[], float]" = monotonic,
+    ) -> None:
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__clock = clock
+        self.__tokens = capacity
+        self.__updated = clock()
+        self.__lock = Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    @property
+    def capacity(self) -> float:
+        return self.__capacity
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self.__lock:
+            self.__refill()
+            if self.__tokens < tokens:
+                return False
+
+            self.__tokens -= tokens
+            return True
+
+    def seconds_until_available(self, tokens: float = 1.0) -> float:
+        with self.__lock:
+            self.__refill()
+            missing = tokens - self.__tokens
+            if missing <= 0:
+                return 0.0
+            if self.__rate <= 0:
+                return float("inf")
+            return missing / self.__rate
+
+    def __refill(self) -> None:
+        now = self.__clock()
+        elapsed = max(0.0, now - self.__updated)
+        self.__updated = now
+        self.__tokens = min(self.__capacity, self.__tokens + elapsed * self.__rate)
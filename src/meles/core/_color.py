@@ -21,15 +21,16 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import Enum
-from re import compile as re_compile
+from functools import lru_cache
+from types import MappingProxyType
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover
-    from re import Match, Pattern
-    from typing import Final
+    from typing import Final, Mapping
 
 
-hex_parse: "Final[Pattern[str]]" = re_compile(r"[0-9a-fA-F]{2}")
+_HEX_DIGITS: "Final[frozenset[str]]" = frozenset("0123456789abcdefABCDEF")
+_UNKNOWN_COLOR_CACHE_SIZE: "Final[int]" = 256
 
 
 @dataclass(frozen=True)
@@ -37,19 +38,27 @@ class Color:
     red_part: int = field(default=0)
     green_part: int = field(default=0)
     blue_part: int = field(default=0)
+    hex_value: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self,
+            "hex_value",
+            f"{self.red_part:02x}{self.green_part:02x}{self.blue_part:02x}",
+        )
 
     @staticmethod
     def from_hex(hex_value: str) -> "Color | None":
-        parse_result: "list[Match[str]]" = hex_parse.findall(hex_value)
-        if parse_result is None or len(parse_result) != 3:
+        digits = hex_value[1:] if hex_value.startswith("#") else hex_value
+        if len(digits) == 3:
+            digits = "".join(digit * 2 for digit in digits)
+        if len(digits) != 6 or not _HEX_DIGITS.issuperset(digits):
             return None
 
-        _red, _green, _blue = tuple(parse_result)
-        r_parsed = int(str(_red), 16)
-        g_parsed = int(str(_green), 16)
-        b_parsed = int(str(_blue), 16)
-
-        return Color(red_part=r_parsed, green_part=g_parsed, blue_part=b_parsed)
+        value = int(digits, 16)
+        return Color(
+            red_part=value >> 16, green_part=(value >> 8) & 0xFF, blue_part=value & 0xFF
+        )
 
     @staticmethod
     def from_hex_assured(hex_value: str) -> "Color":
@@ -61,18 +70,18 @@ class Color:
 
     @staticmethod
     def from_name(name: str) -> "Color | None":
-        name = name.lower()
-        if name not in all_color_names:
-            return None
-
-        return ColorValues[name].value
+        return _named_colors.get(name.lower())
 
     @staticmethod
     def from_str(value: str) -> "Color | None":
-        return Color.from_hex(value) or Color.from_name(value)
+        color = _resolution_table.get(value)
+        if color is None:
+            color = _resolve_color(value)
+
+        return color
 
     def to_hex(self) -> str:
-        return bytearray([self.red_part, self.green_part, self.blue_part]).hex()
+        return self.hex_value
 
     def to_rgb_hex_color(self) -> str:
         return f"#{self.to_hex()}"
@@ -90,6 +99,7 @@ class ColorValues(Enum):
     BLANCHED_ALMOND = Color.from_hex_assured("FFEBCD")
     BLUE = Color.from_hex_assured("0000FF")
     BLUE_VIOLET = Color.from_hex_assured("8A2BE2")
+    BRIGHT_GREEN = Color.from_hex_assured("44CC11")
     BROWN = Color.from_hex_assured("A52A2A")
     BURLY_WOOD = Color.from_hex_assured("DEB887")
     CADET_BLUE = Color.from_hex_assured("5F9EA0")
@@ -230,4 +240,53 @@ class ColorValues(Enum):
         return "#" + self.to_hex()
 
 
-all_color_names = {cv.name.lower().replace("_", ""): cv for cv in ColorValues}
+# Semantic colors of shields.io and the name they stand for.
+_SHIELDS_ALIASES: "Final[dict[str, str]]" = {
+    "critical": "red",
+    "important": "orange",
+    "success": "brightgreen",
+    "informational": "blue",
+    "inactive": "lightgrey",
+}
+
+
+def _build_named_colors() -> "Mapping[str, Color]":
+    names: "dict[str, Color]" = {}
+    # __members__ contains the enum aliases, e.g. CYAN for AQUA.
+    for member_name, member in ColorValues.__members__.items():
+        name = member_name.lower().replace("_", "")
+        names[name] = member.value
+        names.setdefault(name.replace("gray", "grey"), member.value)
+        names.setdefault(name.replace("grey", "gray"), member.value)
+
+    for alias, name in _SHIELDS_ALIASES.items():
+        names[alias] = names[name]
+
+    return MappingProxyType(names)
+
+
+def _build_resolution_table(names: "Mapping[str, Color]") -> "Mapping[str, Color]":
+    table: "dict[str, Color]" = dict(names)
+    for color in names.values():
+        for hex_value in (color.hex_value, color.hex_value.upper()):
+            table.setdefault(hex_value, color)
+            table.setdefault(f"#{hex_value}", color)
+
+    return MappingProxyType(table)
+
+
+_named_colors: "Final[Mapping[str, Color]]" = _build_named_colors()
+_resolution_table: "Final[Mapping[str, Color]]" = _build_resolution_table(_named_colors)
+_interned_colors: "Final[dict[Color, Color]]" = {
+    color: color for color in _named_colors.values()
+}
+
+
+@lru_cache(maxsize=_UNKNOWN_COLOR_CACHE_SIZE)
+def _resolve_color(value: str) -> "Color | None":
+    normalized = value.strip().lower()
+    color = _resolution_table.get(normalized) or Color.from_hex(normalized)
+    if color is None:
+        return None
+
+    return _interned_colors.get(color, color)
@@ -19,9 +19,12 @@
 #
 import os
 import pkgutil
+from dataclasses import dataclass, field
 from functools import cached_property
 from importlib.metadata import entry_points
-from typing import TYPE_CHECKING, Protocol
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Protocol, TypeVar
 
 if TYPE_CHECKING:  # pragma: no cover
     from typing import Callable, Iterator, Mapping
@@ -29,13 +32,44 @@ if TYPE_CHECKING:  # pragma: no cover
     from ._falcon import SupportsResources
 
 
-class _Environment:
-    def __init__(self) -> None:
-        self.__name = os.environ.get("MELES_ENVIRONMENT", "PRODUCTION")
+T = TypeVar("T")
+
+_TRUE_VALUES: "frozenset[str]" = frozenset(("1", "true", "yes", "on"))
+_FALSE_VALUES: "frozenset[str]" = frozenset(("0", "false", "no", "off"))
+
+
+def _get_number(
+    environ: "Mapping[str, str]", key: str, default: "T", convert: "Callable[[str], T]"
+) -> "T":
+    value: "str | None" = environ.get(key)
+    if value is None or value.strip() == "":
+        return default
+
+    try:
+        return convert(value.strip())
+    except ValueError as e:
+        raise ValueError(f"{key} must be a {convert.__name__}, got '{value}'") from e
 
-    @property
-    def name(self) -> str:
-        return self.__name
+
+def _get_bool(environ: "Mapping[str, str]", key: str, default: bool) -> bool:
+    value: "str | None" = environ.get(key)
+    if value is None or value.strip() == "":
+        return default
+
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+
+    raise ValueError(f"{key} must be one of True, False, 1, 0, yes, no, on, off")
+
+
+@dataclass(frozen=True)
+class _Environment:
+    name: str = field(default="PRODUCTION")
+    use_prometheus: bool = field(default=True)
+    use_health_check: bool = field(default=True)
 
     @property
     def is_production(self) -> bool:
@@ -45,13 +79,13 @@ class _Environment:
     def is_development(self) -> bool:
         return self.name.upper() == "DEVELOPMENT"
 
-    @property
-    def use_prometheus(self) -> bool:
-        return bool(os.environ.get("MELES_USE_PROMETHEUS", "True"))
-
-    @property
-    def use_health_check(self) -> bool:
-        return bool(os.environ.get("MELES_USE_HEALTHCHECK", "True"))
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_Environment":
+        return _Environment(
+            environ.get("MELES_ENVIRONMENT", "PRODUCTION"),
+            _get_bool(environ, "MELES_USE_PROMETHEUS", True),
+            _get_bool(environ, "MELES_USE_HEALTHCHECK", True),
+        )
 
 
 class _ProvidesEnvConfig(Protocol):
@@ -76,19 +110,25 @@ class _ProvidesEnvConfig(Protocol):
         ...
 
 
+@dataclass(frozen=True)
 class _CacheConfig:
-    def __init__(self) -> None:
-        self.__options: "Mapping[str, str]" = {}
-        for key, value in os.environ.items():
+    options: "Mapping[str, str]" = field(default_factory=dict)
+
+    def get_options(self) -> "Mapping[str, str]":
+        return self.options
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_CacheConfig":
+        options: "dict[str, str]" = {}
+        for key, value in environ.items():
             if key.upper().startswith("MELES_CACHE_"):
                 new_key = key.replace("MELES_", "")
-                self.__options[new_key] = value
+                options[new_key] = value
 
-        if "CACHE_TYPE" not in self.__options:
-            self.__options["CACHE_TYPE"] = "simple"
+        if "CACHE_TYPE" not in options:
+            options["CACHE_TYPE"] = "simple"
 
-    def get_options(self) -> "Mapping[str, str]":
-        return self.__options
+        return _CacheConfig(MappingProxyType(options))
 
 
 class _ProvidesCacheConfig(Protocol):
@@ -96,10 +136,299 @@ class _ProvidesCacheConfig(Protocol):
         ...
 
 
+@dataclass(frozen=True)
+class _RefreshConfig:
+    top_n: int = field(default=0)
+    lead_seconds: float = field(default=5.0)
+    workers: int = field(default=2)
+    rate: float = field(default=1.0)
+    interval: float = field(default=1.0)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_RefreshConfig":
+        return _RefreshConfig(
+            _get_number(environ, "MELES_REFRESH_TOP_N", 0, int),
+            _get_number(environ, "MELES_REFRESH_LEAD_SECONDS", 5.0, float),
+            _get_number(environ, "MELES_REFRESH_WORKERS", 2, int),
+            _get_number(environ, "MELES_REFRESH_RATE", 1.0, float),
+            _get_number(environ, "MELES_REFRESH_INTERVAL", 1.0, float),
+        )
+
+
+class ProvidesRefreshConfig(Protocol):
+    @property
+    def top_n(self) -> int:
+        ...
+
+    @property
+    def lead_seconds(self) -> float:
+        ...
+
+    @property
+    def workers(self) -> int:
+        ...
+
+    @property
+    def rate(self) -> float:
+        ...
+
+    @property
+    def interval(self) -> float:
+        ...
+
+
+@dataclass(frozen=True)
+class _NegativeCacheConfig:
+    client_error_ttl: int = field(default=0)
+    server_error_ttl: int = field(default=0)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_NegativeCacheConfig":
+        return _NegativeCacheConfig(
+            _get_number(environ, "MELES_NEGATIVE_CACHE_CLIENT_ERROR_TTL", 0, int),
+            _get_number(environ, "MELES_NEGATIVE_CACHE_SERVER_ERROR_TTL", 0, int),
+        )
+
+
+class ProvidesNegativeCacheConfig(Protocol):
+    @property
+    def client_error_ttl(self) -> int:
+        ...
+
+    @property
+    def server_error_ttl(self) -> int:
+        ...
+
+
+@dataclass(frozen=True)
+class _SnapshotConfig:
+    path: "Path | None" = field(default=None)
+    interval: float = field(default=300.0)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_SnapshotConfig":
+        path: str = environ.get("MELES_CACHE_SNAPSHOT_PATH", "")
+        return _SnapshotConfig(
+            Path(path) if path else None,
+            _get_number(environ, "MELES_CACHE_SNAPSHOT_INTERVAL", 300.0, float),
+        )
+
+
+class ProvidesSnapshotConfig(Protocol):
+    @property
+    def path(self) -> "Path | None":
+        ...
+
+    @property
+    def interval(self) -> float:
+        ...
+
+
+@dataclass(frozen=True)
+class _MemoryConfig:
+    limit_bytes: int = field(default=0)
+    check_interval: float = field(default=30.0)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_MemoryConfig":
+        return _MemoryConfig(
+            _get_number(environ, "MELES_MEMORY_LIMIT_BYTES", 0, int),
+            _get_number(environ, "MELES_MEMORY_CHECK_INTERVAL", 30.0, float),
+        )
+
+
+class ProvidesMemoryConfig(Protocol):
+    @property
+    def limit_bytes(self) -> int:
+        ...
+
+    @property
+    def check_interval(self) -> float:
+        ...
+
+
+@dataclass(frozen=True)
+class _DebugConfig:
+    token: "str | None" = field(default=None)
+    max_profile_seconds: int = field(default=60)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_DebugConfig":
+        return _DebugConfig(
+            environ.get("MELES_DEBUG_TOKEN") or None,
+            _get_number(environ, "MELES_DEBUG_MAX_PROFILE_SECONDS", 60, int),
+        )
+
+
+class ProvidesDebugConfig(Protocol):
+    @property
+    def token(self) -> "str | None":
+        ...
+
+    @property
+    def max_profile_seconds(self) -> int:
+        ...
+
+
+@dataclass(frozen=True)
+class _AdmissionConfig:
+    max_in_flight: int = field(default=0)
+    stale_seconds: int = field(default=3600)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_AdmissionConfig":
+        return _AdmissionConfig(
+            _get_number(environ, "MELES_ADMISSION_MAX_IN_FLIGHT", 0, int),
+            _get_number(environ, "MELES_ADMISSION_STALE_SECONDS", 3600, int),
+        )
+
+
+class ProvidesAdmissionConfig(Protocol):
+    @property
+    def max_in_flight(self) -> int:
+        ...
+
+    @property
+    def stale_seconds(self) -> int:
+        ...
+
+
+_RATE_LIMIT_STORES: "frozenset[str]" = frozenset(("memory", "cache"))
+
+
+@dataclass(frozen=True)
+class _RateLimitConfig:
+    client_rate: float = field(default=0.0)
+    client_burst: float = field(default=20.0)
+    client_header: "str | None" = field(default=None)
+    client_trusted_hops: int = field(default=1)
+    upstream_rate: float = field(default=0.0)
+    upstream_burst: float = field(default=20.0)
+    store: str = field(default="memory")
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_RateLimitConfig":
+        store: str = environ.get("MELES_RATE_LIMIT_STORE", "memory").lower()
+        if store not in _RATE_LIMIT_STORES:
+            raise ValueError("MELES_RATE_LIMIT_STORE must be memory or cache")
+
+        return _RateLimitConfig(
+            _get_number(environ, "MELES_RATE_LIMIT_CLIENT_RATE", 0.0, float),
+            _get_number(environ, "MELES_RATE_LIMIT_CLIENT_BURST", 20.0, float),
+            environ.get("MELES_RATE_LIMIT_CLIENT_HEADER") or None,
+            _get_number(environ, "MELES_RATE_LIMIT_CLIENT_TRUSTED_HOPS", 1, int),
+            _get_number(environ, "MELES_RATE_LIMIT_UPSTREAM_RATE", 0.0, float),
+            _get_number(environ, "MELES_RATE_LIMIT_UPSTREAM_BURST", 20.0, float),
+            store,
+        )
+
+
+class ProvidesRateLimitConfig(Protocol):
+    @property
+    def client_rate(self) -> float:
+        ...
+
+    @property
+    def client_burst(self) -> float:
+        ...
+
+    @property
+    def client_header(self) -> "str | None":
+        ...
+
+    @property
+    def client_trusted_hops(self) -> int:
+        ...
+
+    @property
+    def upstream_rate(self) -> float:
+        ...
+
+    @property
+    def upstream_burst(self) -> float:
+        ...
+
+    @property
+    def store(self) -> str:
+        ...
+
+
+@dataclass(frozen=True)
+class _UpstreamCacheConfig:
+    max_entries: int = field(default=1024)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_UpstreamCacheConfig":
+        return _UpstreamCacheConfig(
+            _get_number(environ, "MELES_UPSTREAM_CACHE_MAX_ENTRIES", 1024, int),
+        )
+
+
+class ProvidesUpstreamCacheConfig(Protocol):
+    @property
+    def max_entries(self) -> int:
+        ...
+
+
+@dataclass(frozen=True)
+class _DeadlineConfig:
+    seconds: float = field(default=0.0)
+    header: "str | None" = field(default=None)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_DeadlineConfig":
+        return _DeadlineConfig(
+            _get_number(environ, "MELES_DEADLINE_SECONDS", 0.0, float),
+            environ.get("MELES_DEADLINE_HEADER") or None,
+        )
+
+
+class ProvidesDeadlineConfig(Protocol):
+    @property
+    def seconds(self) -> float:
+        ...
+
+    @property
+    def header(self) -> "str | None":
+        ...
+
+
+@dataclass(frozen=True)
+class _CustomBackendConfig:
+    timeout: float = field(default=5.0)
+    max_concurrency: int = field(default=4)
+    queue_depth: int = field(default=8)
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_CustomBackendConfig":
+        return _CustomBackendConfig(
+            _get_number(environ, "MELES_CUSTOM_BACKEND_TIMEOUT", 5.0, float),
+            _get_number(environ, "MELES_CUSTOM_BACKEND_MAX_CONCURRENCY", 4, int),
+            _get_number(environ, "MELES_CUSTOM_BACKEND_QUEUE_DEPTH", 8, int),
+        )
+
+
+class ProvidesCustomBackendConfig(Protocol):
+    @property
+    def timeout(self) -> float:
+        ...
+
+    @property
+    def max_concurrency(self) -> int:
+        ...
+
+    @property
+    def queue_depth(self) -> int:
+        ...
+
+
 class _DynamicConfig:
+    def __init__(self, configuration_module: "str | None") -> None:
+        self.__configuration_module = configuration_module
+
     @cached_property
     def _configurators(self) -> "list[Callable[[SupportsResources], None]]":
-        return list(_DynamicConfig.__get_configurators())
+        return list(self.__get_configurators())
 
     def setup(self, app: "SupportsResources") -> bool:
         if len(self._configurators) == 0:
@@ -110,10 +439,9 @@ class _DynamicConfig:
 
         return True
 
-    @staticmethod
-    def __get_configurators() -> "Iterator[Callable[[SupportsResources], None]]":
+    def __get_configurators(self) -> "Iterator[Callable[[SupportsResources], None]]":
         configurator_module: "Callable[[SupportsResources], None] | None" = (
-            _DynamicConfig.__get_configurator_module()
+            self.__get_configurator_module()
         )
         if configurator_module is not None:
             yield configurator_module
@@ -123,11 +451,10 @@ class _DynamicConfig:
             if callable(loaded_ep):
                 yield loaded_ep
 
-    @staticmethod
-    def __get_configurator_module() -> "Callable[[SupportsResources], None] | None":
-        module_and_attr_name = os.getenv(
-            "MELES_CONFIGURATION_MODULE", "meles.default:configure"
-        )
+    def __get_configurator_module(
+        self,
+    ) -> "Callable[[SupportsResources], None] | None":
+        module_and_attr_name = self.__configuration_module
         if module_and_attr_name is not None:
             attr = pkgutil.resolve_name(module_and_attr_name)
             if attr is not None and callable(attr):
@@ -141,40 +468,141 @@ class _SupportsDynamicConfig(Protocol):
         ...
 
 
+def _get_port(environ: "Mapping[str, str]") -> "int | None":
+    port: "str | None" = environ.get("MELES_PORT")
+    if port is None:
+        return 8080
+
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"MELES_PORT must be a port number, got '{port}'")
+
+    return int(port)
+
+
+@dataclass(frozen=True)
+class _ConfigValues:
+    env: "_Environment" = field()
+    dynamic: "_DynamicConfig" = field()
+    host: "str | None" = field()
+    port: "int | None" = field()
+    cache: "_CacheConfig" = field()
+    refresh: "_RefreshConfig" = field()
+    snapshot: "_SnapshotConfig" = field()
+    negative_cache: "_NegativeCacheConfig" = field()
+    debug: "_DebugConfig" = field()
+    memory: "_MemoryConfig" = field()
+    custom_backend: "_CustomBackendConfig" = field()
+    admission: "_AdmissionConfig" = field()
+    rate_limit: "_RateLimitConfig" = field()
+    deadline: "_DeadlineConfig" = field()
+    upstream_cache: "_UpstreamCacheConfig" = field()
+
+    @staticmethod
+    def from_environ(environ: "Mapping[str, str]") -> "_ConfigValues":
+        env = _Environment.from_environ(environ)
+        return _ConfigValues(
+            env,
+            _DynamicConfig(
+                environ.get("MELES_CONFIGURATION_MODULE", "meles.default:configure")
+            ),
+            environ.get("MELES_HOST")
+            or ("127.0.0.1" if env.is_development else "0.0.0.0"),
+            _get_port(environ),
+            _CacheConfig.from_environ(environ),
+            _RefreshConfig.from_environ(environ),
+            _SnapshotConfig.from_environ(environ),
+            _NegativeCacheConfig.from_environ(environ),
+            _DebugConfig.from_environ(environ),
+            _MemoryConfig.from_environ(environ),
+            _CustomBackendConfig.from_environ(environ),
+            _AdmissionConfig.from_environ(environ),
+            _RateLimitConfig.from_environ(environ),
+            _DeadlineConfig.from_environ(environ),
+            _UpstreamCacheConfig.from_environ(environ),
+        )
+
+
 class _RuntimeConfig:
     def __init__(self) -> None:
-        self.__env = _Environment()
-        self.__cache = _CacheConfig()
-        self.__dynamic = _DynamicConfig()
+        self.__values: "_ConfigValues | None" = None
+
+    @property
+    def _values(self) -> "_ConfigValues":
+        values = self.__values
+        if values is None:
+            values = self.__load(None)
+
+        return values
+
+    def reload(self, environ: "Mapping[str, str] | None" = None) -> None:
+        self.__load(environ)
+
+    def __load(self, environ: "Mapping[str, str] | None") -> "_ConfigValues":
+        # Values are validated before they replace the current ones, so that
+        # a failed reload keeps the previous configuration.
+        values = _ConfigValues.from_environ(os.environ if environ is None else environ)
+        self.__values = values
+        return values
 
     @property
     def env(self) -> _Environment:
-        return self.__env
+        return self._values.env
 
     @property
     def dynamic(self) -> _DynamicConfig:
-        return self.__dynamic
+        return self._values.dynamic
 
     @property
     def host(self) -> "str | None":
-        return os.environ.get("MELES_HOST") or (
-            "127.0.0.1" if self.__env.is_development else "0.0.0.0"
-        )
+        return self._values.host
 
     @property
     def port(self) -> "int | None":
-        port: "str | None" = os.environ.get("MELES_PORT")
-        if port is None:
-            return 8080
+        return self._values.port
+
+    @property
+    def cache(self) -> "_CacheConfig":
+        return self._values.cache
 
-        if not port.isdigit():
-            return None
+    @property
+    def refresh(self) -> "_RefreshConfig":
+        return self._values.refresh
 
-        return int(port)
+    @property
+    def snapshot(self) -> "_SnapshotConfig":
+        return self._values.snapshot
 
     @property
-    def cache(self) -> "_CacheConfig":
-        return self.__cache
+    def negative_cache(self) -> "_NegativeCacheConfig":
+        return self._values.negative_cache
+
+    @property
+    def debug(self) -> "_DebugConfig":
+        return self._values.debug
+
+    @property
+    def memory(self) -> "_MemoryConfig":
+        return self._values.memory
+
+    @property
+    def custom_backend(self) -> "_CustomBackendConfig":
+        return self._values.custom_backend
+
+    @property
+    def admission(self) -> "_AdmissionConfig":
+        return self._values.admission
+
+    @property
+    def rate_limit(self) -> "_RateLimitConfig":
+        return self._values.rate_limit
+
+    @property
+    def deadline(self) -> "_DeadlineConfig":
+        return self._values.deadline
+
+    @property
+    def upstream_cache(self) -> "_UpstreamCacheConfig":
+        return self._values.upstream_cache
 
 
 class HasConfigItems(Protocol):
@@ -198,5 +626,48 @@ class HasConfigItems(Protocol):
     def cache(self) -> "_ProvidesCacheConfig":
         ...
 
+    @property
+    def refresh(self) -> "ProvidesRefreshConfig":
+        ...
+
+    @property
+    def snapshot(self) -> "ProvidesSnapshotConfig":
+        ...
+
+    @property
+    def negative_cache(self) -> "ProvidesNegativeCacheConfig":
+        ...
+
+    @property
+    def debug(self) -> "ProvidesDebugConfig":
+        ...
+
+    @property
+    def memory(self) -> "ProvidesMemoryConfig":
+        ...
+
+    @property
+    def custom_backend(self) -> "ProvidesCustomBackendConfig":
+        ...
+
+    @property
+    def admission(self) -> "ProvidesAdmissionConfig":
+        ...
+
+    @property
+    def rate_limit(self) -> "ProvidesRateLimitConfig":
+        ...
+
+    @property
+    def deadline(self) -> "ProvidesDeadlineConfig":
+        ...
+
+    @property
+    def upstream_cache(self) -> "ProvidesUpstreamCacheConfig":
+        ...
+
+    def reload(self, environ: "Mapping[str, str] | None" = None) -> None:
+        ...
+
 
 config: "HasConfigItems" = _RuntimeConfig()
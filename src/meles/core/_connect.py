@@ -17,23 +17,35 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
+import asyncio
 import http
 import logging
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass, field
-from typing import TYPE_CHECKING, Mapping, cast, get_args
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field, fields
+from threading import Lock
+from typing import TYPE_CHECKING, Mapping
 from urllib.parse import urlparse
 
 from certifi import where as locate_certificates
-from urllib3 import HTTPSConnectionPool
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, Timeout
 from urllib3.exceptions import HTTPError
 
-from ._error import ProcessingError
+from ._deadline import Deadline, current_deadline
+from ._error import LoadSheddingError, ProcessingError
+from ._http_cache import SharedUpstreamCache
 from ._log import LOGGER_NAME
+from ._metrics import BadgeMetrics, SharedMetrics
+from ._ratelimit import RateLimiter, SharedUpstreamRateLimiter
 from ._url import Url
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Any, Callable
+    from typing import Any, Callable, Final, TypeVar
+
+    from ._http_cache import CachedResponse, UpstreamResponseCache
+
+    T = TypeVar("T")
 
 
 class RequestHandler(ABC):
@@ -42,28 +54,128 @@ class RequestHandler(ABC):
         ...
 
 
+_POOL_SIZE: "Final[int]" = 10
+_NON_REQUEST_FIELDS: "Final[frozenset[str]]" = frozenset(("url", "deadline"))
+
+
 class Urllib3RequestHandler(RequestHandler):
     def __init__(
-        self, request_certs: "Callable[[], str]" = locate_certificates
+        self,
+        request_certs: "Callable[[], str]" = locate_certificates,
+        metrics: "BadgeMetrics" = SharedMetrics,
+        rate_limiter: "RateLimiter" = SharedUpstreamRateLimiter,
+        response_cache: "UpstreamResponseCache" = SharedUpstreamCache,
     ) -> None:
         self.__locations_of_certs = request_certs()
         self.__logger = logging.getLogger(LOGGER_NAME)
+        self.__metrics = metrics
+        self.__rate_limiter = rate_limiter
+        self.__response_cache = response_cache
+        self.__pools: "dict[tuple[str, str | None, int | None], HTTPConnectionPool]" = (
+            {}
+        )
+        self.__pools_lock = Lock()
+
+    def __get_pool(
+        self, scheme: str, host: "str | None", port: "int | None"
+    ) -> "HTTPConnectionPool":
+        key = (scheme, host, port)
+        pool: "HTTPConnectionPool | None" = self.__pools.get(key)
+        if pool is not None:
+            return pool
+
+        with self.__pools_lock:
+            pool = self.__pools.get(key)
+            if pool is None:
+                pool = (
+                    HTTPConnectionPool(host, port or 80, maxsize=_POOL_SIZE)
+                    if scheme == "http"
+                    else HTTPSConnectionPool(
+                        host,
+                        port or 443,
+                        maxsize=_POOL_SIZE,
+                        cert_reqs="CERT_REQUIRED",
+                        ca_certs=self.__locations_of_certs,
+                    )
+                )
+                self.__pools[key] = pool
+
+            return pool
 
     def handle_request(self, request: "Request") -> "Response":
-        request_args: "dict[str, Any]" = asdict(request)
-        del request_args["url"]
+        url: str = str(request.url)
+        key: "str | None" = self.__response_cache.get_key(request)
+        if key is None:
+            return self.__send(request, request.headers)
+
+        host: str = _get_host(url)
+        cached: "CachedResponse | None" = self.__response_cache.get(key)
+        if cached is not None and self.__response_cache.is_fresh(cached):
+            self.__metrics.count_upstream_cache(host, "hit")
+            if cached.matches(request.headers):
+                return Response(
+                    url, cached.headers, http.HTTPStatus.NOT_MODIFIED.value, b""
+                )
+            return _to_response(url, cached)
+
+        # Callers that send their own validators, e.g. the NuGet sources,
+        # expect to see a 304 themselves.
+        is_conditional: bool = self.__response_cache.is_conditional(request)
+        headers: "Mapping[str, str] | None" = request.headers
+        if cached is not None and not is_conditional:
+            headers = {**(request.headers or {}), **cached.get_validators()}
+
+        response: "Response" = self.__send(request, headers)
+        response_headers: "dict[str, str]" = _to_str_headers(response.headers)
+        if response.status == http.HTTPStatus.NOT_MODIFIED and cached is not None:
+            self.__metrics.count_upstream_cache(host, "revalidated")
+            cached = self.__response_cache.refresh(key, cached, response_headers)
+            return response if is_conditional else _to_response(url, cached)
+
+        self.__metrics.count_upstream_cache(host, "miss")
+        if response.status == http.HTTPStatus.OK and response.data is not None:
+            stored: "CachedResponse | None" = self.__response_cache.store(
+                key, response_headers, response.data
+            )
+            if stored is not None:
+                return _to_response(url, stored)
+
+        return response
+
+    def __send(
+        self, request: "Request", headers: "Mapping[str, str] | None"
+    ) -> "Response":
+        request_args: "dict[str, Any]" = {
+            f.name: getattr(request, f.name)
+            for f in fields(request)
+            if f.name not in _NON_REQUEST_FIELDS
+        }
+        request_args["headers"] = headers
+        if request.deadline is not None:
+            # The remaining time bounds the whole call including retries,
+            # not just a single connect or read.
+            request_args["timeout"] = Timeout(
+                total=request.deadline.limit(request.timeout, str(request.url))
+            )
 
         url = urlparse(str(request.url))
+        host: str = url.hostname or url.netloc
+        if not self.__rate_limiter.try_acquire(host):
+            raise LoadSheddingError(
+                http.HTTPStatus.SERVICE_UNAVAILABLE,
+                f"Request budget for {host} is exhausted",
+                "upstream",
+                self.__rate_limiter.retry_after(),
+            )
 
         self.__logger.debug("Performing request to %s", request.url)
         try:
-            pool = HTTPSConnectionPool(
-                url.netloc,
-                url.port or 443,
-                cert_reqs="CERT_REQUIRED",
-                ca_certs=self.__locations_of_certs,
+            pool: "HTTPConnectionPool" = self.__get_pool(
+                url.scheme, url.hostname, url.port
             )
-            response_data = pool.request("GET", str(request.url), **request_args)
+            with self.__metrics.upstream(host) as status:
+                response_data = pool.request("GET", str(request.url), **request_args)
+                status.append(response_data.status)
             content = response_data.data
             self.__logger.debug(
                 "Request to %s returned: %s; status: %s",
@@ -78,12 +190,52 @@ class Urllib3RequestHandler(RequestHandler):
                 content,
             )
         except HTTPError as hexc:
+            if request.deadline is not None and request.deadline.is_expired:
+                raise ProcessingError(
+                    http.HTTPStatus.GATEWAY_TIMEOUT,
+                    f"Deadline exceeded while requesting {request.url}",
+                ) from hexc
             raise ProcessingError(
                 http.HTTPStatus.BAD_GATEWAY,
                 f"Failed to send request to {request.url}",
             ) from hexc
 
 
+def _get_host(url: str) -> str:
+    parsed = urlparse(url)
+    return parsed.hostname or parsed.netloc
+
+
+def _to_str_headers(
+    headers: "Mapping[str, str] | Mapping[bytes, bytes] | None",
+) -> "dict[str, str]":
+    return {
+        (k.decode("utf-8") if isinstance(k, bytes) else k): (
+            v.decode("utf-8") if isinstance(v, bytes) else v
+        )
+        for k, v in (headers or {}).items()
+    }
+
+
+def _to_response(url: str, cached: "CachedResponse") -> "Response":
+    return Response(
+        url, cached.headers, http.HTTPStatus.OK.value, cached.data, cached.parsed
+    )
+
+
+class AsyncRequestHandler:
+    def __init__(self, handler: "RequestHandler", workers: int = _POOL_SIZE) -> None:
+        self.__handler = handler
+        self.__executor = ThreadPoolExecutor(workers, thread_name_prefix="meles-http")
+
+    async def handle_request(self, request: "Request") -> "Response":
+        # The call runs in the context of the calling coroutine, e.g. with
+        # the deadline of the badge that awaits it.
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, copy_context().run, self.__handler.handle_request, request
+        )
+
+
 @dataclass
 class Request:  # pylint: disable=R0902
     url: Url = field()
@@ -96,6 +248,9 @@ class Request:  # pylint: disable=R0902
     retries: "bool | int | None" = field(default=None)
     timeout: "float | int | None" = field(default=3, metadata={"unit": "seconds"})
     json: "Any | None" = field(default=None)
+    deadline: "Deadline | None" = field(
+        default_factory=current_deadline, compare=False, repr=False
+    )
 
 
 @dataclass
@@ -104,6 +259,15 @@ class Response:
     headers: "Mapping[str, str] | Mapping[bytes, bytes] | None" = field(default=None)
     status: "int" = field(default=http.HTTPStatus.NO_CONTENT.value)
     data: "bytes | None" = field(default=None)
+    parsed: "dict[str, Any]" = field(default_factory=dict, repr=False, compare=False)
+
+    def get_parsed(self, name: str, parse: "Callable[[bytes], T]") -> "T":
+        # Responses served from the upstream cache share this memo, so an
+        # unchanged document is only parsed once per name. Each consumer uses
+        # a name of its own, as the results depend on the parse function.
+        if name not in self.parsed:
+            self.parsed[name] = parse(self.data or b"")
+        return self.parsed[name]
 
     def has_header(self, header_key: str) -> bool:
         return self._get_raw_header(header_key) is not None
@@ -120,17 +284,22 @@ class Response:
 
         return ""
 
+    def get_media_type(self) -> str:
+        return self.get_header("Content-Type").split(";")[0].strip().lower()
+
     def _get_raw_header(self, header_key: str) -> "str | bytes | None":
-        if self.headers is not None:
+        if self.headers is None:
             return None
 
-        args = get_args(self.headers)
-        if args[0] == str:
-            return cast(Mapping[str, str], self.headers).get(header_key)
-
-        elif args[0] == bytes:
-            return cast(Mapping[bytes, bytes], self.headers).get(
-                header_key.encode("utf-8")
-            )
+        wanted: str = header_key.lower()
+        for key, value in self.headers.items():
+            name: str = key.decode("utf-8") if isinstance(key, bytes) else key
+            if name.lower() == wanted:
+                return value
 
         return None
+
+
+SharedAsyncRequestHandler: "Final[AsyncRequestHandler]" = AsyncRequestHandler(
+    Urllib3RequestHandler()
+)
@@ -17,10 +17,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
+from contextvars import ContextVar
 from threading import local
 from uuid import uuid4
 
 
+# Unlike the request id, the deadline has to follow coroutines of async
+# backends and the executor calls they make, so it is a context variable.
+_deadline: ContextVar = ContextVar("meles_deadline", default=None)
+
+
 class _Context:
     def __init__(self):
         self._thread_local = local()
@@ -33,6 +39,14 @@ class _Context:
     def request_id(self, value):
         self._thread_local.request_id = value
 
+    @property
+    def deadline(self):
+        return _deadline.get()
+
+    @deadline.setter
+    def deadline(self, value):
+        _deadline.set(value)
+
 
 ctx = _Context()
 
@@ -0,0 +1,115 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from contextlib import contextmanager
+from http import HTTPStatus
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from ._context import ctx
+from ._error import ProcessingError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Iterator
+
+    from falcon import Request, Response  # type: ignore
+
+
+class Deadline:
+    def __init__(
+        self, seconds: float, clock: "Callable[[], float]" = monotonic
+    ) -> None:
+        self.__clock = clock
+        self.__expires_at: float = clock() + seconds
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.__expires_at - self.__clock())
+
+    @property
+    def is_expired(self) -> bool:
+        return self.__clock() >= self.__expires_at
+
+    def check(self, stage: str) -> None:
+        if self.is_expired:
+            raise ProcessingError(
+                HTTPStatus.GATEWAY_TIMEOUT, f"Deadline exceeded before {stage}"
+            )
+
+    def limit(self, timeout: "float | None", stage: str) -> float:
+        self.check(stage)
+        remaining: float = self.remaining
+        return remaining if timeout is None else min(float(timeout), remaining)
+
+
+def current_deadline() -> "Deadline | None":
+    return ctx.deadline
+
+
+@contextmanager
+def deadline_scope(deadline: "Deadline | None") -> "Iterator[None]":
+    previous: "Deadline | None" = ctx.deadline
+    ctx.deadline = deadline
+    try:
+        yield
+    finally:
+        ctx.deadline = previous
+
+
+class DeadlineMiddleware:
+    def __init__(
+        self,
+        seconds: float,
+        header: "str | None" = None,
+        clock: "Callable[[], float]" = monotonic,
+    ) -> None:
+        self.__seconds = seconds
+        self.__header = header
+        self.__clock = clock
+
+    def process_request(self, req: "Request", _: "Response") -> None:
+        seconds: float = self.__seconds
+        requested: "float | None" = self.__get_requested_seconds(req)
+        if requested is not None:
+            # Clients may only shorten the configured budget.
+            seconds = requested if seconds <= 0 else min(seconds, requested)
+
+        deadline: "Deadline | None" = (
+            Deadline(seconds, self.__clock) if seconds > 0 else None
+        )
+        ctx.deadline = deadline
+        req.context.deadline = deadline
+
+    def process_response(self, _, __, ___, ____) -> None:
+        ctx.deadline = None
+
+    def __get_requested_seconds(self, req: "Request") -> "float | None":
+        if self.__header is None:
+            return None
+
+        value: "str | None" = req.get_header(self.__header)
+        if not value:
+            return None
+
+        try:
+            seconds = float(value)
+        except ValueError:
+            return None
+
+        return seconds if seconds > 0 else None
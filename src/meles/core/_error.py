@@ -18,6 +18,10 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._data import BadgeData
 
 
 class ProcessingError(Exception):
@@ -27,3 +31,18 @@ class ProcessingError(Exception):
     def __init__(self, status: int, message: str) -> None:
         self.status = status
         self.message = message
+
+
+class BadgeProcessingError(ProcessingError):
+    def __init__(self, status: int, message: str, badge: "BadgeData") -> None:
+        super().__init__(status, message)
+        self.badge = badge
+
+
+class LoadSheddingError(ProcessingError):
+    def __init__(
+        self, status: int, message: str, reason: str, retry_after: int
+    ) -> None:
+        super().__init__(status, message)
+        self.reason = reason
+        self.retry_after = retry_after
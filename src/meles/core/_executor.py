@@ -0,0 +1,114 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import asyncio
+from concurrent.futures import Future
+from queue import SimpleQueue
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Awaitable, Callable
+
+    from ._loop import BackgroundLoop
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, workers: int, queue_depth: int) -> None:
+        self.__name = name
+        self.__workers = max(1, workers)
+        self.__capacity = self.__workers + max(0, queue_depth)
+        self.__queue: "SimpleQueue[tuple[Callable[[], Any], Future[Any]]]" = (
+            SimpleQueue()
+        )
+        self.__lock = Lock()
+        self.__pending: int = 0
+        self.__threads: "list[Thread]" = []
+        self.__semaphore: "asyncio.Semaphore | None" = None
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def pending(self) -> int:
+        return self.__pending
+
+    def submit(self, function: "Callable[[], T]") -> "Future[T] | None":
+        with self.__lock:
+            if self.__pending >= self.__capacity:
+                return None
+
+            self.__pending += 1
+            if len(self.__threads) < self.__workers:
+                self.__start_worker()
+
+        future: "Future[T]" = Future()
+        self.__queue.put((function, future))
+        return future
+
+    def submit_coroutine(
+        self, function: "Callable[[], Awaitable[T]]", loop: "BackgroundLoop"
+    ) -> "Future[T] | None":
+        with self.__lock:
+            if self.__pending >= self.__capacity:
+                return None
+
+            self.__pending += 1
+
+        future: "Future[T]" = loop.submit(self.__run_coroutine(function))
+        future.add_done_callback(self.__release)
+        return future
+
+    async def __run_coroutine(self, function: "Callable[[], Awaitable[T]]") -> "T":
+        # Created on the loop, which is the only place it is used.
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.__workers)
+
+        async with self.__semaphore:
+            return await function()
+
+    def __release(self, _: "Future[Any]") -> None:
+        with self.__lock:
+            self.__pending -= 1
+
+    def __start_worker(self) -> None:
+        # Calls that time out keep running. The threads are daemons, so
+        # that a hanging call does not block the shutdown.
+        thread = Thread(
+            target=self.__run,
+            name=f"meles-backend-{self.__name}-{len(self.__threads)}",
+            daemon=True,
+        )
+        self.__threads.append(thread)
+        thread.start()
+
+    def __run(self) -> None:
+        while True:
+            function, future = self.__queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(function())
+                    except BaseException as exc:  # pylint: disable=W0718
+                        future.set_exception(exc)
+            finally:
+                self.__release(future)
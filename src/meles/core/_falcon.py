@@ -25,14 +25,28 @@ from falcon_caching import Cache  # type: ignore
 from ._config import config
 from ._connect import RequestHandler, Urllib3RequestHandler
 from ._generator import Generator
+from ._mmap_cache import MMAP_CACHE_TYPE, MmapCache
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Final, Iterator
+    from typing import Final, Iterator, Mapping
 
     from falcon import Request, Response  # type: ignore
 
+    from ._config import HasConfigItems
 
-SharedCache: "Final[Cache]" = Cache(config.cache.get_options())
+
+def create_cache(options: "Mapping[str, str]") -> "Cache":
+    if options.get("CACHE_TYPE") != MMAP_CACHE_TYPE:
+        return Cache(dict(options))
+
+    # falcon-caching only resolves its own backends by name.
+    cache = Cache({**options, "CACHE_TYPE": "null", "CACHE_NO_NULL_WARNING": True})
+    cache.config["CACHE_TYPE"] = MMAP_CACHE_TYPE
+    cache.cache = MmapCache.from_config(cache.config, cache.cache_options)
+    return cache
+
+
+SharedCache: "Final[Cache]" = create_cache(config.cache.get_options())
 
 
 class SupportsFalconGetRequest(Protocol):
@@ -50,6 +64,7 @@ class SupportsResourceGeneration(Protocol):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_factory: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ) -> "Iterator[SupportsFalconGetRequest]":
         ...
 
@@ -64,6 +79,14 @@ class SupportsResources(Protocol):
     def cache(self, cache: "Cache") -> None:
         ...
 
+    @property
+    def config(self) -> "HasConfigItems | None":
+        ...
+
+    @config.setter
+    def config(self, cfg: "HasConfigItems | None") -> None:
+        ...
+
     @property
     def generator_factory(self) -> "type[Generator]":
         ...
@@ -19,8 +19,6 @@
 #
 from typing import TYPE_CHECKING
 
-from pybadges import badge
-
 from ._color import ColorValues
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -29,6 +27,10 @@ if TYPE_CHECKING:  # pragma: no cover
 
 class Generator:
     def transform(self, badge_data: "BadgeData") -> str:
+        # pybadges loads jinja2 and pkg_resources, which takes longer than
+        # the rest of the application. Import it with the first badge.
+        from pybadges import badge  # pylint: disable=C0415
+
         return badge(
             left_text=badge_data.label,
             right_text=badge_data.text,
@@ -0,0 +1,277 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from ._memory import estimate_size
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Final, Mapping
+
+    from ._connect import Request
+
+_CONDITIONAL_HEADERS: "Final[frozenset[str]]" = frozenset(
+    ("if-none-match", "if-modified-since")
+)
+_PRIVATE_HEADERS: "Final[frozenset[str]]" = frozenset(("authorization", "cookie"))
+_BODY_HEADERS: "Final[frozenset[str]]" = frozenset(
+    ("content-length", "content-encoding", "transfer-encoding")
+)
+
+
+@dataclass
+class CachedResponse:
+    headers: "dict[str, str]" = field()
+    data: bytes = field()
+    expires_at: float = field()
+    parsed: "dict[str, Any]" = field(default_factory=dict, repr=False)
+
+    @property
+    def etag(self) -> "str | None":
+        return _get_header(self.headers, "ETag")
+
+    @property
+    def last_modified(self) -> "str | None":
+        return _get_header(self.headers, "Last-Modified")
+
+    def matches(self, headers: "Mapping[str, str] | None") -> bool:
+        etag: "str | None" = _get_header(headers, "If-None-Match")
+        if etag is not None:
+            return etag == self.etag
+
+        modified_since: "str | None" = _get_header(headers, "If-Modified-Since")
+        return modified_since is not None and modified_since == self.last_modified
+
+    def get_validators(self) -> "dict[str, str]":
+        validators: "dict[str, str]" = {}
+        if self.etag is not None:
+            validators["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            validators["If-Modified-Since"] = self.last_modified
+        return validators
+
+
+class UpstreamResponseCache:
+    def __init__(
+        self, max_entries: int = 0, clock: "Callable[[], float]" = monotonic
+    ) -> None:
+        self.__max_entries = max_entries
+        self.__clock = clock
+        self.__entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.__sizes: "dict[str, int]" = {}
+        self.__lock = Lock()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.__max_entries > 0
+
+    def configure(self, max_entries: int) -> None:
+        with self.__lock:
+            self.__max_entries = max_entries
+            self.__trim()
+
+    def get_key(self, request: "Request") -> "str | None":
+        if not self.is_enabled:
+            return None
+
+        if (
+            request.body is not None
+            or request.json is not None
+            or request.fields is not None
+        ):
+            return None
+
+        headers: "list[tuple[str, str]]" = []
+        for name, value in (request.headers or {}).items():
+            lowered: str = name.lower()
+            if lowered in _PRIVATE_HEADERS:
+                return None
+            if lowered not in _CONDITIONAL_HEADERS:
+                headers.append((lowered, value))
+
+        return "\n".join([str(request.url), *(f"{n}: {v}" for n, v in sorted(headers))])
+
+    @staticmethod
+    def is_conditional(request: "Request") -> bool:
+        return any(
+            name.lower() in _CONDITIONAL_HEADERS for name in (request.headers or {})
+        )
+
+    def get(self, key: str) -> "CachedResponse | None":
+        with self.__lock:
+            entry: "CachedResponse | None" = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: "CachedResponse") -> bool:
+        return self.__clock() < entry.expires_at
+
+    def store(
+        self, key: str, headers: "Mapping[str, str]", data: bytes
+    ) -> "CachedResponse | None":
+        lifetime: "float | None" = _get_lifetime(headers)
+        if lifetime is None:
+            return None
+
+        entry = CachedResponse(_without_age(headers), data, self.__clock() + lifetime)
+        if lifetime <= 0 and entry.etag is None and entry.last_modified is None:
+            # Neither fresh nor revalidatable
+            return None
+
+        self.__put(key, entry)
+        return entry
+
+    def refresh(
+        self, key: str, entry: "CachedResponse", headers: "Mapping[str, str]"
+    ) -> "CachedResponse":
+        # A 304 updates the stored headers, but keeps the body and
+        # everything that has been parsed from it.
+        merged: "dict[str, str]" = dict(entry.headers)
+        for name, value in headers.items():
+            if name.lower() in _BODY_HEADERS:
+                continue
+            for existing in [n for n in merged if n.lower() == name.lower()]:
+                del merged[existing]
+            merged[name] = value
+
+        lifetime: "float | None" = _get_lifetime(merged)
+        refreshed = CachedResponse(
+            _without_age(merged),
+            entry.data,
+            self.__clock() + (lifetime or 0.0),
+            entry.parsed,
+        )
+        if lifetime is None:
+            # The response must not be stored any longer.
+            self.__remove(key)
+        else:
+            self.__put(key, refreshed)
+        return refreshed
+
+    def get_memory_usage(self) -> "tuple[int, int]":
+        with self.__lock:
+            return len(self.__entries), sum(self.__sizes.values())
+
+    def evict(self, size: int) -> int:
+        freed: int = 0
+        with self.__lock:
+            while self.__entries and freed < size:
+                key, _ = self.__entries.popitem(last=False)
+                freed += self.__sizes.pop(key, 0)
+        return freed
+
+    def __put(self, key: str, entry: "CachedResponse") -> None:
+        size: int = estimate_size(entry.headers) + len(entry.data)
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__sizes[key] = size
+            self.__entries.move_to_end(key)
+            self.__trim()
+
+    def __remove(self, key: str) -> None:
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__sizes.pop(key, None)
+
+    def __trim(self) -> None:
+        while len(self.__entries) > max(self.__max_entries, 0):
+            key, _ = self.__entries.popitem(last=False)
+            self.__sizes.pop(key, None)
+
+
+def _get_header(headers: "Mapping[str, str] | None", name: str) -> "str | None":
+    if headers is None:
+        return None
+
+    wanted: str = name.lower()
+    for key, value in headers.items():
+        if key.lower() == wanted:
+            return value
+
+    return None
+
+
+def _without_age(headers: "Mapping[str, str]") -> "dict[str, str]":
+    # The age only applies when a response is received. Stored, it would be
+    # subtracted again on every revalidation.
+    return {name: value for name, value in headers.items() if name.lower() != "age"}
+
+
+def _parse_cache_control(value: str) -> "dict[str, str]":
+    directives: "dict[str, str]" = {}
+    for directive in value.split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"')
+    return directives
+
+
+def _get_lifetime(headers: "Mapping[str, str]") -> "float | None":
+    # meles is a shared cache: private responses are not stored, and
+    # s-maxage takes precedence over max-age.
+    vary: "str | None" = _get_header(headers, "Vary")
+    if vary is not None and vary.strip() == "*":
+        return None
+
+    directives = _parse_cache_control(_get_header(headers, "Cache-Control") or "")
+    if "no-store" in directives or "private" in directives:
+        return None
+
+    if "no-cache" in directives:
+        return 0.0
+
+    age: float = _to_seconds(_get_header(headers, "Age")) or 0.0
+    for name in ("s-maxage", "max-age"):
+        max_age: "float | None" = _to_seconds(directives.get(name))
+        if max_age is not None:
+            return max_age - age
+
+    expires: "str | None" = _get_header(headers, "Expires")
+    if expires is not None:
+        try:
+            date: "str | None" = _get_header(headers, "Date")
+            if date is None:
+                return 0.0
+            return (
+                parsedate_to_datetime(expires) - parsedate_to_datetime(date)
+            ).total_seconds() - age
+        except (TypeError, ValueError):
+            # Invalid dates, e.g. "0", mean the response has already expired.
+            return 0.0
+
+    return 0.0
+
+
+def _to_seconds(value: "str | None") -> "float | None":
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(int(value)))
+    except ValueError:
+        return None
+
+
+SharedUpstreamCache: "Final[UpstreamResponseCache]" = UpstreamResponseCache()
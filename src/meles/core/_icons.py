@@ -20,12 +20,18 @@
 from abc import ABC, abstractmethod
 from base64 import b64encode
 from enum import Enum
-
-from simpleicons.all import icons  # type: ignore
-from simpleicons.icon import Icon as SimpleIcon  # type: ignore
-from simpleicons.icons import si_nuget as nuget_logo  # type: ignore
+from sys import modules
+from typing import TYPE_CHECKING
 
 from ._color import Color, ColorValues
+from ._memory import SharedMemoryAccountant, estimate_size
+
+if TYPE_CHECKING:  # pragma: no cover
+    from simpleicons.icon import Icon as SimpleIcon  # type: ignore
+
+# simpleicons.all creates an object for every known icon on import,
+# so it is only loaded once a custom icon is requested.
+_ALL_ICONS_MODULE: str = "simpleicons.all"
 
 
 class Icon(ABC):
@@ -57,9 +63,14 @@ class _SimpleIcon(Icon):
         return self.__source_icon.get_xml_bytes(fill=self.color.to_rgb_hex_color())
 
 
-class _NugetIcon(_SimpleIcon):
+class _NugetIcon(Icon):
     def __init__(self) -> None:
-        super().__init__(nuget_logo, Color.from_hex_assured("#004681"))
+        super().__init__(Color.from_hex_assured("#004681"))
+
+    def build_svg(self) -> bytes:
+        from simpleicons.icons import si_nuget  # type: ignore # pylint: disable=C0415
+
+        return si_nuget.get_xml_bytes(fill=self.color.to_rgb_hex_color())
 
 
 class Icons(Enum):
@@ -67,9 +78,32 @@ class Icons(Enum):
 
     @staticmethod
     def custom(name: str, color: "Color" = ColorValues.LIGHT_GREY.value) -> "Icon":
+        from simpleicons.all import icons  # type: ignore # pylint: disable=C0415
+
         icon: "SimpleIcon" = icons.get(name)
 
         if icon is None:
             raise ValueError(f"'{name}' is not a valid icon")
 
         return _SimpleIcon(icon, color)
+
+
+class _IconMemoryAccount:
+    def __init__(self) -> None:
+        self.__size: "int | None" = None
+
+    def get_memory_usage(self) -> "tuple[int, int]":
+        if _ALL_ICONS_MODULE not in modules:
+            return 0, 0
+
+        icons = modules[_ALL_ICONS_MODULE].icons
+        if self.__size is None:
+            self.__size = estimate_size(icons, limit=1000000)
+        return len(icons), self.__size
+
+    def evict(self, size: int) -> int:
+        # The icons are loaded once and cannot be reloaded.
+        return 0
+
+
+SharedMemoryAccountant.register("icons", _IconMemoryAccount())
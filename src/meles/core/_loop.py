@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import asyncio
+from threading import Lock, Thread
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future
+    from typing import Any, Coroutine, Final, TypeVar
+
+    T = TypeVar("T")
+
+
+class BackgroundLoop:
+    def __init__(self, name: str = "meles-loop") -> None:
+        self.__name = name
+        self.__lock = Lock()
+        self.__loop: "asyncio.AbstractEventLoop | None" = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.__loop is not None
+
+    @property
+    def loop(self) -> "asyncio.AbstractEventLoop":
+        with self.__lock:
+            if self.__loop is None:
+                loop = asyncio.new_event_loop()
+                Thread(target=loop.run_forever, name=self.__name, daemon=True).start()
+                self.__loop = loop
+
+            return self.__loop
+
+    def submit(self, coroutine: "Coroutine[Any, Any, T]") -> "Future[T]":
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def stop(self) -> None:
+        with self.__lock:
+            loop, self.__loop = self.__loop, None
+
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+SharedBackgroundLoop: "Final[BackgroundLoop]" = BackgroundLoop()
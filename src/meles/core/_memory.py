@@ -0,0 +1,171 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import sys
+from logging import getLogger
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Protocol
+
+from ._log import LOGGER_NAME
+from ._metrics import BadgeMetrics, SharedMetrics
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Final
+
+    from falcon_caching import Cache  # type: ignore
+
+    from ._config import ProvidesMemoryConfig
+
+
+def estimate_size(value: "Any", limit: int = 100000) -> int:
+    seen: "set[int]" = set()
+    pending: "list[Any]" = [value]
+    size: int = 0
+    while pending and len(seen) < limit:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        else:
+            pending.extend(getattr(item, "__dict__", {}).values())
+            for slot in getattr(type(item), "__slots__", ()):
+                if hasattr(item, slot):
+                    pending.append(getattr(item, slot))
+    return size
+
+
+class SupportsMemoryAccounting(Protocol):
+    def get_memory_usage(self) -> "tuple[int, int]":
+        ...
+
+    def evict(self, size: int) -> int:
+        ...
+
+
+class CacheMemoryAccount:
+    def __init__(self, cache: "Cache") -> None:
+        self.__backend = cache.cache
+
+    @property
+    def is_supported(self) -> bool:
+        return isinstance(getattr(self.__backend, "_cache", None), dict)
+
+    def get_memory_usage(self) -> "tuple[int, int]":
+        entries = list(self.__backend._cache.items())
+        return len(entries), sum(
+            CacheMemoryAccount.__get_size(key, value) for key, (_, value) in entries
+        )
+
+    def evict(self, size: int) -> int:
+        # Entries that expire first are the least valuable ones; entries that
+        # never expire go last.
+        entries = sorted(
+            self.__backend._cache.items(),
+            key=lambda entry: entry[1][0] or float("inf"),
+        )
+        freed: int = 0
+        for key, (_, value) in entries:
+            if freed >= size:
+                break
+            if self.__backend._cache.pop(key, None) is not None:
+                freed += CacheMemoryAccount.__get_size(key, value)
+        return freed
+
+    @staticmethod
+    def __get_size(key: str, value: "bytes | memoryview") -> int:
+        return sys.getsizeof(key) + len(value)
+
+
+class MemoryAccountant:
+    def __init__(self, metrics: "BadgeMetrics" = SharedMetrics) -> None:
+        self.__accounts: "dict[str, SupportsMemoryAccounting]" = {}
+        self.__metrics = metrics
+        self.__lock = Lock()
+        self.__stopped = Event()
+        self.__thread: "Thread | None" = None
+        self.__logger = getLogger(LOGGER_NAME)
+
+    def register(self, name: str, account: "SupportsMemoryAccounting") -> None:
+        with self.__lock:
+            self.__accounts[name] = account
+
+    def get_usage(self) -> "dict[str, tuple[int, int]]":
+        with self.__lock:
+            accounts = dict(self.__accounts)
+
+        return {name: account.get_memory_usage() for name, account in accounts.items()}
+
+    def publish(self) -> None:
+        for name, (entries, size) in self.get_usage().items():
+            self.__metrics.set_memory_usage(name, entries, size)
+
+    def enforce(self, limit: int) -> int:
+        if limit <= 0:
+            return 0
+
+        usage = self.get_usage()
+        excess: int = sum(size for _, size in usage.values()) - limit
+        if excess <= 0:
+            return 0
+
+        freed: int = 0
+        for name, _ in sorted(usage.items(), key=lambda item: -item[1][1]):
+            if freed >= excess:
+                break
+            freed += self.__accounts[name].evict(excess - freed)
+
+        self.__logger.info("Evicted %i bytes to stay below %i bytes", freed, limit)
+        return freed
+
+    def start(self, settings: "ProvidesMemoryConfig") -> None:
+        if settings.check_interval <= 0 or self.__thread is not None:
+            return
+
+        self.__stopped.clear()
+        self.__thread = Thread(
+            target=self.__run,
+            args=(settings,),
+            name="meles-memory-accountant",
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        self.__thread = None
+
+    def __run(self, settings: "ProvidesMemoryConfig") -> None:
+        while not self.__stopped.wait(settings.check_interval):
+            try:
+                if settings.limit_bytes > 0:
+                    self.enforce(settings.limit_bytes)
+                self.publish()
+            except Exception as exc:  # pylint: disable=W0703
+                self.__logger.warning("Failed to enforce memory limit", exc_info=exc)
+
+
+SharedMemoryAccountant: "Final[MemoryAccountant]" = MemoryAccountant()
@@ -0,0 +1,249 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import atexit
+import os
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from prometheus_client import (  # type: ignore
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import (  # type: ignore
+    MultiProcessCollector,
+    mark_process_dead,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Final, Iterable, Iterator
+
+_LATENCY_BUCKETS: "Final[tuple[float, ...]]" = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Upstream hosts may be taken from requests, so only hosts registered by the
+# sources get a label of their own.
+_OTHER_HOST: "Final[str]" = "other"
+
+
+class BadgeMetrics:
+    def __init__(self, registry: "CollectorRegistry | None" = None) -> None:
+        self.__registry = registry or CollectorRegistry()
+        self.__known_hosts: "frozenset[str]" = frozenset()
+        self.__stages = Histogram(
+            "meles_badge_stage_seconds",
+            "Time spent in the stages of a badge request",
+            ["route", "stage"],
+            buckets=_LATENCY_BUCKETS,
+            registry=self.__registry,
+        )
+        self.__cache_results = Counter(
+            "meles_badge_cache_requests",
+            "Badge cache look-ups by result",
+            ["route", "result"],
+            registry=self.__registry,
+        )
+        self.__upstream = Histogram(
+            "meles_upstream_request_seconds",
+            "Latency of requests to upstream services",
+            ["host", "status"],
+            buckets=_LATENCY_BUCKETS,
+            registry=self.__registry,
+        )
+        self.__in_flight = Gauge(
+            "meles_upstream_requests_in_flight",
+            "Requests to upstream services that have not completed yet",
+            ["host"],
+            registry=self.__registry,
+            multiprocess_mode="livesum",
+        )
+        self.__upstream_cache = Counter(
+            "meles_upstream_cache_requests",
+            "Cacheable requests to upstream services by result",
+            ["host", "result"],
+            registry=self.__registry,
+        )
+        self.__documents = Histogram(
+            "meles_document_seconds",
+            "Time spent parsing and querying upstream documents",
+            ["format", "step"],
+            buckets=_LATENCY_BUCKETS,
+            registry=self.__registry,
+        )
+        self.__shed = Counter(
+            "meles_badge_shed_requests",
+            "Cache misses that were not generated, by reason and the answer they got",
+            ["route", "reason", "result"],
+            registry=self.__registry,
+        )
+        self.__backend_calls = Counter(
+            "meles_custom_backend_calls",
+            "Calls of custom backends by result",
+            ["backend", "result"],
+            registry=self.__registry,
+        )
+        self.__backend_seconds = Histogram(
+            "meles_custom_backend_seconds",
+            "Time spent running custom backends",
+            ["backend"],
+            buckets=_LATENCY_BUCKETS,
+            registry=self.__registry,
+        )
+        self.__backend_pending = Gauge(
+            "meles_custom_backend_pending",
+            "Custom backend calls that are running or waiting for a worker",
+            ["backend"],
+            registry=self.__registry,
+            multiprocess_mode="livesum",
+        )
+
+        self.__memory_entries = Gauge(
+            "meles_memory_cache_entries",
+            "Number of entries held by in-memory caches",
+            ["cache"],
+            registry=self.__registry,
+            multiprocess_mode="livesum",
+        )
+        self.__memory_bytes = Gauge(
+            "meles_memory_cache_bytes",
+            "Estimated size of in-memory caches",
+            ["cache"],
+            registry=self.__registry,
+            multiprocess_mode="livesum",
+        )
+
+    @property
+    def registry(self) -> "CollectorRegistry":
+        return self.__registry
+
+    def add_known_hosts(self, urls: "Iterable[str]") -> None:
+        hosts: "set[str]" = {_get_host(url) for url in urls}
+        if not hosts <= self.__known_hosts:
+            self.__known_hosts = self.__known_hosts | hosts
+
+    @contextmanager
+    def stage(self, route: str, stage: str) -> "Iterator[None]":
+        with self.__stages.labels(route=route, stage=stage).time():
+            yield
+
+    @contextmanager
+    def document(self, data_format: str, step: str) -> "Iterator[None]":
+        with self.__documents.labels(format=data_format, step=step).time():
+            yield
+
+    def count_shed(self, route: str, reason: str, result: str) -> None:
+        self.__shed.labels(route=route, reason=reason, result=result).inc()
+
+    @contextmanager
+    def backend(self, backend: str) -> "Iterator[None]":
+        with self.__backend_seconds.labels(backend=backend).time():
+            yield
+
+    def count_backend_call(self, backend: str, result: str, pending: int) -> None:
+        self.__backend_calls.labels(backend=backend, result=result).inc()
+        self.__backend_pending.labels(backend=backend).set(pending)
+
+    def set_memory_usage(self, cache: str, entries: int, size: int) -> None:
+        self.__memory_entries.labels(cache=cache).set(entries)
+        self.__memory_bytes.labels(cache=cache).set(size)
+
+    def count_cache_result(self, route: str, result: str) -> None:
+        self.__cache_results.labels(route=route, result=result).inc()
+
+    def count_upstream_cache(self, host: str, result: str) -> None:
+        self.__upstream_cache.labels(
+            host=self.__get_host_label(host), result=result
+        ).inc()
+
+    @contextmanager
+    def upstream(self, host: str) -> "Iterator[list[int]]":
+        host = self.__get_host_label(host)
+        status: "list[int]" = []
+        in_flight = self.__in_flight.labels(host=host)
+        in_flight.inc()
+        started: float = perf_counter()
+        try:
+            yield status
+        finally:
+            in_flight.dec()
+            self.__upstream.labels(
+                host=host, status=str(status[0]) if status else "error"
+            ).observe(perf_counter() - started)
+
+    def __get_host_label(self, host: str) -> str:
+        return host if host in self.__known_hosts else _OTHER_HOST
+
+
+def _get_host(url: str) -> str:
+    parsed = urlparse(url)
+    return parsed.hostname or parsed.netloc
+
+
+SharedMetrics: "Final[BadgeMetrics]" = BadgeMetrics()
+
+
+def get_multiprocess_directory() -> "str | None":
+    return os.environ.get(
+        "PROMETHEUS_MULTIPROC_DIR", os.environ.get("prometheus_multiproc_dir")
+    )
+
+
+def generate_metrics(
+    registries: "Iterable[CollectorRegistry]", directory: "str | None" = None
+) -> bytes:
+    directory = directory or get_multiprocess_directory()
+    if directory is None:
+        return b"".join(generate_latest(registry) for registry in registries)
+
+    # Every metric of every worker, including the ones of the given
+    # registries, is written to the shared directory.
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=directory)
+    return generate_latest(registry)
+
+
+def _mark_current_process_dead() -> None:
+    directory: "str | None" = get_multiprocess_directory()
+    if directory is not None:
+        mark_process_dead(os.getpid(), directory)
+
+
+def register_process_cleanup() -> None:
+    # The pid is looked up on exit, so pre-forked workers clean up after
+    # themselves even if the application was loaded before forking.
+    atexit.unregister(_mark_current_process_dead)
+    atexit.register(_mark_current_process_dead)
@@ -0,0 +1,428 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import fcntl
+import json
+import mmap
+import os
+import stat
+import struct
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from tempfile import gettempdir
+from threading import RLock
+from time import time
+from typing import TYPE_CHECKING
+from zlib import crc32
+
+from falcon_caching.backends.base import BaseCache  # type: ignore
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Final, Iterator, Mapping
+
+MMAP_CACHE_TYPE: "Final[str]" = "meles_mmap"
+
+_MAGIC: "Final[bytes]" = b"MELESMC1"
+# magic, superseded, index slots, data start, data end
+_HEADER: "Final[struct.Struct]" = struct.Struct("<8sQQQQ")
+# key hash, record offset
+_SLOT: "Final[struct.Struct]" = struct.Struct("<QQ")
+# record length, checksum, expires, key length
+_RECORD: "Final[struct.Struct]" = struct.Struct("<IIdH")
+_EMPTY: "Final[int]" = 0
+_DELETED: "Final[int]" = 1
+# Values are stored with a type tag instead of being pickled, as the file may be
+# modified by anything with write access to it.
+_TEXT: "Final[bytes]" = b"s"
+_BYTES: "Final[bytes]" = b"b"
+_TUPLE: "Final[bytes]" = b"t"
+_JSON: "Final[bytes]" = b"j"
+
+
+def _encode(value: "Any") -> "bytes | None":
+    if isinstance(value, str):
+        return _TEXT + value.encode("utf-8")
+    if isinstance(value, (bytes, bytearray)):
+        return _BYTES + bytes(value)
+    try:
+        if isinstance(value, tuple):
+            return _TUPLE + json.dumps(value).encode("utf-8")
+        return _JSON + json.dumps(value).encode("utf-8")
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(payload: bytes) -> "Any":
+    tag: bytes = payload[:1]
+    body: bytes = payload[1:]
+    if tag == _TEXT:
+        return body.decode("utf-8")
+    if tag == _BYTES:
+        return body
+    if tag == _TUPLE:
+        return tuple(json.loads(body))
+    if tag == _JSON:
+        return json.loads(body)
+    raise ValueError(f"Unknown value type {tag!r}")
+
+
+def _check_private(path: "Path", status: "os.stat_result") -> None:
+    if status.st_uid != os.geteuid() or stat.S_IMODE(status.st_mode) & 0o077:
+        raise PermissionError(f"{path} is not private to the current user")
+
+
+def _default_path() -> "Path":
+    directory: "Path" = Path(gettempdir()) / f"meles-{os.geteuid()}"
+    try:
+        directory.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+
+    status: "os.stat_result" = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode):
+        raise PermissionError(f"{directory} is not a directory")
+    _check_private(directory, status)
+    return directory / "badges.cache"
+
+
+def _hash_key(key: str) -> int:
+    # 0 marks a never used slot.
+    return (
+        int.from_bytes(blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+        or 1
+    )
+
+
+class _Mapping:
+    def __init__(self, path: "Path") -> None:
+        with open(path, "r+b") as cache_file:
+            _check_private(path, os.fstat(cache_file.fileno()))
+            self.__map = mmap.mmap(cache_file.fileno(), 0)
+        magic, _, self.slots, self.data_start, _ = _HEADER.unpack_from(self.__map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a meles cache file")
+
+    @property
+    def size(self) -> int:
+        return len(self.__map)
+
+    @property
+    def is_superseded(self) -> bool:
+        return _HEADER.unpack_from(self.__map, 0)[1] != 0
+
+    @property
+    def data_end(self) -> int:
+        return _HEADER.unpack_from(self.__map, 0)[4]
+
+    def mark_superseded(self) -> None:
+        _HEADER.pack_into(
+            self.__map, 0, _MAGIC, 1, self.slots, self.data_start, self.data_end
+        )
+
+    def entries(self) -> "Iterator[tuple[int, int]]":
+        for slot in range(self.slots):
+            yield _SLOT.unpack_from(self.__map, self.__slot(slot))
+
+    def probe(self, key_hash: int) -> "Iterator[tuple[int, int, int]]":
+        first: int = key_hash % self.slots
+        for step in range(self.slots):
+            slot: int = (first + step) % self.slots
+            slot_hash, offset = _SLOT.unpack_from(self.__map, self.__slot(slot))
+            yield slot, slot_hash, offset
+            if slot_hash == _EMPTY:
+                return
+
+    def write_slot(self, slot: int, key_hash: int, offset: int) -> None:
+        _SLOT.pack_into(self.__map, self.__slot(slot), key_hash, offset)
+
+    def read(self, offset: int) -> "tuple[str, float, bytes] | None":
+        if offset < self.data_start or offset + _RECORD.size > self.size:
+            return None
+
+        length, checksum, expires, key_length = _RECORD.unpack_from(self.__map, offset)
+        if offset + length > self.size or length < _RECORD.size + key_length:
+            return None
+
+        body: bytes = self.__map[offset + _RECORD.size : offset + length]
+        if crc32(body) != checksum:
+            return None
+
+        return (
+            body[:key_length].decode("utf-8"),
+            expires,
+            body[key_length:],
+        )
+
+    def append(self, key: str, expires: float, value: bytes) -> "int | None":
+        body: bytes = key.encode("utf-8") + value
+        length: int = _RECORD.size + len(body)
+        offset: int = self.data_end
+        if offset + length > self.size:
+            return None
+
+        self.__map[offset + _RECORD.size : offset + length] = body
+        _RECORD.pack_into(
+            self.__map, offset, length, crc32(body), expires, len(body) - len(value)
+        )
+        _HEADER.pack_into(
+            self.__map, 0, _MAGIC, 0, self.slots, self.data_start, offset + length
+        )
+        return offset
+
+    def __slot(self, slot: int) -> int:
+        return _HEADER.size + slot * _SLOT.size
+
+
+class MmapCache(BaseCache):
+    def __init__(
+        self,
+        path: "Path",
+        size: int = 64 * 1024 * 1024,
+        index_slots: int = 16384,
+        default_timeout: int = 300,
+        clock: "Callable[[], float]" = time,
+    ) -> None:
+        super().__init__(default_timeout)
+        self.__path = path
+        self.__lock_path = path.with_name(f"{path.name}.lock")
+        self.__size = size
+        self.__index_slots = index_slots
+        self.__clock = clock
+        self.__lock = RLock()
+        self.__mapping: "_Mapping | None" = None
+        self.__ensure_file()
+
+    @staticmethod
+    def from_config(
+        config: "Mapping[str, Any]", options: "Mapping[str, Any]"
+    ) -> "MmapCache":
+        return MmapCache(
+            Path(config.get("CACHE_MMAP_PATH") or _default_path()),
+            int(config.get("CACHE_MMAP_SIZE", 64 * 1024 * 1024)),
+            int(config.get("CACHE_MMAP_INDEX_SLOTS", 16384)),
+            int(options.get("default_timeout", 300)),
+        )
+
+    @property
+    def path(self) -> "Path":
+        return self.__path
+
+    def get(self, key: str) -> "Any":
+        found = self.__find(self.__get_mapping(), key)
+        if found is None:
+            return None
+
+        try:
+            return _decode(found[1])
+        except ValueError:
+            return None
+
+    def has(self, key: str) -> bool:
+        return self.__find(self.__get_mapping(), key) is not None
+
+    def set(self, key: str, value: "Any", timeout: "int | None" = None) -> bool:
+        return self.__write(key, value, timeout, overwrite=True)
+
+    def add(self, key: str, value: "Any", timeout: "int | None" = None) -> bool:
+        return self.__write(key, value, timeout, overwrite=False)
+
+    def delete(self, key: str) -> bool:
+        with self.__locked() as mapping:
+            for slot, slot_hash, offset in mapping.probe(_hash_key(key)):
+                if slot_hash == _hash_key(key) and self.__is_key(mapping, offset, key):
+                    mapping.write_slot(slot, slot_hash, _DELETED)
+                    return True
+        return False
+
+    def clear(self) -> bool:
+        with self.__locked() as mapping:
+            self.__rebuild(mapping, [])
+        return True
+
+    def compact(self) -> None:
+        with self.__locked() as mapping:
+            self.__rebuild(mapping, list(self.__live_records(mapping)))
+
+    def __write(
+        self, key: str, value: "Any", timeout: "int | None", overwrite: bool
+    ) -> bool:
+        timeout = int(self._normalize_timeout(timeout))
+        expires: float = self.__clock() + timeout if timeout > 0 else 0.0
+        payload: "bytes | None" = _encode(value)
+        if payload is None:
+            return False
+
+        with self.__locked() as mapping:
+            if not overwrite and self.__find(mapping, key) is not None:
+                return False
+
+            for attempt in range(2):
+                if self.__store(mapping, key, expires, payload):
+                    return True
+                if attempt == 0:
+                    mapping = self.__rebuild(
+                        mapping, list(self.__live_records(mapping)), key
+                    )
+        return False
+
+    def __store(
+        self, mapping: "_Mapping", key: str, expires: float, payload: bytes
+    ) -> bool:
+        key_hash: int = _hash_key(key)
+        target: "int | None" = None
+        for slot, slot_hash, offset in mapping.probe(key_hash):
+            if slot_hash == _EMPTY:
+                target = slot if target is None else target
+                break
+            if slot_hash == key_hash and self.__is_key(mapping, offset, key):
+                target = slot
+                break
+            if offset == _DELETED and target is None:
+                target = slot
+
+        if target is None:
+            return False
+
+        offset = mapping.append(key, expires, payload)
+        if offset is None:
+            return False
+
+        # Publishing the slot last keeps readers from seeing partial records.
+        mapping.write_slot(target, key_hash, offset)
+        return True
+
+    def __find(self, mapping: "_Mapping", key: str) -> "tuple[float, bytes] | None":
+        key_hash: int = _hash_key(key)
+        for _, slot_hash, offset in mapping.probe(key_hash):
+            if slot_hash != key_hash or offset == _DELETED:
+                continue
+
+            record = mapping.read(offset)
+            if record is None or record[0] != key:
+                continue
+
+            _, expires, value = record
+            if expires != 0 and expires <= self.__clock():
+                return None
+            return expires, value
+        return None
+
+    @staticmethod
+    def __is_key(mapping: "_Mapping", offset: int, key: str) -> bool:
+        record = mapping.read(offset)
+        return record is not None and record[0] == key
+
+    def __live_records(
+        self, mapping: "_Mapping"
+    ) -> "Iterator[tuple[str, float, bytes]]":
+        now: float = self.__clock()
+        for slot_hash, offset in mapping.entries():
+            if slot_hash == _EMPTY or offset == _DELETED:
+                continue
+
+            record = mapping.read(offset)
+            if record is not None and (record[1] == 0 or record[1] > now):
+                yield record
+
+    def __rebuild(
+        self,
+        mapping: "_Mapping",
+        records: "list[tuple[str, float, bytes]]",
+        skip: "str | None" = None,
+    ) -> "_Mapping":
+        records = [record for record in records if record[0] != skip]
+        # Entries expiring first are dropped when the cap is reached; half of
+        # the data area is kept free so that the next compaction is not due
+        # right away.
+        records.sort(key=lambda record: record[1] or float("inf"), reverse=True)
+        budget: int = (self.__size - self.__data_start) // 2
+        kept: "list[tuple[str, float, bytes]]" = []
+        for record in records[: self.__index_slots // 2]:
+            length: int = _RECORD.size + len(record[0].encode("utf-8")) + len(record[2])
+            if length > budget:
+                continue
+            budget -= length
+            kept.append(record)
+
+        temporary: "Path" = self.__path.with_name(f"{self.__path.name}.{os.getpid()}")
+        self.__create_file(temporary)
+        replacement = _Mapping(temporary)
+        for key, expires, payload in reversed(kept):
+            self.__store(replacement, key, expires, payload)
+        os.replace(temporary, self.__path)
+        # Readers still holding the old mapping keep using it until they notice
+        # the flag, so it is not closed here.
+        mapping.mark_superseded()
+        self.__mapping = replacement
+        return replacement
+
+    @property
+    def __data_start(self) -> int:
+        return _HEADER.size + self.__index_slots * _SLOT.size
+
+    def __create_file(self, path: "Path") -> None:
+        path.unlink(missing_ok=True)
+        with os.fdopen(
+            os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb"
+        ) as cache_file:
+            cache_file.write(
+                _HEADER.pack(
+                    _MAGIC, 0, self.__index_slots, self.__data_start, self.__data_start
+                )
+            )
+            cache_file.truncate(self.__size)
+
+    def __ensure_file(self) -> None:
+        if self.__size <= self.__data_start:
+            raise ValueError("The cache size must exceed the size of its index")
+
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.__path.exists():
+            temporary: "Path" = self.__path.with_name(
+                f"{self.__path.name}.{os.getpid()}"
+            )
+            self.__create_file(temporary)
+            try:
+                os.link(temporary, self.__path)
+            except FileExistsError:
+                pass
+            finally:
+                temporary.unlink()
+
+    def __get_mapping(self) -> "_Mapping":
+        mapping: "_Mapping | None" = self.__mapping
+        if mapping is not None and not mapping.is_superseded:
+            return mapping
+
+        with self.__lock:
+            if self.__mapping is None or self.__mapping.is_superseded:
+                self.__mapping = _Mapping(self.__path)
+            return self.__mapping
+
+    @contextmanager
+    def __locked(self) -> "Iterator[_Mapping]":
+        with self.__lock, os.fdopen(
+            os.open(self.__lock_path, os.O_RDWR | os.O_CREAT, 0o600), "r+b"
+        ) as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield self.__get_mapping()
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
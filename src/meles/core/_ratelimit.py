@@ -0,0 +1,146 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from collections import OrderedDict
+from math import ceil
+from threading import Lock
+from time import monotonic, time
+from typing import TYPE_CHECKING
+
+from ._bucket import TokenBucket
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Final
+
+    from falcon import Request, Response  # type: ignore
+    from falcon_caching import Cache  # type: ignore
+
+_MAX_BUCKETS: "Final[int]" = 10000
+_CACHE_PREFIX: "Final[str]" = "ratelimit:"
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        name: str,
+        clock: "Callable[[], float]" = monotonic,
+        wall_clock: "Callable[[], float]" = time,
+    ) -> None:
+        self.__name = name
+        self.__clock = clock
+        self.__wall_clock = wall_clock
+        self.__lock = Lock()
+        self.__rate: float = 0.0
+        self.__burst: float = 0.0
+        self.__cache: "Cache | None" = None
+        self.__buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.__rate > 0
+
+    def configure(
+        self, rate: float, burst: float, cache: "Cache | None" = None
+    ) -> None:
+        with self.__lock:
+            self.__rate = rate
+            self.__burst = max(1.0, burst)
+            self.__cache = cache
+            self.__buckets.clear()
+
+    def try_acquire(self, key: str) -> bool:
+        if self.__rate <= 0:
+            return True
+
+        with self.__lock:
+            if self.__cache is not None:
+                return self.__try_acquire_shared(self.__cache, key)
+
+            return self.__get_bucket(key).try_acquire()
+
+    def retry_after(self) -> int:
+        if self.__rate <= 0:
+            return 0
+
+        return max(1, ceil(1 / self.__rate))
+
+    def __get_bucket(self, key: str) -> "TokenBucket":
+        bucket: "TokenBucket | None" = self.__buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.__rate, self.__burst, self.__clock)
+            self.__buckets[key] = bucket
+            if len(self.__buckets) > _MAX_BUCKETS:
+                self.__buckets.popitem(last=False)
+        else:
+            self.__buckets.move_to_end(key)
+
+        return bucket
+
+    def __try_acquire_shared(self, cache: "Cache", key: str) -> bool:
+        # Reading and writing the state is not atomic across processes,
+        # so concurrent workers may exceed the budget by a few requests.
+        cache_key: str = f"{_CACHE_PREFIX}{self.__name}:{key}"
+        now: float = self.__wall_clock()
+        state: "tuple[float, float] | None" = cache.get(cache_key)
+        tokens: float = self.__burst
+        if state is not None:
+            stored, updated = state
+            tokens = min(self.__burst, stored + max(0.0, now - updated) * self.__rate)
+
+        acquired: bool = tokens >= 1
+        if acquired:
+            tokens -= 1
+
+        cache.set(
+            cache_key,
+            (tokens, now),
+            timeout=ceil(self.__burst / self.__rate) + 1,
+        )
+        return acquired
+
+
+class ClientRateLimitMiddleware:
+    def __init__(
+        self,
+        limiter: "RateLimiter",
+        header: "str | None" = None,
+        trusted_hops: int = 1,
+    ) -> None:
+        self.__limiter = limiter
+        self.__header = header
+        self.__trusted_hops = max(trusted_hops, 1)
+
+    def process_request(self, req: "Request", _: "Response") -> None:
+        client: "str | None" = None
+        if self.__header is not None:
+            value: "str | None" = req.get_header(self.__header)
+            entries: "list[str]" = [
+                entry.strip() for entry in (value or "").split(",") if entry.strip()
+            ]
+            if entries:
+                # Proxies append to the header, so only the entries added by
+                # trusted proxies are counted from the right. Anything left
+                # of them is sent by the client and can be forged.
+                client = entries[max(len(entries) - self.__trusted_hops, 0)]
+
+        req.context.client = client or req.remote_addr
+        req.context.client_limiter = self.__limiter
+
+
+SharedUpstreamRateLimiter: "Final[RateLimiter]" = RateLimiter("upstream")
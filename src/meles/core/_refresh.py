@@ -0,0 +1,201 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging import getLogger
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from ._bucket import TokenBucket
+from ._log import LOGGER_NAME
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Final
+
+    from ._config import ProvidesRefreshConfig
+
+
+@dataclass
+class _RefreshEntry:
+    deadline: float = field()
+    regenerate: "Callable[[], None]" = field()
+
+
+class RefreshScheduler:
+    def __init__(self, clock: "Callable[[], float]" = monotonic) -> None:
+        self.__clock = clock
+        self.__logger = getLogger(LOGGER_NAME)
+        self.__lock = Lock()
+        self.__hits: "dict[str, int]" = {}
+        self.__entries: "dict[str, _RefreshEntry]" = {}
+        self.__in_flight: "set[str]" = set()
+        self.__stopped = Event()
+        self.__thread: "Thread | None" = None
+        self.__pool: "ThreadPoolExecutor | None" = None
+        self.__budget: "TokenBucket | None" = None
+        self.__top_n: int = 0
+        self.__lead_seconds: float = 0
+        self.__last_decay: float = clock()
+
+    @property
+    def is_running(self) -> bool:
+        return self.__pool is not None
+
+    def start(self, settings: "ProvidesRefreshConfig", background: bool = True) -> None:
+        if self.is_running or settings.top_n <= 0:
+            return
+
+        self.__top_n = settings.top_n
+        self.__lead_seconds = settings.lead_seconds
+        self.__budget = TokenBucket(
+            settings.rate, max(1.0, settings.rate), clock=self.__clock
+        )
+        self.__pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.workers), thread_name_prefix="meles-refresh"
+        )
+        self.__stopped.clear()
+        if background:
+            self.__thread = Thread(
+                target=self.__run,
+                args=(settings.interval,),
+                name="meles-refresh-scheduler",
+                daemon=True,
+            )
+            self.__thread.start()
+
+        self.__logger.info(
+            "Refreshing the %i most requested badges %.1f seconds before expiry",
+            self.__top_n,
+            self.__lead_seconds,
+        )
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=True)
+            self.__pool = None
+        with self.__lock:
+            self.__hits.clear()
+            self.__entries.clear()
+            self.__in_flight.clear()
+
+    def record_access(self, key: str) -> None:
+        if not self.is_running:
+            return
+
+        with self.__lock:
+            self.__hits[key] = self.__hits.get(key, 0) + 1
+
+    def register(
+        self, key: str, timeout: "int | None", regenerate: "Callable[[], None]"
+    ) -> None:
+        if not self.is_running or timeout is None or timeout <= 0:
+            return
+
+        with self.__lock:
+            if self.__admit(key):
+                self.__entries[key] = _RefreshEntry(
+                    self.__clock() + timeout, regenerate
+                )
+
+    def run_pending(self) -> None:
+        pool: "ThreadPoolExecutor | None" = self.__pool
+        budget: "TokenBucket | None" = self.__budget
+        if pool is None or budget is None:
+            return
+
+        now: float = self.__clock()
+        due: "list[tuple[str, _RefreshEntry]]" = []
+        with self.__lock:
+            for key, entry in list(self.__entries.items()):
+                if entry.deadline <= now or self.__hits.get(key, 0) <= 0:
+                    del self.__entries[key]
+                elif (
+                    entry.deadline - now <= self.__lead_seconds
+                    and key not in self.__in_flight
+                ):
+                    due.append((key, entry))
+
+            hottest = sorted(due, key=lambda d: self.__hits.get(d[0], 0), reverse=True)
+            self.__decay(now)
+
+        for key, entry in hottest:
+            if not budget.try_acquire():
+                self.__logger.debug("Refresh budget exhausted, postponing refreshes")
+                break
+
+            with self.__lock:
+                self.__in_flight.add(key)
+            pool.submit(self.__refresh, key, entry)
+
+    def __refresh(self, key: str, entry: "_RefreshEntry") -> None:
+        try:
+            self.__logger.debug("Refreshing cache entry '%s'", key)
+            entry.regenerate()
+        except Exception as exc:  # pylint: disable=W0703
+            self.__logger.warning(
+                "Failed to refresh cache entry '%s'", key, exc_info=exc
+            )
+            with self.__lock:
+                if self.__entries.get(key) is entry:
+                    del self.__entries[key]
+        finally:
+            with self.__lock:
+                self.__in_flight.discard(key)
+
+    def __admit(self, key: str) -> bool:
+        # Only the most requested badges are kept, so the number of refreshes
+        # depends on top_n instead of the number of distinct badges.
+        hits: int = self.__hits.get(key, 0)
+        if hits <= 0:
+            self.__entries.pop(key, None)
+            return False
+
+        if key in self.__entries or len(self.__entries) < self.__top_n:
+            return True
+
+        coldest: str = min(self.__entries, key=lambda k: self.__hits.get(k, 0))
+        if self.__hits.get(coldest, 0) >= hits:
+            return False
+
+        del self.__entries[coldest]
+        return True
+
+    def __decay(self, now: float) -> None:
+        # Halve all counters once a minute, so only recent popularity counts
+        if now - self.__last_decay < 60:
+            return
+
+        self.__last_decay = now
+        self.__hits = {k: v // 2 for k, v in self.__hits.items() if v > 1}
+
+    def __run(self, interval: float) -> None:
+        while not self.__stopped.wait(interval):
+            try:
+                self.run_pending()
+            except Exception as exc:  # pylint: disable=W0703
+                self.__logger.warning("Refresh scheduling failed", exc_info=exc)
+
+
+SharedRefreshScheduler: "Final[RefreshScheduler]" = RefreshScheduler()
@@ -0,0 +1,268 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import atexit
+import fcntl
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Event, Lock, Thread
+from time import time
+from typing import TYPE_CHECKING, Protocol
+
+from ._log import LOGGER_NAME
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Final, Iterator
+
+    from falcon_caching import Cache  # type: ignore
+
+
+_MAGIC: "Final[bytes]" = b"MELESSN1"
+_HEADER: "Final[struct.Struct]" = struct.Struct("<8sI")
+_ENTRY: "Final[struct.Struct]" = struct.Struct("<HIdQI")
+
+
+class SnapshotSection(Protocol):
+    def dump_entries(self) -> "Iterator[tuple[str, float, bytes]]":
+        ...
+
+    def restore_entry(self, key: str, expires: float, payload: "memoryview") -> None:
+        ...
+
+
+_sections: "dict[str, SnapshotSection]" = {}
+
+
+def register_snapshot_section(name: str, section: "SnapshotSection") -> None:
+    _sections[name] = section
+
+
+class _SimpleCacheSection:
+    def __init__(self, cache: "Cache") -> None:
+        self.__backend = cache.cache
+
+    @property
+    def is_supported(self) -> bool:
+        return isinstance(getattr(self.__backend, "_cache", None), dict)
+
+    def dump_entries(self) -> "Iterator[tuple[str, float, bytes]]":
+        now: float = time()
+        for key, (expires, value) in list(self.__backend._cache.items()):
+            if expires == 0 or expires > now:
+                yield key, float(expires), bytes(value)
+
+    def restore_entry(self, key: str, expires: float, payload: "memoryview") -> None:
+        # The simple backend keeps pickled values and unpickles them on
+        # access, so the mapped bytes can be handed over without decoding.
+        self.__backend._cache.setdefault(key, (expires, payload))
+
+
+class CacheSnapshot:
+    def __init__(self, path: "Path") -> None:
+        self.__path = path
+        self.__logger = getLogger(LOGGER_NAME)
+        self.__lock = Lock()
+        self.__stopped = Event()
+        self.__mapped: "mmap.mmap | None" = None
+
+    @property
+    def path(self) -> "Path":
+        return self.__path
+
+    def save(self, cache: "Cache") -> int:
+        sections: "dict[str, SnapshotSection]" = self.__get_sections(cache)
+        entries: "list[tuple[str, str, float, bytes | memoryview]]" = [
+            (name, key, expires, payload)
+            for name, section in sections.items()
+            for key, expires, payload in section.dump_entries()
+        ]
+
+        with self.__lock, self.__locked_file():
+            # Every worker only holds its own entries. Those of the other
+            # workers are kept from the previous snapshot, unless they expired.
+            merged: int = self.__merge_previous(entries)
+            self.__write(entries)
+
+        self.__logger.info(
+            "Saved %i cache entries to %s, %i of them from the previous snapshot",
+            len(entries),
+            self.__path,
+            merged,
+        )
+        return len(entries)
+
+    def load(self, cache: "Cache") -> int:
+        sections: "dict[str, SnapshotSection]" = self.__get_sections(cache)
+        mapped: "mmap.mmap | None" = self.__map()
+        if mapped is None:
+            return 0
+
+        now: float = time()
+        restored: int = 0
+        for name, key, expires, payload in _read_entries(memoryview(mapped)):
+            section: "SnapshotSection | None" = sections.get(name)
+            if section is None or (expires != 0 and expires <= now):
+                continue
+            section.restore_entry(key, expires, payload)
+            restored += 1
+
+        # Restored entries reference the mapping, so it has to stay open.
+        self.__mapped = mapped
+        self.__logger.info("Restored %i cache entries from %s", restored, self.__path)
+        return restored
+
+    def __map(self) -> "mmap.mmap | None":
+        if not self.__path.is_file() or self.__path.stat().st_size < _HEADER.size:
+            return None
+
+        with open(self.__path, "rb") as snapshot_file:
+            mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if _HEADER.unpack_from(mapped, 0)[0] != _MAGIC:
+            self.__logger.warning("%s is not a meles cache snapshot", self.__path)
+            mapped.close()
+            return None
+
+        return mapped
+
+    def __merge_previous(
+        self, entries: "list[tuple[str, str, float, bytes | memoryview]]"
+    ) -> int:
+        if not self.__path.is_file():
+            return 0
+
+        # Read into memory rather than mapped, as the file is replaced below.
+        previous: bytes = self.__path.read_bytes()
+        if len(previous) < _HEADER.size or previous[: len(_MAGIC)] != _MAGIC:
+            return 0
+
+        now: float = time()
+        known: "set[tuple[str, str]]" = {(name, key) for name, key, _, _ in entries}
+        merged: int = 0
+        for name, key, expires, payload in _read_entries(memoryview(previous)):
+            if (name, key) in known or (expires != 0 and expires <= now):
+                continue
+            entries.append((name, key, expires, payload))
+            merged += 1
+        return merged
+
+    def __write(
+        self, entries: "list[tuple[str, str, float, bytes | memoryview]]"
+    ) -> None:
+        index: "list[bytes]" = []
+        offset: int = 0
+        for name, key, expires, payload in entries:
+            encoded_name = name.encode("utf-8")
+            encoded_key = key.encode("utf-8")
+            index.append(
+                _ENTRY.pack(
+                    len(encoded_name),
+                    len(encoded_key),
+                    expires,
+                    offset,
+                    len(payload),
+                )
+                + encoded_name
+                + encoded_key
+            )
+            offset += len(payload)
+
+        with NamedTemporaryFile(
+            "wb", dir=self.__path.parent, prefix=self.__path.name, delete=False
+        ) as snapshot_file:
+            snapshot_file.write(_HEADER.pack(_MAGIC, len(index)))
+            snapshot_file.write(b"".join(index))
+            for _, _, _, payload in entries:
+                snapshot_file.write(payload)
+        os.replace(snapshot_file.name, self.__path)
+
+    @contextmanager
+    def __locked_file(self) -> "Iterator[None]":
+        # Serializes the workers of a host, which share the snapshot path.
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path: "Path" = self.__path.with_name(self.__path.name + ".lock")
+        with open(lock_path, "a+b") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def start(self, cache: "Cache", interval: float = 0) -> None:
+        atexit.register(self.__save_quietly, cache)
+        if interval > 0:
+            Thread(
+                target=self.__run,
+                args=(cache, interval),
+                name="meles-cache-snapshot",
+                daemon=True,
+            ).start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+
+    def __run(self, cache: "Cache", interval: float) -> None:
+        while not self.__stopped.wait(interval):
+            self.__save_quietly(cache)
+
+    def __save_quietly(self, cache: "Cache") -> None:
+        try:
+            self.save(cache)
+        except Exception as exc:  # pylint: disable=W0703
+            self.__logger.warning(
+                "Failed to save cache snapshot to %s", self.__path, exc_info=exc
+            )
+
+    def __get_sections(self, cache: "Cache") -> "dict[str, SnapshotSection]":
+        sections: "dict[str, SnapshotSection]" = dict(_sections)
+        cache_section = _SimpleCacheSection(cache)
+        if cache_section.is_supported:
+            sections["cache"] = cache_section
+        else:
+            self.__logger.debug(
+                "Cache type %s cannot be snapshot", type(cache.cache).__name__
+            )
+        return sections
+
+
+def _read_entries(
+    view: "memoryview",
+) -> "Iterator[tuple[str, str, float, memoryview]]":
+    _, count = _HEADER.unpack_from(view, 0)
+    position: int = _HEADER.size
+    entries: "list[tuple[str, str, float, int, int]]" = []
+    for _ in range(count):
+        name_length, key_length, expires, offset, length = _ENTRY.unpack_from(
+            view, position
+        )
+        position += _ENTRY.size
+        name = bytes(view[position : position + name_length]).decode("utf-8")
+        position += name_length
+        key = bytes(view[position : position + key_length]).decode("utf-8")
+        position += key_length
+        entries.append((name, key, expires, offset, length))
+
+    for name, key, expires, offset, length in entries:
+        start = position + offset
+        yield name, key, expires, view[start : start + length]
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Iterable
+
+_IMPORT_TIME_PREFIX: str = "import time:"
+
+# Runs in a fresh interpreter, so that no module has been imported yet.
+_STARTUP_SCRIPT: str = """
+import json, time
+started = time.perf_counter()
+from {module} import get_app
+imported = time.perf_counter()
+get_app()
+created = time.perf_counter()
+print(json.dumps([imported - started, created - imported]))
+"""
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str = field()
+    self_seconds: float = field()
+    cumulative_seconds: float = field()
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".", 1)[0]
+
+
+@dataclass(frozen=True)
+class StartupReport:
+    import_seconds: float = field()
+    app_seconds: float = field()
+    imports: "list[ImportTime]" = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        return self.import_seconds + self.app_seconds
+
+    def get_packages(self) -> "list[tuple[str, float]]":
+        packages: "dict[str, float]" = {}
+        for entry in self.imports:
+            packages[entry.package] = (
+                packages.get(entry.package, 0.0) + entry.self_seconds
+            )
+        return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+    def format(self, top_n: int = 15) -> str:
+        lines: "list[str]" = [
+            f"{'total':<40} {self.total_seconds * 1000:>10.1f} ms",
+            f"{'imports':<40} {self.import_seconds * 1000:>10.1f} ms",
+            f"{'get_app':<40} {self.app_seconds * 1000:>10.1f} ms",
+            "",
+            f"{'package':<40} {'self':>13}",
+        ]
+        for package, seconds in self.get_packages()[:top_n]:
+            lines.append(f"{package:<40} {seconds * 1000:>10.1f} ms")
+
+        lines += ["", f"{'module':<40} {'cumulative':>13}"]
+        slowest = sorted(
+            self.imports, key=lambda item: item.cumulative_seconds, reverse=True
+        )
+        for entry in slowest[:top_n]:
+            lines.append(
+                f"{entry.module:<40} {entry.cumulative_seconds * 1000:>10.1f} ms"
+            )
+
+        return "\n".join(lines)
+
+
+def parse_import_times(lines: "Iterable[str]") -> "list[ImportTime]":
+    result: "list[ImportTime]" = []
+    for line in lines:
+        if not line.startswith(_IMPORT_TIME_PREFIX):
+            continue
+
+        columns = line[len(_IMPORT_TIME_PREFIX) :].split("|")
+        if len(columns) != 3 or not columns[0].strip().isdigit():
+            # The header line
+            continue
+
+        result.append(
+            ImportTime(
+                columns[2].strip(),
+                int(columns[0]) / 1000000,
+                int(columns[1]) / 1000000,
+            )
+        )
+
+    return result
+
+
+def measure_startup(module: str = "meles.app") -> "StartupReport":
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _STARTUP_SCRIPT.format(module=module),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_seconds, app_seconds = json.loads(completed.stdout.splitlines()[-1])
+
+    return StartupReport(
+        import_seconds, app_seconds, parse_import_times(completed.stderr.splitlines())
+    )
@@ -33,7 +33,9 @@ if TYPE_CHECKING:  # pragma: no cover
     from .core import SupportsResources
 
 
-_all_sources: "_SourcesCollection" = _SourcesCollection(_custom_sources)
+_all_sources: "_SourcesCollection" = _SourcesCollection(
+    _custom_sources, "meles.backends"
+)
 
 
 _DEFAULT_NUGET_FEED_V3_URL = "https://api.nuget.org/v3/index.json"
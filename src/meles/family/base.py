@@ -28,7 +28,7 @@ if TYPE_CHECKING:  # pragma: no cover
 
     from falcon_caching import Cache  # type: ignore
 
-    from ..core import RequestHandler, SupportsFalconGetRequest
+    from ..core import HasConfigItems, RequestHandler, SupportsFalconGetRequest
 
 
 class FamilyBase(ABC):
@@ -38,5 +38,6 @@ class FamilyBase(ABC):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ) -> "Iterator[SupportsFalconGetRequest]":
         ...
@@ -25,24 +25,26 @@ from ..resources.custom import CustomBackendBadgeResource
 from .base import FamilyBase
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Iterator
+    from typing import Iterator, Mapping
 
     from falcon_caching import Cache  # type: ignore
 
-    from ..core import RequestHandler, SupportsFalconGetRequest
+    from ..core import HasConfigItems, RequestHandler, SupportsFalconGetRequest
 
     from ..sources.custom.base import CustomBackendSource
 
 
 class CustomFamily(FamilyBase):
-    def __init__(self, backends: "dict[str, CustomBackendSource]") -> None:
+    def __init__(self, backends: "Mapping[str, CustomBackendSource]") -> None:
         self.__backends = backends
-    
 
     def get_resources(
         self,
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ) -> "Iterator[SupportsFalconGetRequest]":
-        yield CustomBackendBadgeResource(self.__backends, cache, generator_class, request_handler_class)
+        yield CustomBackendBadgeResource(
+            self.__backends, cache, generator_class, request_handler_class, cfg=cfg
+        )
@@ -33,7 +33,12 @@ if TYPE_CHECKING:  # pragma: no cover
 
     from falcon_caching import Cache  # type: ignore
 
-    from ..core import RequestHandler, SupportsFalconGetRequest, UrlSourceBase
+    from ..core import (
+        HasConfigItems,
+        RequestHandler,
+        SupportsFalconGetRequest,
+        UrlSourceBase,
+    )
 
 
 class NugetFamily(FamilyBase):
@@ -45,13 +50,14 @@ class NugetFamily(FamilyBase):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ) -> "Iterator[SupportsFalconGetRequest]":
         yield LatestPreviewPackageVersionNugetBadgeResource(
-            self.__url, cache, generator_class, request_handler_class
+            self.__url, cache, generator_class, request_handler_class, cfg
         )
         yield LatestStablePackageVersionNugetBadgeResource(
-            self.__url, cache, generator_class, request_handler_class
+            self.__url, cache, generator_class, request_handler_class, cfg
         )
         yield PackageDownloadsNugetBadgeResource(
-            self.__url, cache, generator_class, request_handler_class
+            self.__url, cache, generator_class, request_handler_class, cfg
         )
@@ -36,7 +36,7 @@ if TYPE_CHECKING:  # pragma: no cover
 
     from falcon_caching import Cache  # type: ignore
 
-    from ..core import RequestHandler, SupportsFalconGetRequest
+    from ..core import HasConfigItems, RequestHandler, SupportsFalconGetRequest
 
 
 class ShieldFamily(FamilyBase):
@@ -45,10 +45,19 @@ class ShieldFamily(FamilyBase):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ) -> "Iterator[SupportsFalconGetRequest]":
-        yield ShieldResource(cache, generator_class)
-        yield EndpointResource(cache, generator_class, request_handler_class)
-        yield DynamicXmlBadgeResource(cache, generator_class, request_handler_class)
-        yield DynamicJsonBadgeResource(cache, generator_class, request_handler_class)
-        yield DynamicTomlBadgeResource(cache, generator_class, request_handler_class)
-        yield DynamicYamlBadgeResource(cache, generator_class, request_handler_class)
+        yield ShieldResource(cache, generator_class, cfg=cfg)
+        yield EndpointResource(cache, generator_class, request_handler_class, cfg)
+        yield DynamicXmlBadgeResource(
+            cache, generator_class, request_handler_class, cfg
+        )
+        yield DynamicJsonBadgeResource(
+            cache, generator_class, request_handler_class, cfg
+        )
+        yield DynamicTomlBadgeResource(
+            cache, generator_class, request_handler_class, cfg
+        )
+        yield DynamicYamlBadgeResource(
+            cache, generator_class, request_handler_class, cfg
+        )
@@ -20,6 +20,7 @@
 
 from .base import BadgeResourceBase
 from .common import AllResources, HealthResource, PrometheusMiddleware, SystemResource
+from .debug import MemoryResource, ProfileResource, RequestProfiler
 
 __all__ = [
     "AllResources",
@@ -27,4 +28,7 @@ __all__ = [
     "HealthResource",
     "SystemResource",
     "PrometheusMiddleware",
+    "MemoryResource",
+    "ProfileResource",
+    "RequestProfiler",
 ]
@@ -22,6 +22,7 @@ import logging
 import traceback
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from http import HTTPStatus
 from typing import TYPE_CHECKING, cast
 
 import falcon  # type: ignore
@@ -30,13 +31,18 @@ from falcon_caching import Cache  # type: ignore
 from ..core import (
     LOGGER_NAME,
     BadgeData,
+    BadgeProcessingError,
+    LoadSheddingError,
     Color,
     ColorValues,
     Generator,
     Icons,
+    BadgeMetrics,
     ProcessingError,
+    RefreshScheduler,
     SharedCache,
-    config,
+    SharedMetrics,
+    SharedRefreshScheduler,
 )
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -44,7 +50,25 @@ if TYPE_CHECKING:  # pragma: no cover
 
     from falcon import Request, Response  # type: ignore
 
-    from ..core import SupportsFalconGetRequest
+    from ..core import (
+        AdmissionController,
+        HasConfigItems,
+        ProvidesAdmissionConfig,
+        ProvidesNegativeCacheConfig,
+        ProvidesRateLimitConfig,
+        RateLimiter,
+        SupportsFalconGetRequest,
+    )
+
+
+_NEGATIVE_CACHE_PREFIX: "Final[str]" = "error:"
+_STALE_CACHE_PREFIX: "Final[str]" = "stale:"
+_BADGE_CONTENT_TYPE: "Final[str]" = "image/svg+xml"
+# Overload and timeouts pass quickly and are not cached as errors, just like
+# requests that were shed.
+_TRANSIENT_STATUSES: "Final[frozenset[int]]" = frozenset(
+    (HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.GATEWAY_TIMEOUT)
+)
 
 
 class BadgeResourceBase(ABC):
@@ -52,10 +76,30 @@ class BadgeResourceBase(ABC):
         self,
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
+        refresh_scheduler: "RefreshScheduler" = SharedRefreshScheduler,
+        negative_cache: "ProvidesNegativeCacheConfig | None" = None,
+        metrics: "BadgeMetrics" = SharedMetrics,
+        admission: "ProvidesAdmissionConfig | None" = None,
+        rate_limit: "ProvidesRateLimitConfig | None" = None,
+        cfg: "HasConfigItems | None" = None,
     ):
         self.__generator = generator_class()
         self.__logger = logging.getLogger(LOGGER_NAME)
         self.__cache = cache
+        self.__refresh_scheduler = refresh_scheduler
+        # Sections that are neither given nor part of the configuration of
+        # the app disable negative caching and stale badges.
+        self.__negative_cache: "ProvidesNegativeCacheConfig | None" = (
+            negative_cache or (cfg.negative_cache if cfg is not None else None)
+        )
+        self.__metrics = metrics
+        self.__admission: "ProvidesAdmissionConfig | None" = admission or (
+            cfg.admission if cfg is not None else None
+        )
+        self.__rate_limit: "ProvidesRateLimitConfig | None" = rate_limit or (
+            cfg.rate_limit if cfg is not None else None
+        )
+        self.__route = self.__class__.__name__
 
     @property
     @abstractmethod
@@ -66,40 +110,184 @@ class BadgeResourceBase(ABC):
     def _logger(self) -> "logging.Logger":
         return self.__logger
 
+    @property
+    def _metrics(self) -> "BadgeMetrics":
+        return self.__metrics
+
+    @property
+    def _cache(self) -> "Cache":
+        return self.__cache
+
+    def _get_default_timeout(self, request: "dict[str, Any]") -> "int | None":
+        return None
+
     def on_get(self, req: "Request", resp: "Response", **kwargs: "Any") -> None:
+        query: "dict[str, Any]" = req.params
+        cache_key: str = self.__get_cache_key(req.path, query)
         try:
             reply: str
-            query: "dict[str, Any]" = req.params
-            cache_key: str = self.__get_cache_key(req.path, query)
-            if self.__cache.has(cache_key):
+            self.__refresh_scheduler.record_access(cache_key)
+            cached_error: "tuple[int, str, str] | None" = self.__get_cached_error(
+                cache_key
+            )
+            if cached_error is not None:
+                self.__logger.info(
+                    "Processing request '%s' from cached error using cache key '%s'",
+                    req.url,
+                    cache_key,
+                )
+                self.__metrics.count_cache_result(self.__route, "error")
+                status, text, content_type = cached_error
+                resp.status = falcon.code_to_http_status(status)
+                resp.text = text
+                resp.set_header("Content-Type", content_type)
+                return
+
+            cached: "str | None"
+            with self.__metrics.stage(self.__route, "cache_lookup"):
+                cached = self.__cache.get(cache_key)
+
+            if cached is not None:
+                self.__metrics.count_cache_result(self.__route, "hit")
                 self.__logger.info(
                     "Processing request '%s' from cache using cache key '%s'",
                     req.url,
                     cache_key,
                 )
-                reply = self.__cache.get(cache_key)
+                reply = cached
             else:
                 self.__logger.info(
                     "Processing request '%s' as new request using cache key '%s'",
                     req.url,
                     cache_key,
                 )
-                reply = self.__generate_badge_from_request(cache_key, req, **kwargs)
+                result: str = "miss"
+                try:
+                    reply = self.__generate_admitted_badge(cache_key, req, **kwargs)
+                except LoadSheddingError as shed:
+                    stale: "str | None" = self.__get_stale_badge(
+                        cache_key, req, shed.reason
+                    )
+                    if stale is None:
+                        resp.status = falcon.code_to_http_status(shed.status)
+                        resp.text = shed.message
+                        resp.set_header("Content-Type", "text/plain")
+                        resp.set_header("Retry-After", str(shed.retry_after))
+                        return
+
+                    result = "stale"
+                    reply = stale
+                finally:
+                    self.__metrics.count_cache_result(self.__route, result)
 
             resp.text = reply
             resp.status = falcon.HTTP_200
-            resp.set_header("Content-Type", "image/xvg+xml")
+            resp.set_header("Content-Type", _BADGE_CONTENT_TYPE)
         except Exception as exc:  # pylint: disable=W0703
             self.__logger.exception(
                 "Failed to process request '%s'", req.url, exc_info=exc
             )
             resp.status = falcon.HTTP_500
-            if isinstance(exc, ProcessingError):
+            if isinstance(exc, BadgeProcessingError):
+                resp.status = falcon.code_to_http_status(exc.status)
+                resp.text = self.__generator.transform(exc.badge)
+                resp.set_header("Content-Type", _BADGE_CONTENT_TYPE)
+                self.__cache_error(
+                    cache_key, int(exc.status), resp.text, _BADGE_CONTENT_TYPE
+                )
+            elif isinstance(exc, ProcessingError):
                 trace_back = traceback.format_exception(exc)
                 processing_error = cast("ProcessingError", exc)
-                resp.status = falcon.code_to_http_status(processing_error.status_code)
+                resp.status = falcon.code_to_http_status(processing_error.status)
                 resp.text = processing_error.message + "\n" + "\n".join(trace_back)
                 resp.set_header("Content-Type", "text/plain")
+                self.__cache_error(
+                    cache_key, int(processing_error.status), resp.text, "text/plain"
+                )
+
+    def __generate_admitted_badge(
+        self, cache_key: str, req: "Request", **kwargs: "Any"
+    ) -> str:
+        limiter: "RateLimiter | None" = getattr(req.context, "client_limiter", None)
+        if limiter is not None and not limiter.try_acquire(req.context.client):
+            raise LoadSheddingError(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                "Too many requests for badges not cached",
+                "client",
+                limiter.retry_after(),
+            )
+
+        admission: "AdmissionController | None" = getattr(
+            req.context, "admission", None
+        )
+        if admission is None:
+            return self.__generate_badge_from_request(cache_key, req, **kwargs)
+
+        with admission.admit() as admitted:
+            if admitted:
+                return self.__generate_badge_from_request(cache_key, req, **kwargs)
+
+        raise LoadSheddingError(
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            "Too many requests for badges not cached",
+            "admission",
+            admission.retry_after,
+        )
+
+    def __get_stale_badge(
+        self, cache_key: str, req: "Request", reason: str
+    ) -> "str | None":
+        stale: "str | None" = self.__cache.get(_STALE_CACHE_PREFIX + cache_key)
+        if stale is None:
+            self.__logger.warning("Rejected request '%s' (%s)", req.url, reason)
+            self.__metrics.count_shed(self.__route, reason, "rejected")
+        else:
+            self.__logger.warning(
+                "Answered request '%s' with stale badge (%s)", req.url, reason
+            )
+            self.__metrics.count_shed(self.__route, reason, "stale")
+
+        return stale
+
+    @property
+    def __keeps_stale_badges(self) -> bool:
+        if self.__admission is None:
+            return False
+
+        if self.__admission.max_in_flight > 0:
+            return True
+
+        return self.__rate_limit is not None and (
+            self.__rate_limit.client_rate > 0 or self.__rate_limit.upstream_rate > 0
+        )
+
+    def __get_cached_error(self, cache_key: str) -> "tuple[int, str, str] | None":
+        if self.__negative_cache is None or (
+            self.__negative_cache.client_error_ttl <= 0
+            and self.__negative_cache.server_error_ttl <= 0
+        ):
+            return None
+
+        return self.__cache.get(_NEGATIVE_CACHE_PREFIX + cache_key)
+
+    def __cache_error(
+        self, cache_key: str, status: int, text: str, content_type: str
+    ) -> None:
+        if self.__negative_cache is None or status in _TRANSIENT_STATUSES:
+            return
+
+        timeout: int = 0
+        if 400 <= status < 500:
+            timeout = self.__negative_cache.client_error_ttl
+        elif status >= 500:
+            timeout = self.__negative_cache.server_error_ttl
+
+        if timeout > 0:
+            self.__cache.set(
+                _NEGATIVE_CACHE_PREFIX + cache_key,
+                (status, text, content_type),
+                timeout=timeout,
+            )
 
     def __generate_badge_from_request(
         self, cache_key: str, req: "Request", **kwargs: "Any"
@@ -107,19 +295,50 @@ class BadgeResourceBase(ABC):
         document: "dict[str, Any]" = {}
         headers: "dict[str, Any]" = req.headers
         query: "dict[str, Any]" = req.params
+        timeout: "int | None" = None
         if "cacheSeconds" in query:
             timeout = int(query.pop("cacheSeconds"))
-        else:
-            timeout = None
         data: "dict[str, Any]" = {}
         data.update(headers)
         data.update(query)
         data.update(document)
         data.update(kwargs)
-        badge: BadgeData = self._process_badge_request(data)
+        if timeout is None:
+            timeout = self._get_default_timeout(data)
+        # The cache key does not depend on headers, so refreshes do without
+        # them and do not keep the headers of a client alive.
+        refresh_data: "dict[str, Any]" = {**query, **document, **kwargs}
+        return self.__render_badge(cache_key, data, timeout, refresh_data)
+
+    def __render_badge(
+        self,
+        cache_key: str,
+        data: "dict[str, Any]",
+        timeout: "int | None",
+        refresh_data: "dict[str, Any]",
+    ) -> str:
+        badge: BadgeData
+        with self.__metrics.stage(self.__route, "process"):
+            badge = self._process_badge_request(data)
         self.__logger.debug("Will try to generate te following badge: %s", badge)
-        reply: str = self.__generator.transform(badge)
-        self.__cache.set(cache_key, reply, timeout=timeout)
+        reply: str
+        with self.__metrics.stage(self.__route, "render"):
+            reply = self.__generator.transform(badge)
+        with self.__metrics.stage(self.__route, "cache_write"):
+            self.__cache.set(cache_key, reply, timeout=timeout)
+            if self.__admission is not None and self.__keeps_stale_badges:
+                self.__cache.set(
+                    _STALE_CACHE_PREFIX + cache_key,
+                    reply,
+                    timeout=self.__admission.stale_seconds,
+                )
+        self.__refresh_scheduler.register(
+            cache_key,
+            timeout
+            if timeout is not None
+            else self.__cache.config.get("CACHE_DEFAULT_TIMEOUT"),
+            lambda: self.__render_badge(cache_key, refresh_data, timeout, refresh_data),
+        )
         return reply
 
     @abstractmethod
@@ -150,7 +369,9 @@ class BadgeRequestObject:
             logo_color=data.get("logoColor"),
             label=data.get("label"),
             color=data.get("color"),
-            cache_seconds=int(str(data.get("cacheSeconds") or "")),
+            cache_seconds=(
+                int(str(data["cacheSeconds"])) if data.get("cacheSeconds") else None
+            ),
             style=data.get("style"),
             message=data.get("message"),
         )
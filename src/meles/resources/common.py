@@ -23,7 +23,8 @@ from typing import TYPE_CHECKING
 
 import falcon  # type: ignore
 import falcon_prometheus  # type: ignore
-from prometheus_client import generate_latest  # type: ignore
+
+from ..core import SharedMetrics, generate_metrics
 
 if TYPE_CHECKING:  # pragma: no cover
     from typing import Callable, Iterable
@@ -31,7 +32,7 @@ if TYPE_CHECKING:  # pragma: no cover
     from falcon import Request, Response
     from falcon.inspect import RouteInfo  # type: ignore
 
-    from ..core import SupportsFalconGetRequest
+    from ..core import BadgeMetrics, SupportsFalconGetRequest
 
 
 class AllResources:
@@ -80,7 +81,18 @@ class HealthResource:
 
 
 class PrometheusMiddleware(falcon_prometheus.PrometheusMiddleware):
+    def __init__(
+        self,
+        metrics: "BadgeMetrics" = SharedMetrics,
+        multiprocess_directory: "str | None" = None,
+    ) -> None:
+        super().__init__()
+        self.__metrics = metrics
+        self.__multiprocess_directory = multiprocess_directory
+
     def on_get(self, req, resp):
-        data = generate_latest(self.registry)
+        data = generate_metrics(
+            [self.registry, self.__metrics.registry], self.__multiprocess_directory
+        )
         resp.content_type = "text/plain; version=0.0.4; charset=utf-8"
         resp.text = str(data.decode("utf-8"))
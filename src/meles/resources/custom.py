@@ -17,70 +17,251 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
-
 import http
-from typing import TYPE_CHECKING, Any
+from threading import Lock
+from typing import TYPE_CHECKING, Any, TypeVar
 
-from .base import BadgeRequestObject, BadgeResourceBase
+from .base import BadgeResourceBase
+from ..sources.custom.base import AsyncCustomBackendSource
 from ..core import (
     BadgeData,
+    BadgeMetrics,
+    BadgeProcessingError,
+    BoundedExecutor,
     Color,
+    ColorValues,
+    Generator,
     ProcessingError,
-    Generator, 
-    SharedCache, 
+    SharedBackgroundLoop,
+    SharedCache,
+    SharedMetrics,
     Urllib3RequestHandler,
+    current_deadline,
+    deadline_scope,
 )
 
 
-if TYPE_CHECKING:
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future
+    from typing import Final, Mapping
+
     from falcon_caching import Cache  # type: ignore
 
-    from ..core import RequestHandler, SupportsFalconGetRequest
+    from ..core import (
+        BackgroundLoop,
+        Deadline,
+        HasConfigItems,
+        Icon,
+        ProvidesCustomBackendConfig,
+        RequestHandler,
+    )
+    from ..sources.custom.base import CustomBackendSource
 
-    from ..core import Icon
-    from ..source.custom.base import CustomBackendSource  # type: ignore
+T = TypeVar("T")
+
+_RESULT_CACHE_PREFIX: "Final[str]" = "backend:"
 
 
 class CustomBackendBadgeResource(BadgeResourceBase):
-    def __init__(self, 
-                backends: "dict[str, CustomBackendSource]",
-                cache: "Cache" = SharedCache,
-                generator_class: "type[Generator]" = Generator,
-                request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
-        ) -> None:
+    def __init__(
+        self,
+        backends: "Mapping[str, CustomBackendSource]",
+        cache: "Cache" = SharedCache,
+        generator_class: "type[Generator]" = Generator,
+        request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        settings: "ProvidesCustomBackendConfig | None" = None,
+        metrics: "BadgeMetrics" = SharedMetrics,
+        loop: "BackgroundLoop" = SharedBackgroundLoop,
+        cfg: "HasConfigItems | None" = None,
+    ) -> None:
+        super().__init__(cache, generator_class, metrics=metrics, cfg=cfg)
+        custom_backend: "ProvidesCustomBackendConfig | None" = settings or (
+            cfg.custom_backend if cfg is not None else None
+        )
+        if custom_backend is None:
+            raise ValueError("Custom backends require the custom backend settings")
+
         self.__backends = backends
-    
+        self.__settings = custom_backend
+        self.__loop = loop
+        self.__executors: "dict[str, BoundedExecutor]" = {}
+        self.__executors_lock = Lock()
+
     @property
     def route_template(self) -> str:
         return "/custom/backend/{backendName}"
-    
+
     def _process_badge_request(self, request: "dict[str, Any]") -> "BadgeData":
         backend_name: str = request.get("backendName", None)
-        if backend_name is None or backend_name not in self.__backends:
+        # Backends are created on their first request; a backend that fails
+        # to load is reported as unknown.
+        backend: "CustomBackendSource | None" = (
+            self.__backends.get(backend_name) if backend_name is not None else None
+        )
+        if backend is None:
             raise ProcessingError(
                 http.HTTPStatus.NOT_FOUND, f"Unknown backend: {backend_name}"
             )
-        
-        try:
-            backend: "CustomBackendSource" = self.__backends[backend_name]
-            label: str = backend.label
-            color_name: "str | None" = request.get("color", None)
-            color: "Color" = (
-                Color.from_str(color_name)
-                if color_name is not None
-                else backend.default_color
-            ) or backend.default_color
-            icon: "Icon | None" = backend.icon
-
-            text: str = backend.process(request)
-            
-            return BadgeData(
-                label=label,
-                color=color,
-                text=text,
-                icon=icon,
+        label: str = backend.label
+        color_name: "str | None" = request.get("color", None)
+        color: "Color" = (
+            Color.from_str(color_name)
+            if color_name is not None
+            else backend.default_color
+        ) or backend.default_color
+        icon: "Icon | None" = backend.icon
+
+        text: str = self.__get_result(backend_name, backend, request)
+
+        return BadgeData(
+            label=label,
+            color=color,
+            text=text,
+            icon=icon,
+        )
+
+    def _get_default_timeout(self, request: "dict[str, Any]") -> "int | None":
+        backend: "CustomBackendSource | None" = self.__backends.get(
+            request.get("backendName", "")
+        )
+        return backend.cache_ttl if backend is not None else None
+
+    def __get_executor(
+        self, backend_name: str, backend: "CustomBackendSource"
+    ) -> "BoundedExecutor":
+        executor: "BoundedExecutor | None" = self.__executors.get(backend_name)
+        if executor is None:
+            with self.__executors_lock:
+                executor = self.__executors.get(backend_name)
+                if executor is None:
+                    executor = BoundedExecutor(
+                        backend_name,
+                        _get_setting(
+                            backend.max_concurrency, self.__settings.max_concurrency
+                        ),
+                        _get_setting(backend.queue_depth, self.__settings.queue_depth),
+                    )
+                    self.__executors[backend_name] = executor
+
+        return executor
+
+    def __get_result(
+        self,
+        backend_name: str,
+        backend: "CustomBackendSource",
+        request: "dict[str, Any]",
+    ) -> str:
+        key: "str | None" = backend.cache_key(request)
+        if key is None:
+            return self.__call_backend(backend_name, backend, request)
+
+        result_key: str = f"{_RESULT_CACHE_PREFIX}{backend_name}:{key}"
+        cached: "str | None" = self._cache.get(result_key)
+        if cached is not None:
+            self.__count(self.__get_executor(backend_name, backend), "cached")
+            return cached
+
+        text: str = self.__call_backend(backend_name, backend, request)
+        self._cache.set(result_key, text, timeout=backend.cache_ttl)
+        return text
+
+    def __call_backend(
+        self,
+        backend_name: str,
+        backend: "CustomBackendSource",
+        request: "dict[str, Any]",
+    ) -> str:
+        executor: "BoundedExecutor" = self.__get_executor(backend_name, backend)
+        timeout: float = _get_setting(backend.timeout, self.__settings.timeout)
+        deadline: "Deadline | None" = current_deadline()
+        if deadline is not None:
+            timeout = deadline.limit(timeout, f"calling backend {backend_name}")
+
+        future: "Future[str] | None"
+        if isinstance(backend, AsyncCustomBackendSource):
+            future = executor.submit_coroutine(
+                lambda: self.__run_async_backend(
+                    backend_name, backend, request, deadline
+                ),
+                self.__loop,
+            )
+        else:
+            future = executor.submit(
+                lambda: self.__run_backend(backend_name, backend, request, deadline)
             )
+        if future is None:
+            self.__count(executor, "rejected")
+            raise BadgeProcessingError(
+                http.HTTPStatus.SERVICE_UNAVAILABLE,
+                f"Backend {backend_name} is busy",
+                _error_badge(backend, "busy"),
+            )
+
+        try:
+            text: str = future.result(timeout=timeout)
+        except TimeoutError as exc:
+            if future.done():
+                self.__count(executor, "error")
+                raise ProcessingError(
+                    http.HTTPStatus.BAD_REQUEST, "Failed to process shield request"
+                ) from exc
+
+            # Coroutines are cancelled. Synchronous calls cannot be stopped
+            # and keep their worker until they return.
+            future.cancel()
+            self.__count(executor, "timeout")
+            raise BadgeProcessingError(
+                http.HTTPStatus.GATEWAY_TIMEOUT,
+                f"Backend {backend_name} did not respond within {timeout}s",
+                _error_badge(backend, "timeout"),
+            ) from exc
+        except ProcessingError:
+            self.__count(executor, "error")
+            raise
         except Exception as exc:
+            self.__count(executor, "error")
             raise ProcessingError(
                 http.HTTPStatus.BAD_REQUEST, "Failed to process shield request"
             ) from exc
+
+        self.__count(executor, "ok")
+        return text
+
+    def __run_backend(
+        self,
+        backend_name: str,
+        backend: "CustomBackendSource",
+        request: "dict[str, Any]",
+        deadline: "Deadline | None",
+    ) -> str:
+        # Requests made by the backend inherit the deadline of the badge.
+        with deadline_scope(deadline), self._metrics.backend(backend_name):
+            return backend.process(request)
+
+    async def __run_async_backend(
+        self,
+        backend_name: str,
+        backend: "AsyncCustomBackendSource",
+        request: "dict[str, Any]",
+        deadline: "Deadline | None",
+    ) -> str:
+        # The coroutine runs in a task of its own, so the deadline is only
+        # set for this call and the requests it creates.
+        with deadline_scope(deadline), self._metrics.backend(backend_name):
+            return await backend.process(request)
+
+    def __count(self, executor: "BoundedExecutor", result: str) -> None:
+        self._metrics.count_backend_call(executor.name, result, executor.pending)
+
+
+def _get_setting(value: "T | None", default: "T") -> "T":
+    return default if value is None else value
+
+
+def _error_badge(backend: "CustomBackendSource", text: str) -> "BadgeData":
+    return BadgeData(
+        label=backend.label,
+        color=ColorValues.RED.value,
+        text=text,
+        icon=backend.icon,
+    )
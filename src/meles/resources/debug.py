@@ -0,0 +1,268 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import cProfile
+import gc
+import hmac
+import io
+import json
+import pstats
+import resource
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from threading import Event, Lock
+from time import monotonic, sleep
+from typing import TYPE_CHECKING
+
+import falcon  # type: ignore
+
+from ..core import MemoryAccountant, SharedMemoryAccountant
+
+if TYPE_CHECKING:  # pragma: no cover
+    from types import FrameType
+    from typing import Any
+
+    from falcon import Request, Response
+
+    from ..core import ProvidesDebugConfig, ProvidesMemoryConfig
+
+
+class _DebugResourceBase:
+    def __init__(self, settings: "ProvidesDebugConfig") -> None:
+        self.__settings = settings
+
+    @property
+    def _settings(self) -> "ProvidesDebugConfig":
+        return self.__settings
+
+    def _is_authorized(self, req: "Request", resp: "Response") -> bool:
+        token: "str | None" = self.__settings.token
+        provided: str = req.get_header("X-Meles-Debug-Token") or ""
+        if not provided:
+            authorization: str = req.get_header("Authorization") or ""
+            if authorization.startswith("Bearer "):
+                provided = authorization[len("Bearer ") :]
+
+        if token and hmac.compare_digest(provided.encode(), token.encode()):
+            return True
+
+        resp.status = falcon.HTTP_401
+        resp.text = "A valid debug token is required"
+        resp.set_header("Content-Type", "text/plain")
+        resp.set_header("WWW-Authenticate", "Bearer")
+        return False
+
+    def _get_int(self, req: "Request", name: str, default: int, maximum: int) -> int:
+        value: "str | None" = req.get_param(name)
+        if value is None:
+            return default
+
+        if not value.isdigit() or int(value) <= 0:
+            raise falcon.HTTPBadRequest(description=f"Invalid value for '{name}'")
+
+        return min(int(value), maximum)
+
+
+class RequestProfiler:
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.__remaining: int = 0
+        self.__stats: "pstats.Stats | None" = None
+        self.__done = Event()
+        # Only one profiler can be enabled per process, so concurrent
+        # requests are not profiled while another one is.
+        self.__active = Lock()
+
+    def profile(
+        self, requests: int, timeout: float
+    ) -> "tuple[pstats.Stats | None, int]":
+        with self.__lock:
+            if self.__remaining > 0:
+                raise falcon.HTTPConflict(description="A profile is already running")
+            self.__remaining = requests
+            self.__stats = None
+            self.__done.clear()
+
+        self.__done.wait(timeout)
+        with self.__lock:
+            profiled: int = requests - self.__remaining
+            self.__remaining = 0
+            return self.__stats, profiled
+
+    def process_request(self, req: "Request", _: "Response") -> None:
+        if self.__remaining <= 0 or req.path.startswith("/debug/"):
+            return
+
+        if not self.__active.acquire(blocking=False):
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is active
+            self.__active.release()
+            return
+
+        req.context.meles_profile = profile
+
+    def process_response(
+        self, req: "Request", resp: "Response", resource: "Any", succeeded: bool
+    ) -> None:
+        profile: "cProfile.Profile | None" = getattr(req.context, "meles_profile", None)
+        if profile is None:
+            return
+
+        profile.disable()
+        req.context.meles_profile = None
+        self.__active.release()
+        with self.__lock:
+            if self.__remaining <= 0:
+                return
+
+            if self.__stats is None:
+                self.__stats = pstats.Stats(profile)
+            else:
+                self.__stats.add(profile)
+            self.__remaining -= 1
+            if self.__remaining == 0:
+                self.__done.set()
+
+
+class ProfileResource(_DebugResourceBase):
+    def __init__(
+        self, settings: "ProvidesDebugConfig", profiler: "RequestProfiler"
+    ) -> None:
+        super().__init__(settings)
+        self.__profiler = profiler
+
+    def on_get(self, req: "Request", resp: "Response") -> None:
+        if not self._is_authorized(req, resp):
+            return
+
+        max_seconds: int = self._settings.max_profile_seconds
+        requests: int = self._get_int(req, "requests", 0, 10000)
+        if requests > 0:
+            stats, profiled = self.__profiler.profile(requests, max_seconds)
+            output = io.StringIO()
+            output.write(f"Profiled requests: {profiled}\n")
+            if stats is not None:
+                stats.stream = output  # type: ignore
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+                    self._get_int(req, "limit", 50, 1000)
+                )
+            resp.text = output.getvalue()
+        else:
+            seconds: int = self._get_int(req, "seconds", 5, max_seconds)
+            resp.text = ProfileResource.__sample(seconds, 0.005)
+
+        resp.status = falcon.HTTP_200
+        resp.set_header("Content-Type", "text/plain")
+
+    @staticmethod
+    def __sample(seconds: float, interval: float) -> str:
+        own_thread: int = threading.get_ident()
+        stacks: "Counter[str]" = Counter()
+        deadline: float = monotonic() + seconds
+        while monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread:
+                    stacks[ProfileResource.__collapse(frame)] += 1
+            sleep(interval)
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    @staticmethod
+    def __collapse(frame: "FrameType | None") -> str:
+        names: "list[str]" = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(
+                f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+class MemoryResource(_DebugResourceBase):
+    def __init__(
+        self,
+        settings: "ProvidesDebugConfig",
+        memory_settings: "ProvidesMemoryConfig",
+        accountant: "MemoryAccountant" = SharedMemoryAccountant,
+    ) -> None:
+        super().__init__(settings)
+        self.__memory_settings = memory_settings
+        self.__accountant = accountant
+
+    def on_get(self, req: "Request", resp: "Response") -> None:
+        if not self._is_authorized(req, resp):
+            return
+
+        report: "dict[str, Any]" = {
+            "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "limit_bytes": self.__memory_settings.limit_bytes,
+            "caches": {
+                name: {"entries": entries, "bytes": size}
+                for name, (entries, size) in self.__accountant.get_usage().items()
+            },
+            "gc": {
+                "counts": gc.get_count(),
+                "thresholds": gc.get_threshold(),
+                "generations": gc.get_stats(),
+                "objects": len(gc.get_objects()),
+            },
+        }
+
+        top: int = self._get_int(req, "tracemalloc", 0, 100)
+        if top > 0:
+            report["tracemalloc"] = MemoryResource.__get_top_allocators(
+                top,
+                self._get_int(req, "seconds", 5, self._settings.max_profile_seconds),
+            )
+
+        resp.text = json.dumps(report)
+        resp.status = falcon.HTTP_200
+        resp.set_header("Content-Type", "application/json")
+
+    @staticmethod
+    def __get_top_allocators(top: int, seconds: int) -> "list[dict[str, Any]]":
+        # Tracing is only switched on for the duration of the request, unless
+        # it has been enabled on start-up.
+        started: bool = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+            sleep(seconds)
+
+        try:
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+        return [
+            {
+                "location": str(statistic.traceback),
+                "bytes": statistic.size,
+                "blocks": statistic.count,
+            }
+            for statistic in snapshot.statistics("lineno")[:top]
+        ]
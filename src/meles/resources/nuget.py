@@ -32,7 +32,7 @@ if TYPE_CHECKING:  # pragma: no cover
 
     from falcon_caching import Cache  # type: ignore
 
-    from ..core import RequestHandler, UrlSourceBase
+    from ..core import HasConfigItems, RequestHandler, UrlSourceBase
     from ..sources.nuget import NugetSourceBase
 
 
@@ -42,12 +42,13 @@ class NugetBadgeResourceBase(BadgeResourceBase, ABC):
         src: "NugetSourceBase",
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
+        cfg: "HasConfigItems | None" = None,
     ):
-        super().__init__(cache, generator_class)
+        super().__init__(cache, generator_class, cfg=cfg)
         self.__source = src
 
     def _process_badge_request(self, request: "dict[str, Any]") -> BadgeData:
-        return self.__source.get_data(request, pre_lease=self._pre_releases_allowed)
+        return self.__source.get_data(request, pre_release=self._pre_releases_allowed)
 
     @property
     @abstractmethod
@@ -62,11 +63,13 @@ class LatestStablePackageVersionNugetBadgeResource(NugetBadgeResourceBase):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ):
         super().__init__(
             LatestPackageVersionNugetV3Source(feed_url, request_handler_class),
             cache,
             generator_class,
+            cfg,
         )
 
     @property
@@ -85,11 +88,13 @@ class LatestPreviewPackageVersionNugetBadgeResource(NugetBadgeResourceBase):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ):
         super().__init__(
             LatestPackageVersionNugetV3Source(feed_url, request_handler_class),
             cache,
             generator_class,
+            cfg,
         )
 
     @property
@@ -108,11 +113,13 @@ class PackageDownloadsNugetBadgeResource(NugetBadgeResourceBase):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ):
         super().__init__(
             LatestPackageDownloadsNugetV3Source(feed_url, request_handler_class),
             cache,
             generator_class,
+            cfg,
         )
 
     @property
@@ -22,13 +22,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from io import BytesIO
 from json import loads as load_json
-from tomllib import loads as load_toml
 from typing import TYPE_CHECKING
-from xml.etree.ElementTree import Element, ElementTree
-from xml.etree.ElementTree import tostring as xml_to_string
-
-from jsonpath import jsonpath  # type: ignore
-from yaml import safe_load as load_yaml
 
 from ..core import (
     BadgeData,
@@ -44,11 +38,12 @@ from ..core import (
 from .base import BadgeRequestObject, BadgeResourceBase
 
 if TYPE_CHECKING:  # pragma: no cover
+    from xml.etree.ElementTree import ElementTree
     from typing import Any
 
     from falcon_caching import Cache  # type: ignore
 
-    from ..core import Icon, RequestHandler, Response
+    from ..core import HasConfigItems, Icon, RequestHandler, Response
 
 
 class ShieldResource(BadgeResourceBase):
@@ -107,8 +102,9 @@ class _CustomSourceBase(BadgeResourceBase, ABC):
         cache: "Cache" = SharedCache,
         generator_class: "type[Generator]" = Generator,
         request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        cfg: "HasConfigItems | None" = None,
     ) -> None:
-        super().__init__(cache, generator_class)
+        super().__init__(cache, generator_class, cfg=cfg)
         self.__request_handler = request_handler_class()
 
     def _process_badge_request(self, request: "dict[str, Any]") -> "BadgeData":
@@ -127,6 +123,9 @@ class _CustomSourceBase(BadgeResourceBase, ABC):
                 f"Failed to call {url}. Result {response.status}",
             )
 
+        if req.deadline is not None:
+            req.deadline.check(f"parsing the response of {url}")
+
         return self._process_invocation_result(response, request)
 
     @abstractmethod
@@ -169,7 +168,7 @@ class EndpointResource(_CustomSourceBase):
     ) -> "BadgeData":
         if (
             response.has_header("Content-Type")
-            and response.get_header("Content-Type") != "application/json"
+            and response.get_media_type() != "application/json"
         ):
             raise ProcessingError(
                 http.HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Content type is not JSON"
@@ -180,7 +179,7 @@ class EndpointResource(_CustomSourceBase):
                 http.HTTPStatus.SERVICE_UNAVAILABLE, "Requested yielded no data"
             )
 
-        data = load_json(response.data)
+        data = response.get_parsed("endpoint", load_json)
         if "schemaVersion" not in data or data["schemaVersion"] != "1":
             raise ProcessingError(
                 http.HTTPStatus.UNPROCESSABLE_ENTITY,
@@ -230,7 +229,7 @@ class DynamicBadgeResourceBase(_CustomSourceBase, ABC):
     ) -> "BadgeData":
         if (
             response.has_header("Content-Type")
-            and response.get_header("Content-Type") not in self.content_types
+            and response.get_media_type() not in self.content_types
         ):
             raise ProcessingError(
                 http.HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
@@ -242,22 +241,27 @@ class DynamicBadgeResourceBase(_CustomSourceBase, ABC):
                 http.HTTPStatus.SERVICE_UNAVAILABLE, "Requested yielded no data"
             )
 
-        data = self._load_data(response.data)
+        data = response.get_parsed(self.data_format, self.__load_data)
         query = request_data.get("query")
         if query is None:
             raise ProcessingError(
                 http.HTTPStatus.BAD_REQUEST, "Missing parameter 'query'"
             )
 
-        message = self._query_data(data, query)
-        prefix = data.get("prefix", "")
-        suffix = data.get("suffix", "")
+        with self._metrics.document(self.data_format, "query"):
+            message = self._query_data(data, query)
+        prefix = request_data.get("prefix", "")
+        suffix = request_data.get("suffix", "")
         message = f"{prefix}{message}{suffix}"
 
-        badge_elements = BadgeRequestObject.parse(data)
+        badge_elements = BadgeRequestObject.parse(request_data)
 
         return badge_elements.to_badge(text=message)
 
+    def __load_data(self, data: bytes) -> "dict[str, Any]":
+        with self._metrics.document(self.data_format, "parse"):
+            return self._load_data(data)
+
     @abstractmethod
     def _load_data(self, data: bytes) -> "dict[str, Any]":
         ...
@@ -280,6 +284,8 @@ class DynamicJsonBadgeResource(DynamicBadgeResourceBase):
         return load_json(data)
 
     def _query_data(self, data: "dict[str, Any]", query: str) -> str:
+        from jsonpath import jsonpath  # type: ignore # pylint: disable=C0415
+
         value = jsonpath(data, query, "VALUE")
         if value is None:
             raise ProcessingError(
@@ -299,9 +305,13 @@ class DynamicYamlBadgeResource(DynamicBadgeResourceBase):
         return "application/x-yaml", "text/yaml"
 
     def _load_data(self, data: bytes) -> "dict[str, Any]":
+        from yaml import safe_load as load_yaml  # pylint: disable=C0415
+
         return load_yaml(data)
 
     def _query_data(self, data: "dict[str, Any]", query: str) -> str:
+        from jsonpath import jsonpath  # type: ignore # pylint: disable=C0415
+
         value = jsonpath(data, query, "VALUE")
         if value is None:
             raise ProcessingError(
@@ -321,9 +331,13 @@ class DynamicTomlBadgeResource(DynamicBadgeResourceBase):
         return ("application/toml",)
 
     def _load_data(self, data: bytes) -> "dict[str, Any]":
+        from tomllib import loads as load_toml  # pylint: disable=C0415
+
         return load_toml(data.decode("utf-8"), parse_float=float)
 
     def _query_data(self, data: "dict[str, Any]", query: str) -> str:
+        from jsonpath import jsonpath  # type: ignore # pylint: disable=C0415
+
         value = jsonpath(data, query, "VALUE")
         if value is None:
             raise ProcessingError(
@@ -343,9 +357,16 @@ class DynamicXmlBadgeResource(DynamicBadgeResourceBase):
         return ("text/xml",)
 
     def _load_data(self, data: bytes) -> "dict[str, Any]":
+        from xml.etree.ElementTree import ElementTree  # pylint: disable=C0415
+
         return {"__data__": ElementTree().parse(source=BytesIO(data), parser=None)}
 
     def _query_data(self, data: "dict[str, Any]", query: str) -> str:
+        from xml.etree.ElementTree import Element  # pylint: disable=C0415
+        from xml.etree.ElementTree import (
+            tostring as xml_to_string,
+        )  # pylint: disable=C0415
+
         tree: "ElementTree" = data["__data__"]
         result = tree.findall(query)
         if len(result) == 0:
@@ -21,12 +21,15 @@ from __future__ import annotations
 
 import http
 from abc import ABC, abstractmethod
-from inspect import getmembers, isclass
+from collections.abc import Mapping
+from importlib.metadata import entry_points
+from inspect import getmembers, isabstract, isclass
 from logging import Logger, getLogger
 from pkgutil import iter_modules, ModuleInfo
 from sys import modules
+from threading import Lock
 from types import ModuleType
-from typing import TYPE_CHECKING, TypeVar, cast
+from typing import TYPE_CHECKING, TypeVar
 
 from ..core import (
     LOGGER_NAME,
@@ -35,12 +38,14 @@ from ..core import (
     Request,
     TemplateUrlSource,
     Urllib3RequestHandler,
+    current_deadline,
 )
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Any
+    from importlib.metadata import EntryPoint
+    from typing import Any, Callable, Iterator
 
-    from ..core import BadgeData, RequestHandler, UrlSourceBase
+    from ..core import BadgeData, Deadline, RequestHandler, UrlSourceBase
 
 
 class SourceBase(ABC):
@@ -76,6 +81,11 @@ class RequestSourceBase(SourceBase, ABC):
     def _request_handler(self) -> "RequestHandler":
         return self.__request_handler
 
+    def _check_deadline(self, stage: str) -> None:
+        deadline: "Deadline | None" = current_deadline()
+        if deadline is not None:
+            deadline.check(stage)
+
     def _get_value_from_request(
         self, key: str, data: "dict[str, Any]", default: "Any"
     ) -> "Any":
@@ -103,15 +113,81 @@ class RequestSourceBase(SourceBase, ABC):
 TInstance = TypeVar("TInstance")
 
 
+class LazySources[T](Mapping[str, T]):
+    def __init__(self, factories: "dict[str, Callable[[], T]]") -> None:
+        self.__factories = factories
+        self.__instances: "dict[str, T]" = {}
+        self.__failed: "set[str]" = set()
+        self.__lock = Lock()
+
+    def __getitem__(self, name: str) -> "T":
+        if name in self.__instances:
+            return self.__instances[name]
+
+        with self.__lock:
+            if name in self.__instances:
+                return self.__instances[name]
+
+            if name in self.__failed or name not in self.__factories:
+                raise KeyError(name)
+
+            try:
+                instance: "T" = self.__factories[name]()
+            except Exception as e:
+                getLogger(LOGGER_NAME).warning(
+                    "Failed to instantiate source %s", name, exc_info=e
+                )
+                self.__failed.add(name)
+                raise KeyError(name) from e
+
+            self.__instances[name] = instance
+            return instance
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.__factories
+
+    def __iter__(self) -> "Iterator[str]":
+        return iter(self.__factories)
+
+    def __len__(self) -> int:
+        return len(self.__factories)
+
+
 class SourcesCollection:
-    def __init__(self, module_ns: "ModuleType") -> "None":
+    def __init__(
+        self, module_ns: "ModuleType", entry_point_group: "str | None" = None
+    ) -> "None":
         self.__module = module_ns
+        self.__entry_point_group = entry_point_group
+        self.__manifests: "dict[type, LazySources[Any]]" = {}
+
+    def get_sources[T: TInstance](self, type_to_bind: "type") -> "LazySources[T]":  # type: ignore
+        manifest: "LazySources[T] | None" = self.__manifests.get(type_to_bind)
+        if manifest is None:
+            factories: "dict[str, Callable[[], T]]" = {}  # type: ignore
+            if self.__entry_point_group is not None:
+                for ep in entry_points(group=self.__entry_point_group):
+                    factories.setdefault(ep.name, _EntryPointFactory(ep, type_to_bind))
+
+            for name, member in self.__get_module_sources(type_to_bind).items():
+                factories.setdefault(name, member)
+
+            getLogger(LOGGER_NAME).debug(
+                "Found sources for %s: %s", type_to_bind.__name__, list(factories)
+            )
+            manifest = LazySources(factories)
+            self.__manifests[type_to_bind] = manifest
+
+        return manifest
 
-    def get_sources[T: TInstance](self, type_to_bind: "type") -> "dict[str, T]":  # type: ignore
+    def __get_module_sources(self, type_to_bind: "type") -> "dict[str, type]":
+        # Modules of the namespace package are only searched if they have
+        # been imported already. Like entry points, their classes are only
+        # instantiated on the first lookup, so they are named by a name class
+        # attribute or by their class name.
         logger = getLogger(LOGGER_NAME)
-        instances: "dict[str, T]" = {}  # type: ignore
+        classes: "dict[str, type]" = {}
 
-        logger.debug("Searching module %s for child modules", self.__module.__name__)
         children: "list[ModuleInfo]" = list(
             iter_modules(
                 self.__module.__path__,
@@ -120,30 +196,33 @@ class SourcesCollection:
         )
 
         for child in children:
-            logger.debug("Found child module %s", child.name)
             if child.name not in modules:
                 logger.warning("Failed to find child module %s", child.name)
                 continue
 
             module = modules[child.name]
-            for name, member in getmembers(module):
-                logger.debug("Analyzing member %s", name)
-                if isclass(member) and issubclass(member, type_to_bind):
-                    logger.debug("Found matching type: %s", member.__name__)
-                    clazz: "type[T]" = cast(type[T], member)  # type: ignore
-                    try:
-                        instance: "T" = clazz()  # type: ignore
-                    except Exception as e:
-                        logger.warning(
-                            "Failed to instantiate class %s",
-                            clazz.__qualname__,
-                            exc_info=e,
-                        )
-                    
-                    instance_name = member.__name__
-                    if hasattr(instance, "name"):
-                        instance_name = str(getattr(instance, "name"))
-
-                    instances[instance_name] = instance
-
-        return instances
+            for _, member in getmembers(module, isclass):
+                if issubclass(member, type_to_bind) and not isabstract(member):
+                    name: "Any" = getattr(member, "name", None)
+                    if not isinstance(name, str):
+                        name = member.__name__
+                    classes[name] = member
+
+        return classes
+
+
+class _EntryPointFactory:
+    def __init__(self, entry_point: "EntryPoint", type_to_bind: "type") -> None:
+        self.__entry_point = entry_point
+        self.__type_to_bind = type_to_bind
+
+    def __call__(self) -> "Any":
+        loaded: "Any" = self.__entry_point.load()
+        instance: "Any" = loaded()
+        if not isinstance(instance, self.__type_to_bind):
+            raise TypeError(
+                f"Entry point {self.__entry_point.value} does not provide "
+                f"a {self.__type_to_bind.__name__}"
+            )
+
+        return instance
@@ -24,8 +24,10 @@
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
+from ...core import SharedAsyncRequestHandler
+
 if TYPE_CHECKING:
-    from ...core import Color, Icon
+    from ...core import AsyncRequestHandler, Color, Icon
 
 class CustomBackendSource(ABC):
     @property
@@ -44,6 +46,35 @@ class CustomBackendSource(ABC):
     @abstractmethod
     def label(self) -> "str": ...
 
+    @property
+    def timeout(self) -> "float | None":
+        return None
+
+    @property
+    def max_concurrency(self) -> "int | None":
+        return None
+
+    @property
+    def queue_depth(self) -> "int | None":
+        return None
+
+    @property
+    def cache_ttl(self) -> "int | None":
+        return None
+
+    def cache_key(self, request: "dict[str, str]") -> "str | None":
+        return None
+
     @abstractmethod
     def process(self, request: "dict[str, str]") -> "str": ...
 
+
+
+class AsyncCustomBackendSource(CustomBackendSource, ABC):
+    @property
+    def request_handler(self) -> "AsyncRequestHandler":
+        return SharedAsyncRequestHandler
+
+    @abstractmethod
+    async def process(self, request: "dict[str, str]") -> "str":  # type: ignore[override]
+        ...
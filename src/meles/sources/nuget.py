@@ -18,10 +18,20 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
 from http import HTTPStatus
 from json import loads as load_json
+from pickle import HIGHEST_PROTOCOL, PicklingError
+from pickle import dumps as pickle
+from pickle import loads as unpickle
 from random import choice as random_choice
+from threading import Event, Lock
+from time import sleep, time
 from typing import TYPE_CHECKING
 
 from semver import Version
@@ -33,16 +43,22 @@ from ..core import (
     ProcessingError,
     Request,
     Response,
+    SharedMemoryAccountant,
+    SharedMetrics,
+    TemplateUrlSource,
     Url,
     UrlBuilder,
     Urllib3RequestHandler,
+    current_deadline,
+    estimate_size,
+    register_snapshot_section,
 )
 from .base import RequestSourceBase
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Any
+    from typing import Any, Callable, Final, Iterator
 
-    from ..core import UrlSourceBase
+    from ..core import Deadline, UrlSourceBase
     from .base import RequestHandler
 
 
@@ -76,12 +92,93 @@ class NugetSourceBase(RequestSourceBase, ABC):
         ...
 
 
+class NugetV3Mode(Enum):
+    SEARCH = "search"
+    PACKAGE_INDEX = "package-index"
+
+
 class NugetV3Source(NugetSourceBase, ABC):
+    def __init__(
+        self,
+        feed_url: "UrlSourceBase",
+        request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        batcher: "NuGetV3SearchBatcher | None" = None,
+        mode: "NugetV3Mode" = NugetV3Mode.SEARCH,
+    ):
+        super().__init__(feed_url, request_handler_class)
+        self.__batcher = batcher if batcher is not None else SharedSearchBatcher
+        self.__mode = mode
+        self.__labelled_index: "dict[str, Any] | None" = None
+
+    @property
+    def mode(self) -> "NugetV3Mode":
+        return self.__mode
+
+    def get_data(self, data: "dict[str, Any]", **kwargs: "Any") -> "BadgeData":
+        package_name: str = self._get_package_name(data)
+        url: "Url" = self._create_url(self.feed_url, **data).to_url()
+        resources: "list[dict[str, Any]]" = self._load_service_index(url)
+        pre_release: "bool | None" = kwargs.pop("pre_release", None)
+
+        if self.__mode == NugetV3Mode.PACKAGE_INDEX:
+            index_response: "NuGetV3PackageSearch | None" = self._load_package_index(
+                resources, package_name
+            )
+            if index_response is not None:
+                return self._create_search_badge(index_response, data, pre_release)
+
+        search_service_url: str = self._select_service(resources, "SearchQueryService")
+
+        def _fetch(package_names: "list[str]") -> "NuGetV3PackageSearch":
+            query: str = package_names[0]
+            take: "int | None" = None
+            if len(package_names) > 1:
+                query = " ".join(f"packageid:{n}" for n in package_names)
+                take = len(package_names)
+
+            req: "Request" = self._create_search_request(
+                search_service_url, query, take, pre_release
+            )
+            resp: "Response" = self._request_handler.handle_request(req)
+            self._check_deadline("parsing the search response")
+            with SharedMetrics.document("nuget", "parse"):
+                return self._parse_nuget_v3_package_search(resp, package_names)
+
+        search_response: "NuGetV3PackageSearch" = self.__batcher.search(
+            (search_service_url, pre_release), package_name, _fetch
+        )
+
+        return self._create_search_badge(search_response, data, pre_release)
+
     def _create_request(self, data: "dict[str, Any]", **kwargs: "Any") -> "Request":
         url: "Url" = self._create_url(self.feed_url, **data).to_url()
         search_service_url: str = self._select_search_service(url)
+        package_name: str = self._get_package_name(data)
+        pre_release: "bool | None" = kwargs.pop("pre_release", None)
+
+        return self._create_search_request(
+            search_service_url, package_name, None, pre_release
+        )
+
+    def _create_search_request(
+        self,
+        search_service_url: str,
+        query: str,
+        take: "int | None",
+        pre_release: "bool | None",
+    ) -> "Request":
         builder: UrlBuilder = UrlBuilder(search_service_url)
+        builder.add_param("q", query)
+
+        if take is not None:
+            builder.add_param("take", str(take))
+
+        if pre_release is not None:
+            builder.add_param("prerelease", str(bool(pre_release)))
 
+        return self._create_raw_request(url=builder)
+
+    def _get_package_name(self, data: "dict[str, Any]") -> str:
         package_name = self._get_value_from_request("packageName", data, None)
         if package_name is None:
             raise ProcessingError(
@@ -89,57 +186,203 @@ class NugetV3Source(NugetSourceBase, ABC):
                 "'packageName' property is missing",
             )
 
-        builder.add_param("q", package_name)
-
-        pre_release = kwargs.pop("pre_release", None)
-
-        if pre_release is not None:
-            builder.add_param("prerelease", str(bool(pre_release)))
-
-        req: Request = self._create_raw_request(
-            url=builder,
-            **data,
-        )
-
-        return req
+        return package_name
 
     def _select_search_service(self, url: "Url") -> str:
-        self._logger.debug("Selecting search service from %s", url)
-        response = self._request_handler.handle_request(Request(url))
-        json_response: "dict[str, Any]" = (
-            load_json(response.data.decode("utf-8"))
-            if response.data is not None
-            else {}
-        )
-        if "resources" not in json_response:
+        return self._select_service(self._load_service_index(url), "SearchQueryService")
+
+    def _load_service_index(self, url: "Url") -> "list[dict[str, Any]]":
+        self._logger.debug("Loading service index from %s", url)
+        json_response: "dict[str, Any] | None" = self._fetch_document(str(url))
+        if json_response is None or "resources" not in json_response:
             raise ProcessingError(
                 HTTPStatus.SERVICE_UNAVAILABLE,
                 f"{self.feed_url} did not provide any resources",
             )
 
-        candidates = set()
-        for resource in json_response["resources"]:
+        resources: "list[dict[str, Any]]" = list(json_response["resources"])
+        if json_response is not self.__labelled_index and not isinstance(
+            self.feed_url, TemplateUrlSource
+        ):
+            # The hosts of a configured feed are labelled in the upstream
+            # metrics; feeds built from requests are counted as other hosts.
+            SharedMetrics.add_known_hosts(
+                [str(url), *(str(r["@id"]) for r in resources if "@id" in r)]
+            )
+            self.__labelled_index = json_response
+
+        return resources
+
+    def _find_services(
+        self, resources: "list[dict[str, Any]]", service_type: str
+    ) -> "list[str]":
+        candidates: "dict[str, str]" = {}
+        for resource in resources:
             if (
                 "@type" in resource
                 and "@id" in resource
-                and str(resource["@type"])
-                .lower()
-                .startswith("SearchQueryService".lower())
+                and str(resource["@type"]).lower().startswith(service_type.lower())
             ):
-                candidates.add(resource["@id"])
+                candidates[str(resource["@id"])] = str(resource["@type"])
+
+        # Prefer the most recent revision of a service, e.g.
+        # RegistrationsBaseUrl/3.6.0 over RegistrationsBaseUrl/3.0.0
+        return sorted(
+            candidates,
+            key=lambda c: _get_service_revision(candidates[c]),
+            reverse=True,
+        )
 
+    def _select_service(
+        self, resources: "list[dict[str, Any]]", service_type: str
+    ) -> str:
+        candidates: "list[str]" = self._find_services(resources, service_type)
         if len(candidates) == 0:
             raise ProcessingError(
                 HTTPStatus.SERVICE_UNAVAILABLE,
-                f"{self.feed_url} did not provide any search query services",
+                f"{self.feed_url} did not provide any {service_type} services",
             )
 
         self._logger.debug(
-            "Found %i distinct search services. Choosing one arbitrarily",
+            "Found %i distinct %s services. Choosing one arbitrarily",
             len(candidates),
+            service_type,
+        )
+
+        return random_choice(candidates)
+
+    def _load_package_index(
+        self,
+        resources: "list[dict[str, Any]]",
+        package_name: str,
+    ) -> "NuGetV3PackageSearch | None":
+        package: "NuGetV3PackageRecord | None"
+        flat_containers = self._find_services(resources, "PackageBaseAddress")
+        registrations = self._find_services(resources, "RegistrationsBaseUrl")
+        # Only the registration index tells unlisted versions apart, so the
+        # flat container is used if a feed does not provide registrations.
+        if len(registrations) > 0:
+            package = self._load_registration_package(registrations[0], package_name)
+        elif len(flat_containers) > 0:
+            package = self._load_flat_container_package(
+                flat_containers[0], package_name
+            )
+        else:
+            self._logger.debug(
+                "%s provides no package index, using search instead", self.feed_url
+            )
+            return None
+
+        if package is None:
+            raise ProcessingError(
+                HTTPStatus.NOT_FOUND, f"Failed to resolve {package_name}: NOT FOUND"
+            )
+
+        return NuGetV3PackageSearch(1, [package])
+
+    def _load_flat_container_package(
+        self, base_address: str, package_name: str
+    ) -> "NuGetV3PackageRecord | None":
+        def _to_package(document: "dict[str, Any]") -> "NuGetV3PackageRecord":
+            return NuGetV3PackageRecord(
+                package_name,
+                [NuGetV3VersionRecord(str(v), 0) for v in document.get("versions", [])],
+            )
+
+        url = f"{base_address.rstrip('/')}/{package_name.lower()}/index.json"
+        return self._fetch_document(url, _to_package)
+
+    def _load_registration_package(
+        self, base_address: str, package_name: str
+    ) -> "NuGetV3PackageRecord | None":
+        def _to_package(document: "dict[str, Any]") -> "NuGetV3PackageRecord":
+            # The index changes with every page, so pages that are not inlined
+            # are only loaded again once the index was modified.
+            pages: "list[dict[str, Any]]" = document.get("items", [])
+            loaded: "dict[str, list[NuGetV3VersionRecord]]" = self.__load_pages(
+                [str(page["@id"]) for page in pages if "items" not in page]
+            )
+            versions: "list[NuGetV3VersionRecord]" = []
+            for page in pages:
+                versions.extend(
+                    _get_listed_versions(page)
+                    if "items" in page
+                    else loaded[str(page["@id"])]
+                )
+
+            return NuGetV3PackageRecord(package_name, versions)
+
+        url = f"{base_address.rstrip('/')}/{package_name.lower()}/index.json"
+        return self._fetch_document(url, _to_package)
+
+    def __load_pages(
+        self, urls: "list[str]"
+    ) -> "dict[str, list[NuGetV3VersionRecord]]":
+        if len(urls) <= 1:
+            return {
+                url: self._fetch_document(url, _get_listed_versions) or []
+                for url in urls
+            }
+
+        # Every page is loaded in the context of the request, so it keeps
+        # the deadline.
+        futures = {
+            url: _page_loader.submit(
+                copy_context().run, self._fetch_document, url, _get_listed_versions
+            )
+            for url in urls
+        }
+        return {url: future.result() or [] for url, future in futures.items()}
+
+    def _fetch_document(
+        self, url: str, convert: "Callable[[Any], Any] | None" = None
+    ) -> "Any | None":
+        stored: "_StoredDocument | None" = _documents.get(url)
+        headers: "dict[str, str]" = {}
+        if stored is not None:
+            if stored.etag is not None:
+                headers["If-None-Match"] = stored.etag
+            if stored.last_modified is not None:
+                headers["If-Modified-Since"] = stored.last_modified
+
+        response: "Response" = self._request_handler.handle_request(
+            Request(Url.static(url), headers=headers or None)
         )
 
-        return random_choice(list(candidates))
+        if response.status == HTTPStatus.NOT_MODIFIED and stored is not None:
+            self._logger.debug("%s has not been modified", url)
+            return stored.content
+
+        if response.status == HTTPStatus.NOT_FOUND:
+            return None
+
+        if response.status != HTTPStatus.OK:
+            raise ProcessingError(
+                HTTPStatus.BAD_GATEWAY,
+                f"Failed to call {url}. Result {response.status}",
+            )
+
+        self._check_deadline(f"parsing {url}")
+        with SharedMetrics.document("nuget", "parse"):
+            content: "Any" = (
+                load_json(response.data.decode("utf-8"))
+                if response.data is not None
+                else {}
+            )
+        if convert is not None:
+            content = convert(content)
+
+        if response.has_header("ETag") or response.has_header("Last-Modified"):
+            _documents.put(
+                url,
+                _StoredDocument(
+                    response.get_header("ETag") or None,
+                    response.get_header("Last-Modified") or None,
+                    content,
+                ),
+            )
+
+        return content
 
     @property
     def default_label(self) -> str:
@@ -148,10 +391,27 @@ class NugetV3Source(NugetSourceBase, ABC):
     def _create_badge(
         self, resp: "Response", data: "dict[str, Any]", **kwargs: "Any"
     ) -> "BadgeData":
-        pkg: "NuGetPackage | None" = self._filter_nuget_package(resp, data)
+        search_response = self._parse_nuget_v3_package_search(
+            resp, [self._get_package_name(data)]
+        )
+
+        return self._create_search_badge(
+            search_response, data, kwargs.get("pre_release")
+        )
+
+    def _create_search_badge(
+        self,
+        search_response: "NuGetV3PackageSearch",
+        data: "dict[str, Any]",
+        pre_release: "bool | None" = None,
+    ) -> "BadgeData":
+        pkg: "NuGetPackage | None" = self._filter_nuget_package(
+            search_response, data, pre_release
+        )
         if pkg is None:
             raise ProcessingError(
-                HTTPStatus.NOT_FOUND, f"Failed to resolve {resp.url}: NOT FOUND"
+                HTTPStatus.NOT_FOUND,
+                f"Failed to resolve {self._get_package_name(data)}: NOT FOUND",
             )
 
         text = self._select_text(pkg)
@@ -167,7 +427,10 @@ class NugetV3Source(NugetSourceBase, ABC):
 
     @abstractmethod
     def _filter_nuget_package(
-        self, response: "Response", data: "dict[str, Any]"
+        self,
+        search_response: "NuGetV3PackageSearch",
+        data: "dict[str, Any]",
+        pre_release: "bool | None" = None,
     ) -> "NuGetPackage | None":
         ...
 
@@ -178,60 +441,293 @@ class NugetV3Source(NugetSourceBase, ABC):
     def _parse_nuget_v3_search_response(
         self, response: "Response"
     ) -> "NuGetV3SearchResponse | None":
-        json_data = response.data.decode("utf-8") if response.data is not None else ""
-        json_object = load_json(json_data)
+        json_object = response.get_parsed("nuget", load_json)
 
         return NuGetV3SearchResponse.parse(json_object)
 
+    def _parse_nuget_v3_package_search(
+        self, response: "Response", package_names: "list[str]"
+    ) -> "NuGetV3PackageSearch":
+        if response.status != HTTPStatus.OK:
+            raise ProcessingError(
+                HTTPStatus.BAD_GATEWAY,
+                f"Failed to call {response.url}. Result {response.status}",
+            )
+
+        json_object = response.get_parsed("nuget", load_json)
+
+        return NuGetV3PackageSearch.parse(json_object, package_names)
+
 
 class LatestPackageNugetV3Source(NugetV3Source, ABC):
     def _filter_nuget_package(
-        self, response: "Response", data: "dict[str, Any]"
+        self,
+        search_response: "NuGetV3PackageSearch",
+        data: "dict[str, Any]",
+        pre_release: "bool | None" = None,
     ) -> "NuGetPackage | None":
-        search_response = self._parse_nuget_v3_search_response(response)
-        if search_response is None:
-            raise ProcessingError(
-                HTTPStatus.EXPECTATION_FAILED,
-                f"Failed to parse response of {response.url}",
-            )
-
         name = str(self._get_value_from_request("packageName", data, ""))
 
         major = int(self._get_value_from_request("major", data, -1))
         minor = int(self._get_value_from_request("minor", data, -1))
 
-        versions = []
-        for pkg in search_response.data:
-            if pkg.id == name:
-                for pkg_version in pkg.versions:
-                    try:
-                        versions.append(
-                            (
-                                name,
-                                Version.parse(pkg_version.version),
-                                pkg_version.downloads,
-                            )
-                        )
-                    except (ValueError, TypeError):
-                        continue
-
-        if major >= 0:
-            versions = [
-                v
-                for v in versions
-                if v[1].major == major and (minor < 0 or v[1].minor == minor)
-            ]
+        pkg: "NuGetV3PackageRecord | None" = search_response.find(name)
+        latest: "tuple[Version, NuGetV3VersionRecord] | None" = (
+            pkg.index.latest(major, minor, bool(pre_release))
+            if pkg is not None
+            else None
+        )
 
-        if len(versions) == 0:
+        if latest is None:
             raise ProcessingError(
                 HTTPStatus.BAD_REQUEST, f"Failed to resolve package data for {name}"
             )
 
-        max_version = max(*versions, key=lambda v: v[1])
-        return NuGetPackage(max_version[0], str(max_version[1]), max_version[2])
+        version, record = latest
+        return NuGetPackage(name, str(version), record.downloads)
+
+
+def _get_listed_versions(page: "dict[str, Any]") -> "list[NuGetV3VersionRecord]":
+    versions: "list[NuGetV3VersionRecord]" = []
+    for leaf in page.get("items", []):
+        entry: "dict[str, Any]" = leaf.get("catalogEntry", {})
+        if "version" in entry and entry.get("listed", True):
+            versions.append(NuGetV3VersionRecord(str(entry["version"]), 0))
+
+    return versions
+
+
+def _get_service_revision(service_type: str) -> "tuple[int, tuple[int, ...]]":
+    # Numbered revisions rank above named ones like "Versioned", which rank
+    # above a type without any revision.
+    _, separator, revision = service_type.partition("/")
+    if not separator:
+        return 0, ()
+
+    try:
+        return 2, tuple(int(part) for part in revision.split("."))
+    except ValueError:
+        return 1, ()
+
+
+class _PendingSearch:
+    def __init__(self, package_name: str) -> None:
+        self.package_names: "list[str]" = [package_name]
+        self.done: "Event" = Event()
+        self.response: "NuGetV3PackageSearch | None" = None
+        self.error: "BaseException | None" = None
+
+
+class NuGetV3SearchBatcher:
+    def __init__(self, window: float = 0.01, max_batch_size: int = 20) -> None:
+        self.__window = window
+        self.__max_batch_size = max_batch_size
+        self.__pending: "dict[Any, _PendingSearch]" = {}
+        self.__lock = Lock()
+
+    @property
+    def window(self) -> float:
+        return self.__window
+
+    @window.setter
+    def window(self, window: float) -> None:
+        self.__window = window
+
+    def search(
+        self,
+        key: "Any",
+        package_name: str,
+        fetch: "Callable[[list[str]], NuGetV3PackageSearch]",
+    ) -> "NuGetV3PackageSearch":
+        leader: bool = False
+        with self.__lock:
+            batch: "_PendingSearch | None" = self.__pending.get(key)
+            if batch is None or len(batch.package_names) >= self.__max_batch_size:
+                batch = _PendingSearch(package_name)
+                self.__pending[key] = batch
+                leader = True
+            elif package_name not in batch.package_names:
+                batch.package_names.append(package_name)
+
+        if leader:
+            self.__run(key, batch, fetch)
+        else:
+            # The search runs within the deadline of the leader, so
+            # followers stop waiting once their own deadline has passed.
+            deadline: "Deadline | None" = current_deadline()
+            if not batch.done.wait(None if deadline is None else deadline.remaining):
+                raise ProcessingError(
+                    HTTPStatus.GATEWAY_TIMEOUT,
+                    f"Deadline exceeded while searching {package_name}",
+                )
+
+        if batch.error is not None:
+            raise batch.error
+
+        response: "NuGetV3PackageSearch | None" = batch.response
+        if response is None:
+            raise ProcessingError(
+                HTTPStatus.BAD_GATEWAY, f"Search for {package_name} yielded no data"
+            )
+
+        if len(batch.package_names) > 1 and response.find(package_name) is None:
+            # The feed may not support packageid filters. Fall back to
+            # a regular search for this package alone.
+            return fetch([package_name])
+
+        return response
+
+    def __run(
+        self,
+        key: "Any",
+        batch: "_PendingSearch",
+        fetch: "Callable[[list[str]], NuGetV3PackageSearch]",
+    ) -> None:
+        try:
+            if self.__window > 0:
+                sleep(self.__window)
+
+            with self.__lock:
+                if self.__pending.get(key) is batch:
+                    del self.__pending[key]
+
+            batch.response = fetch(batch.package_names)
+        except BaseException as exc:  # pylint: disable=W0718
+            batch.error = exc
+        finally:
+            batch.done.set()
+
+
+SharedSearchBatcher: "Final[NuGetV3SearchBatcher]" = NuGetV3SearchBatcher()
+
+
+# Documents are revalidated whenever they are used. They are dropped after
+# a while, so that documents of packages no longer requested do not linger.
+_DOCUMENT_MAX_AGE: "Final[float]" = 86400.0
+
+
+@dataclass(frozen=True)
+class _StoredDocument:
+    etag: "str | None" = field()
+    last_modified: "str | None" = field()
+    content: "Any" = field()
+
+
+class _ConditionalDocumentStore:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_age: float = _DOCUMENT_MAX_AGE,
+        clock: "Callable[[], float]" = time,
+    ) -> None:
+        self.__max_entries = max_entries
+        self.__max_age = max_age
+        self.__clock = clock
+        self.__documents: "OrderedDict[str, _StoredDocument | memoryview]" = (
+            OrderedDict()
+        )
+        self.__sizes: "dict[str, int]" = {}
+        self.__expires: "dict[str, float]" = {}
+        self.__lock = Lock()
+
+    def get(self, url: str) -> "_StoredDocument | None":
+        with self.__lock:
+            document = self.__documents.get(url)
+            if document is None:
+                return None
+
+            if self.__expires.get(url, 0.0) <= self.__clock():
+                self.__remove(url)
+                return None
+
+            if isinstance(document, memoryview):
+                document = unpickle(document)
+                self.__documents[url] = document
+                self.__sizes[url] = estimate_size(document)
+            self.__documents.move_to_end(url)
+            return document
+
+    def put(self, url: str, document: "_StoredDocument") -> None:
+        size: int = estimate_size(document)
+        with self.__lock:
+            self.__documents[url] = document
+            self.__sizes[url] = size
+            self.__expires[url] = self.__clock() + self.__max_age
+            self.__documents.move_to_end(url)
+            self.__trim()
+
+    def get_memory_usage(self) -> "tuple[int, int]":
+        with self.__lock:
+            return len(self.__documents), sum(self.__sizes.values())
+
+    def evict(self, size: int) -> int:
+        freed: int = 0
+        with self.__lock:
+            while self.__documents and freed < size:
+                url = next(iter(self.__documents))
+                freed += self.__sizes.get(url, 0)
+                self.__remove(url)
+        return freed
+
+    def dump_entries(self) -> "Iterator[tuple[str, float, bytes]]":
+        with self.__lock:
+            documents = [
+                (url, document, self.__expires.get(url, 0.0))
+                for url, document in self.__documents.items()
+            ]
+
+        now: float = self.__clock()
+        for url, document, expires in documents:
+            if expires <= now:
+                continue
+
+            if isinstance(document, memoryview):
+                yield url, expires, bytes(document)
+                continue
+
+            try:
+                yield url, expires, pickle(document, HIGHEST_PROTOCOL)
+            except (PicklingError, TypeError, AttributeError):
+                continue
+
+    def restore_entry(self, key: str, expires: float, payload: "memoryview") -> None:
+        with self.__lock:
+            if key not in self.__documents:
+                self.__documents[key] = payload
+                self.__sizes[key] = len(payload)
+                # Snapshots of older versions have no expiry.
+                self.__expires[key] = expires or self.__clock() + self.__max_age
+                self.__documents.move_to_end(key, last=False)
+            self.__trim()
+
+    def __remove(self, url: str) -> None:
+        self.__documents.pop(url, None)
+        self.__sizes.pop(url, None)
+        self.__expires.pop(url, None)
+
+    def __trim(self) -> None:
+        while len(self.__documents) > self.__max_entries:
+            self.__remove(next(iter(self.__documents)))
+
+
+_documents: "Final[_ConditionalDocumentStore]" = _ConditionalDocumentStore()
+_page_loader: "Final[ThreadPoolExecutor]" = ThreadPoolExecutor(
+    4, thread_name_prefix="meles-nuget-pages"
+)
+register_snapshot_section("nuget-documents", _documents)
+SharedMemoryAccountant.register("nuget-documents", _documents)
 
 
 class LatestPackageVersionNugetV3Source(LatestPackageNugetV3Source):
+    def __init__(
+        self,
+        feed_url: "UrlSourceBase",
+        request_handler_class: "type[RequestHandler]" = Urllib3RequestHandler,
+        batcher: "NuGetV3SearchBatcher | None" = None,
+        mode: "NugetV3Mode" = NugetV3Mode.PACKAGE_INDEX,
+    ):
+        super().__init__(feed_url, request_handler_class, batcher, mode)
+
     def _select_text(self, package: "NuGetPackage") -> str:
         return package.version
 
@@ -297,7 +793,6 @@ class NuGetV3SearchResult:  # pylint: disable=R0902
 
     @staticmethod
     def parse(data: "dict[str, Any]") -> "NuGetV3SearchResult":
-
         return NuGetV3SearchResult(
             data["id"],
             data["version"],
@@ -323,3 +818,114 @@ class NuGetV3SearchResponse:
                 HTTPStatus.UNPROCESSABLE_ENTITY,
                 "Failed to parse NuGet v3 search response",
             ) from exc
+
+
+class NuGetV3VersionRecord:
+    __slots__ = ("version", "downloads")
+
+    def __init__(self, version: str, downloads: int) -> None:
+        self.version = version
+        self.downloads = downloads
+
+
+class NuGetV3PackageRecord:
+    __slots__ = ("id", "versions", "_index")
+
+    def __init__(self, package_id: str, versions: "list[NuGetV3VersionRecord]") -> None:
+        self.id = package_id  # pylint: disable=C0103
+        self.versions = versions
+        self._index: "NuGetV3VersionIndex | None" = None
+
+    @property
+    def index(self) -> "NuGetV3VersionIndex":
+        if self._index is None:
+            self._index = NuGetV3VersionIndex(self.versions)
+        return self._index
+
+
+@lru_cache(maxsize=8192)
+def parse_version(version: str) -> "Version | None":
+    try:
+        return Version.parse(version)
+    except (ValueError, TypeError):
+        return None
+
+
+_VersionEntry = tuple[Version, NuGetV3VersionRecord]
+
+
+class NuGetV3VersionIndex:
+    __slots__ = ("versions", "groups", "_latest")
+
+    def __init__(self, versions: "list[NuGetV3VersionRecord]") -> None:
+        parsed: "list[_VersionEntry]" = []
+        for record in versions:
+            version: "Version | None" = parse_version(record.version)
+            if version is not None:
+                parsed.append((version, record))
+        parsed.sort(key=lambda p: p[0])
+
+        self.versions: "list[_VersionEntry]" = parsed
+        self.groups: "dict[tuple[int, int], list[_VersionEntry]]" = {}
+        self._latest: "dict[tuple[int, int, bool], _VersionEntry]" = {}
+
+        for entry in parsed:
+            version = entry[0]
+            self.groups.setdefault((version.major, version.minor), []).append(entry)
+            is_stable: bool = version.prerelease is None
+            for major, minor in (
+                (-1, -1),
+                (version.major, -1),
+                (version.major, version.minor),
+            ):
+                self._latest[(major, minor, True)] = entry
+                if is_stable:
+                    self._latest[(major, minor, False)] = entry
+
+    def latest(
+        self, major: int = -1, minor: int = -1, pre_release: bool = False
+    ) -> "_VersionEntry | None":
+        if major < 0:
+            minor = -1
+        return self._latest.get((major, minor, pre_release))
+
+
+class NuGetV3PackageSearch:
+    __slots__ = ("total_hits", "packages")
+
+    def __init__(self, total_hits: int, packages: "list[NuGetV3PackageRecord]") -> None:
+        self.total_hits = total_hits
+        self.packages: "dict[str, NuGetV3PackageRecord]" = {
+            p.id.lower(): p for p in packages
+        }
+
+    def find(self, package_id: str) -> "NuGetV3PackageRecord | None":
+        return self.packages.get(package_id.lower())
+
+    @staticmethod
+    def parse(
+        data: "dict[str, Any]", package_ids: "list[str]"
+    ) -> "NuGetV3PackageSearch":
+        wanted: "set[str]" = {p.lower() for p in package_ids}
+        try:
+            packages: "list[NuGetV3PackageRecord]" = []
+            for hit in data.get("data", []):
+                package_id: str = hit["id"]
+                if package_id.lower() not in wanted:
+                    continue
+                packages.append(
+                    NuGetV3PackageRecord(
+                        package_id,
+                        [
+                            NuGetV3VersionRecord(v["version"], int(v["downloads"]))
+                            for v in hit.get("versions", [])
+                        ],
+                    )
+                )
+
+            return NuGetV3PackageSearch(int(data["totalHits"]), packages)
+        except Exception as exc:
+            raise ProcessingError(
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+                "Failed to parse NuGet v3 search response",
+            ) from exc
@@ -68,11 +68,79 @@ class TestEnvConfig:
         return self.__use_health_check
 
 
+class TestRefreshConfig:
+    top_n = 0
+    lead_seconds = 5.0
+    workers = 1
+    rate = 1.0
+    interval = 1.0
+
+
+class TestSnapshotConfig:
+    path = None
+    interval = 0.0
+
+
+class TestNegativeCacheConfig:
+    client_error_ttl = 0
+    server_error_ttl = 0
+
+
+class TestDebugConfig:
+    token = None
+    max_profile_seconds = 5
+
+
+class TestMemoryConfig:
+    limit_bytes = 0
+    check_interval = 0.0
+
+
+class TestCustomBackendConfig:
+    timeout = 1.0
+    max_concurrency = 2
+    queue_depth = 2
+
+
+class TestAdmissionConfig:
+    max_in_flight = 0
+    stale_seconds = 0
+
+
+class TestRateLimitConfig:
+    client_rate = 0.0
+    client_burst = 20.0
+    client_header = None
+    client_trusted_hops = 1
+    upstream_rate = 0.0
+    upstream_burst = 20.0
+    store = "memory"
+
+
+class TestDeadlineConfig:
+    seconds = 0.0
+    header = None
+
+
+class TestUpstreamCacheConfig:
+    max_entries = 0
+
+
 class TestConfig:
     def __init__(self, env_config: TestEnvConfig, cache_config: TestCacheConfig, dynamic_config: TestDynamicConfig):
         self.__env_config = env_config
         self.__cache_config = cache_config
         self.__dynamic_config = dynamic_config
+        self.__refresh_config = TestRefreshConfig()
+        self.__snapshot_config = TestSnapshotConfig()
+        self.__negative_cache_config = TestNegativeCacheConfig()
+        self.__debug_config = TestDebugConfig()
+        self.__memory_config = TestMemoryConfig()
+        self.__custom_backend_config = TestCustomBackendConfig()
+        self.__admission_config = TestAdmissionConfig()
+        self.__rate_limit_config = TestRateLimitConfig()
+        self.__deadline_config = TestDeadlineConfig()
+        self.__upstream_cache_config = TestUpstreamCacheConfig()
 
     @property
     def env(self):
@@ -94,5 +162,48 @@ class TestConfig:
     def cache(self):
         return self.__cache_config
 
+    @property
+    def refresh(self):
+        return self.__refresh_config
+
+    @property
+    def snapshot(self):
+        return self.__snapshot_config
+
+    @property
+    def negative_cache(self):
+        return self.__negative_cache_config
+
+    @property
+    def debug(self):
+        return self.__debug_config
+
+    @property
+    def memory(self):
+        return self.__memory_config
+
+    @property
+    def custom_backend(self):
+        return self.__custom_backend_config
+
+    @property
+    def admission(self):
+        return self.__admission_config
+
+    @property
+    def rate_limit(self):
+        return self.__rate_limit_config
+
+    @property
+    def deadline(self):
+        return self.__deadline_config
+
+    @property
+    def upstream_cache(self):
+        return self.__upstream_cache_config
+
+    def reload(self, environ=None):
+        pass
+
 
-__all__ = ["TestRequestHandler", "TestDynamicConfig", "TestCacheConfig", "TestEnvConfig", "TestConfig"]
+__all__ = ["TestRequestHandler", "TestDynamicConfig", "TestCacheConfig", "TestEnvConfig", "TestRefreshConfig", "TestSnapshotConfig", "TestNegativeCacheConfig", "TestDebugConfig", "TestMemoryConfig", "TestCustomBackendConfig", "TestAdmissionConfig", "TestRateLimitConfig", "TestDeadlineConfig", "TestUpstreamCacheConfig", "TestConfig"]
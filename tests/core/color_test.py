@@ -0,0 +1,60 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import pytest
+
+from meles.core import Color, ColorValues
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("red", ColorValues.RED),
+        ("Red", ColorValues.RED),
+        ("cyan", ColorValues.AQUA),
+        ("darkgrey", ColorValues.DARK_GRAY),
+        ("lightgray", ColorValues.LIGHT_GREY),
+        ("success", ColorValues.BRIGHT_GREEN),
+        ("critical", ColorValues.RED),
+        ("ff0000", ColorValues.RED),
+        ("#FF0000", ColorValues.RED),
+        ("f00", ColorValues.RED),
+        ("#4c1", ColorValues.BRIGHT_GREEN),
+    ],
+)
+def test_from_str_resolves_to_interned_color(value, expected):
+    assert Color.from_str(value) is expected.value
+
+
+def test_from_str_parses_unknown_hex():
+    color = Color.from_str("#123")
+
+    assert color == Color(0x11, 0x22, 0x33)
+    assert color.to_hex() == "112233"
+    assert Color.from_str("#123") is color
+
+
+@pytest.mark.parametrize("value", ["", "nope", "#12", "12345g", "#1234567"])
+def test_from_str_rejects_invalid_values(value):
+    assert Color.from_str(value) is None
+
+
+def test_from_name_ignores_hex_values():
+    assert Color.from_name("BLUE") is ColorValues.BLUE.value
+    assert Color.from_name("0000ff") is None
@@ -0,0 +1,70 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import dataclasses
+
+import pytest
+
+from meles.core._config import _RuntimeConfig
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("False", False), ("0", False), ("off", False), ("TRUE", True), ("yes", True)],
+)
+def test_boolean_values_are_parsed(value, expected):
+    cfg = _RuntimeConfig()
+    cfg.reload({"MELES_USE_PROMETHEUS": value})
+
+    assert cfg.env.use_prometheus is expected
+    assert cfg.env.use_health_check is True
+
+
+def test_values_are_read_once():
+    environ = {"MELES_REFRESH_TOP_N": "3", "MELES_PORT": "9000"}
+    cfg = _RuntimeConfig()
+    cfg.reload(environ)
+    environ["MELES_REFRESH_TOP_N"] = "5"
+
+    assert cfg.refresh.top_n == 3
+    assert cfg.port == 9000
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        cfg.refresh.top_n = 5
+
+    cfg.reload(environ)
+
+    assert cfg.refresh.top_n == 5
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("MELES_USE_HEALTHCHECK", "maybe"),
+        ("MELES_MEMORY_LIMIT_BYTES", "1k"),
+        ("MELES_PORT", "70000"),
+    ],
+)
+def test_invalid_values_keep_previous_config(key, value):
+    cfg = _RuntimeConfig()
+    cfg.reload({"MELES_MEMORY_LIMIT_BYTES": "1024"})
+
+    with pytest.raises(ValueError, match=key):
+        cfg.reload({key: value})
+
+    assert cfg.memory.limit_bytes == 1024
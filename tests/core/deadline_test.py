@@ -0,0 +1,129 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from http import HTTPStatus
+from threading import Event, Thread
+from time import sleep
+
+import falcon
+import falcon.testing
+import pytest
+
+from meles.core import (
+    BadgeMetrics,
+    Deadline,
+    DeadlineMiddleware,
+    ProcessingError,
+    Request,
+    Url,
+    Urllib3RequestHandler,
+    current_deadline,
+    deadline_scope,
+)
+from meles.sources.nuget import NuGetV3SearchBatcher
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_limits_timeouts_to_remaining_time():
+    clock = _Clock()
+    deadline = Deadline(2.0, clock)
+
+    assert deadline.limit(3, "call") == 2.0
+    assert deadline.limit(1, "call") == 1.0
+
+    clock.now = 1.5
+
+    assert deadline.limit(None, "call") == 0.5
+
+    clock.now = 2.0
+
+    with pytest.raises(ProcessingError) as error:
+        deadline.limit(3, "call")
+
+    assert error.value.status == HTTPStatus.GATEWAY_TIMEOUT
+
+
+class _DeadlineResource:
+    def on_get(self, req, resp):
+        deadline = current_deadline()
+        resp.media = {"remaining": None if deadline is None else deadline.remaining}
+
+
+@pytest.mark.parametrize(
+    "seconds, header, expected",
+    [(5.0, None, 5.0), (5.0, "2", 2.0), (5.0, "10", 5.0), (0.0, "2", 2.0), (0.0, None, None), (5.0, "x", 5.0)],
+)
+def test_middleware_sets_deadline_from_config_and_header(seconds, header, expected):
+    clock = _Clock()
+    app = falcon.App(middleware=[DeadlineMiddleware(seconds, "X-Deadline", clock)])
+    app.add_route("/deadline", _DeadlineResource())
+    client = falcon.testing.TestClient(app)
+
+    result = client.simulate_get("/deadline", headers={"X-Deadline": header} if header else None)
+
+    assert result.json["remaining"] == expected
+    assert current_deadline() is None
+
+
+def test_requests_inherit_the_deadline_of_their_scope():
+    clock = _Clock()
+    deadline = Deadline(1.0, clock)
+
+    with deadline_scope(deadline):
+        request = Request(Url.static("https://example.invalid/index.json"))
+
+    assert request.deadline is deadline
+    assert Request(Url.static("https://example.invalid/index.json")).deadline is None
+
+    clock.now = 1.0
+    handler = Urllib3RequestHandler(metrics=BadgeMetrics())
+
+    with pytest.raises(ProcessingError) as error:
+        handler.handle_request(request)
+
+    assert error.value.status == HTTPStatus.GATEWAY_TIMEOUT
+
+
+def test_batched_searches_stop_waiting_at_the_deadline():
+    batcher = NuGetV3SearchBatcher(window=1.0)
+    release = Event()
+
+    def _fetch(package_names):
+        release.wait(5)
+        raise ProcessingError(HTTPStatus.BAD_GATEWAY, "released")
+
+    leader = Thread(target=lambda: pytest.raises(ProcessingError, batcher.search, "feed", "a", _fetch))
+    leader.start()
+    sleep(0.1)
+
+    try:
+        with deadline_scope(Deadline(0.05)), pytest.raises(ProcessingError) as error:
+            batcher.search("feed", "b", _fetch)
+    finally:
+        release.set()
+        leader.join()
+
+    assert error.value.status == HTTPStatus.GATEWAY_TIMEOUT
@@ -0,0 +1,213 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+from meles.core import (
+    BadgeMetrics,
+    RateLimiter,
+    Request,
+    UpstreamResponseCache,
+    Url,
+    Urllib3RequestHandler,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    cache_control = "max-age=60"
+    requests = []
+
+    def do_GET(self):
+        _Upstream.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", _Upstream.cache_control)
+            self.end_headers()
+            return
+
+        body = json.dumps({"value": 42}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.send_header("Cache-Control", _Upstream.cache_control)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    _Upstream.requests = []
+    _Upstream.cache_control = "max-age=60"
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/data.json"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def handler(clock):
+    return Urllib3RequestHandler(
+        metrics=BadgeMetrics(),
+        rate_limiter=RateLimiter("test"),
+        response_cache=UpstreamResponseCache(16, clock),
+    )
+
+
+def _count_parses(response, parses):
+    def _parse(data):
+        parses.append(data)
+        return json.loads(data)
+
+    return response.get_parsed("json", _parse)
+
+
+def test_fresh_responses_are_served_from_the_cache(upstream, handler):
+    parses = []
+
+    first = handler.handle_request(Request(Url.static(upstream)))
+    second = handler.handle_request(Request(Url.static(upstream)))
+
+    assert _count_parses(first, parses) == {"value": 42}
+    assert _count_parses(second, parses) == {"value": 42}
+    assert second.status == 200
+    assert len(_Upstream.requests) == 1
+    assert len(parses) == 1
+
+
+def test_stale_responses_are_revalidated(upstream, handler, clock):
+    parses = []
+    _count_parses(handler.handle_request(Request(Url.static(upstream))), parses)
+    clock.now = 61.0
+
+    revalidated = handler.handle_request(Request(Url.static(upstream)))
+
+    assert revalidated.status == 200
+    assert revalidated.data == b'{"value": 42}'
+    assert _count_parses(revalidated, parses) == {"value": 42}
+    assert _Upstream.requests[-1]["If-None-Match"] == '"v1"'
+    assert len(parses) == 1
+
+    handler.handle_request(Request(Url.static(upstream)))
+
+    assert len(_Upstream.requests) == 2
+
+
+@pytest.mark.parametrize("cache_control", ["no-store", "private, max-age=60"])
+def test_uncacheable_responses_are_not_stored(upstream, handler, cache_control):
+    _Upstream.cache_control = cache_control
+
+    handler.handle_request(Request(Url.static(upstream)))
+    handler.handle_request(Request(Url.static(upstream)))
+
+    assert len(_Upstream.requests) == 2
+
+
+def test_no_cache_responses_are_always_revalidated(upstream, handler):
+    _Upstream.cache_control = "no-cache"
+
+    handler.handle_request(Request(Url.static(upstream)))
+    response = handler.handle_request(Request(Url.static(upstream)))
+
+    assert response.status == 200
+    assert len(_Upstream.requests) == 2
+    assert _Upstream.requests[-1]["If-None-Match"] == '"v1"'
+
+
+def test_conditional_callers_get_not_modified_from_fresh_entries(upstream, handler):
+    handler.handle_request(Request(Url.static(upstream)))
+
+    response = handler.handle_request(Request(Url.static(upstream), headers={"If-None-Match": '"v1"'}))
+
+    assert response.status == 304
+    assert len(_Upstream.requests) == 1
+
+
+def test_cache_is_disabled_without_entries(upstream):
+    handler = Urllib3RequestHandler(metrics=BadgeMetrics(), rate_limiter=RateLimiter("test"), response_cache=UpstreamResponseCache(0))
+
+    handler.handle_request(Request(Url.static(upstream)))
+    handler.handle_request(Request(Url.static(upstream)))
+
+    assert len(_Upstream.requests) == 2
+
+
+@pytest.mark.parametrize(
+    "headers, fresh_at",
+    [
+        ({"Cache-Control": "max-age=60", "Age": "50"}, 9.0),
+        ({"Cache-Control": "max-age=10, s-maxage=60"}, 59.0),
+        ({"Expires": "Thu, 01 Jan 2026 00:01:00 GMT", "Date": "Thu, 01 Jan 2026 00:00:00 GMT"}, 59.0),
+    ],
+)
+def test_lifetime_is_taken_from_the_response_headers(clock, headers, fresh_at):
+    cache = UpstreamResponseCache(16, clock)
+    entry = cache.store("key", {"ETag": '"v1"', **headers}, b"{}")
+
+    clock.now = fresh_at
+    assert cache.is_fresh(entry)
+
+    clock.now = fresh_at + 2.0
+    assert not cache.is_fresh(entry)
+
+
+def test_revalidation_without_store_drops_the_entry(clock):
+    cache = UpstreamResponseCache(16, clock)
+    entry = cache.store("key", {"ETag": '"v1"', "Cache-Control": "max-age=10"}, b"{}")
+
+    refreshed = cache.refresh("key", entry, {"Cache-Control": "no-store"})
+
+    assert refreshed.data == b"{}"
+    assert cache.get("key") is None
+
+
+def test_age_is_not_subtracted_again_on_revalidation(clock):
+    cache = UpstreamResponseCache(16, clock)
+    entry = cache.store("key", {"ETag": '"v1"', "Cache-Control": "max-age=60", "Age": "50"}, b"{}")
+
+    assert "Age" not in entry.headers
+
+    clock.now = 20.0
+    refreshed = cache.refresh("key", entry, {"ETag": '"v1"'})
+
+    clock.now = 79.0
+    assert cache.is_fresh(refreshed)
@@ -0,0 +1,73 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from falcon_caching import Cache
+
+from meles.core import BadgeMetrics, CacheMemoryAccount, MemoryAccountant
+
+
+class _Account:
+    def __init__(self, size):
+        self.size = size
+
+    def get_memory_usage(self):
+        return 1, self.size
+
+    def evict(self, size):
+        freed = min(size, self.size)
+        self.size -= freed
+        return freed
+
+
+def test_enforce_evicts_largest_cache_first():
+    accountant = MemoryAccountant(BadgeMetrics())
+    small, large = _Account(100), _Account(1000)
+    accountant.register("small", small)
+    accountant.register("large", large)
+
+    assert accountant.enforce(limit=800) == 300
+    assert (small.size, large.size) == (100, 700)
+    assert accountant.enforce(limit=0) == 0
+
+
+def test_publish_exposes_usage_as_metrics():
+    metrics = BadgeMetrics()
+    accountant = MemoryAccountant(metrics)
+    accountant.register("badges", _Account(42))
+    accountant.publish()
+
+    value = metrics.registry.get_sample_value("meles_memory_cache_bytes", {"cache": "badges"})
+    assert value == 42
+
+
+def test_cache_account_evicts_entries_expiring_first():
+    cache = Cache(config={"CACHE_TYPE": "simple"})
+    cache.set("forever", "x" * 100, timeout=0)
+    cache.set("late", "x" * 100, timeout=600)
+    cache.set("soon", "x" * 100, timeout=60)
+    account = CacheMemoryAccount(cache)
+    entries, size = account.get_memory_usage()
+
+    assert account.is_supported
+    assert entries == 3
+    assert account.evict(1) > 0
+    assert cache.get("soon") is None
+    assert cache.get("late") is not None
+    assert cache.get("forever") is not None
@@ -0,0 +1,54 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import os
+from multiprocessing import get_context
+
+from meles.core import generate_metrics
+
+
+def _serve_badge():
+    from meles.core import SharedMetrics, register_process_cleanup
+
+    register_process_cleanup()
+    SharedMetrics.add_known_hosts(["https://api.nuget.org/v3/index.json"])
+    SharedMetrics.count_cache_result("ShieldResource", "hit")
+    with SharedMetrics.upstream("api.nuget.org") as status:
+        status.append(200)
+
+
+def test_metrics_of_all_workers_are_aggregated(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    context = get_context("spawn")
+    workers = [context.Process(target=_serve_badge) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    metrics = generate_metrics([], str(tmp_path)).decode("utf-8")
+
+    assert (
+        'meles_badge_cache_requests_total{result="hit",route="ShieldResource"} 2.0'
+        in metrics
+    )
+    assert 'meles_upstream_requests_in_flight{host="api.nuget.org"}' not in metrics
+    assert not any(name.startswith("gauge_livesum") for name in os.listdir(tmp_path))
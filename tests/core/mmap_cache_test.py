@@ -0,0 +1,140 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import os
+import pickle
+from multiprocessing import get_context
+
+import pytest
+
+from meles.core import MMAP_CACHE_TYPE, MmapCache, create_cache
+from meles.core import _mmap_cache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _store_badge(path):
+    MmapCache(path, size=64 * 1024, index_slots=64).set("child", b"<svg/>", 60)
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "badges.cache"
+
+
+def test_stores_and_expires_values(cache_path, clock):
+    cache = MmapCache(cache_path, size=64 * 1024, index_slots=64, clock=clock)
+    assert cache.set("badge", b"<svg/>", 10)
+    assert cache.set("forever", b"<svg/>", 0)
+    assert not cache.add("badge", b"<other/>")
+    assert cache.get("badge") == b"<svg/>"
+
+    clock.now += 11
+    assert cache.get("badge") is None
+    assert cache.get("forever") == b"<svg/>"
+    assert cache.delete("forever")
+    assert not cache.has("forever")
+
+
+def test_overwrites_keep_latest_value(cache_path):
+    cache = MmapCache(cache_path, size=64 * 1024, index_slots=64)
+    for index in range(5):
+        cache.set("badge", index)
+    assert cache.get("badge") == 4
+
+
+def test_is_shared_between_processes(cache_path):
+    cache = MmapCache(cache_path, size=64 * 1024, index_slots=64)
+    process = get_context("spawn").Process(target=_store_badge, args=(cache_path,))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    assert cache.get("child") == b"<svg/>"
+
+
+def test_compaction_drops_expired_entries_and_respects_size(cache_path, clock):
+    cache = MmapCache(cache_path, size=16 * 1024, index_slots=64, clock=clock)
+    cache.set("expiring", b"x" * 1024, 5)
+    cache.set("kept", b"y" * 1024, 0)
+    clock.now += 10
+    for index in range(40):
+        cache.set(f"badge-{index}", b"z" * 512, 60)
+
+    other = MmapCache(cache_path, size=16 * 1024, index_slots=64, clock=clock)
+    assert cache_path.stat().st_size == 16 * 1024
+    assert other.get("expiring") is None
+    assert other.get("kept") == b"y" * 1024
+    assert other.get("badge-39") == b"z" * 512
+
+
+def test_create_cache_uses_mmap_backend(cache_path):
+    cache = create_cache(
+        {"CACHE_TYPE": MMAP_CACHE_TYPE, "CACHE_MMAP_PATH": str(cache_path)}
+    )
+    assert isinstance(cache.cache, MmapCache)
+    assert cache.cache.path == cache_path
+
+
+def test_values_keep_their_type(cache_path):
+    cache = MmapCache(cache_path, size=64 * 1024, index_slots=64)
+    cache.set("error", (502, "failed", "text/plain"))
+    cache.set("text", "<svg/>")
+    cache.set("state", {"tokens": 1.5})
+    assert cache.get("error") == (502, "failed", "text/plain")
+    assert cache.get("text") == "<svg/>"
+    assert cache.get("state") == {"tokens": 1.5}
+    assert not cache.set("object", object())
+
+
+def test_pickled_values_are_not_loaded(cache_path, monkeypatch):
+    cache = MmapCache(cache_path, size=64 * 1024, index_slots=64)
+    monkeypatch.setattr(_mmap_cache, "_encode", pickle.dumps)
+    assert cache.set("planted", ("tuple",))
+    assert cache.get("planted") is None
+
+
+def test_files_of_others_are_not_used(cache_path):
+    MmapCache(cache_path, size=64 * 1024, index_slots=64)
+    assert cache_path.stat().st_mode & 0o777 == 0o600
+    os.chmod(cache_path, 0o666)
+    with pytest.raises(PermissionError):
+        MmapCache(cache_path, size=64 * 1024, index_slots=64).get("badge")
+
+
+def test_default_path_is_in_a_private_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(_mmap_cache, "gettempdir", lambda: str(tmp_path))
+    cache = MmapCache.from_config({}, {})
+    assert cache.path.parent == tmp_path / f"meles-{os.geteuid()}"
+    assert cache.path.parent.stat().st_mode & 0o777 == 0o700
+
+    os.chmod(cache.path.parent, 0o777)
+    with pytest.raises(PermissionError):
+        MmapCache.from_config({}, {})
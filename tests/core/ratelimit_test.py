@@ -0,0 +1,159 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import falcon
+import falcon.testing
+import pytest
+from falcon_caching import Cache
+
+from meles.core import (
+    BadgeData,
+    BadgeMetrics,
+    ClientRateLimitMiddleware,
+    ColorValues,
+    LoadSheddingError,
+    RateLimiter,
+    RefreshScheduler,
+    Request,
+    Url,
+    Urllib3RequestHandler,
+)
+from meles.resources.base import BadgeResourceBase
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("store", [None, "cache"])
+def test_buckets_are_kept_per_key(store):
+    clock = _Clock()
+    limiter = RateLimiter("test", clock=clock, wall_clock=clock)
+    limiter.configure(
+        0.5, 2, Cache(config={"CACHE_TYPE": "simple"}) if store else None
+    )
+
+    assert [limiter.try_acquire("a") for _ in range(3)] == [True, True, False]
+    assert limiter.try_acquire("b")
+    assert limiter.retry_after() == 2
+
+    clock.now = 2.0
+
+    assert limiter.try_acquire("a")
+    assert not limiter.try_acquire("a")
+
+
+def test_disabled_limiter_admits_everything():
+    limiter = RateLimiter("test")
+
+    assert not limiter.is_enabled
+    assert all(limiter.try_acquire("a") for _ in range(100))
+
+
+def test_upstream_budget_is_checked_before_requests():
+    limiter = RateLimiter("upstream")
+    limiter.configure(0.001, 1)
+    limiter.try_acquire("example.invalid")
+    handler = Urllib3RequestHandler(metrics=BadgeMetrics(), rate_limiter=limiter)
+
+    with pytest.raises(LoadSheddingError) as error:
+        handler.handle_request(Request(Url.static("https://example.invalid/a").source.to_url()))
+
+    assert error.value.reason == "upstream"
+    assert error.value.status == 503
+
+
+class _Settings:
+    client_error_ttl = 0
+    server_error_ttl = 0
+    max_in_flight = 0
+    stale_seconds = 60
+    client_rate = 0.001
+    upstream_rate = 0.0
+
+
+class _Resource(BadgeResourceBase):
+    def __init__(self, cache):
+        super().__init__(
+            cache,
+            refresh_scheduler=RefreshScheduler(),
+            negative_cache=_Settings(),
+            metrics=BadgeMetrics(),
+            admission=_Settings(),
+            rate_limit=_Settings(),
+        )
+
+    @property
+    def route_template(self):
+        return "/limited"
+
+    def _process_badge_request(self, request):
+        return BadgeData(None, "limited", request["id"], ColorValues.BLUE.value)
+
+
+def test_clients_beyond_their_budget_get_stale_badges():
+    cache = Cache(config={"CACHE_TYPE": "simple"})
+    limiter = RateLimiter("client")
+    limiter.configure(0.001, 2)
+    app = falcon.App(middleware=[ClientRateLimitMiddleware(limiter, "X-Client")])
+    resource = _Resource(cache)
+    app.add_route(resource.route_template, resource)
+    client = falcon.testing.TestClient(app)
+
+    client.simulate_get("/limited", params={"id": "1"}, headers={"X-Client": "a"})
+    cache.delete("_Resource:/limited:id=1")
+    client.simulate_get("/limited", params={"id": "2"}, headers={"X-Client": "a"})
+
+    stale = client.simulate_get("/limited", params={"id": "1"}, headers={"X-Client": "a"})
+    rejected = client.simulate_get("/limited", params={"id": "3"}, headers={"X-Client": "a"})
+    other = client.simulate_get("/limited", params={"id": "3"}, headers={"X-Client": "b"})
+
+    assert stale.status_code == 200
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "1000"
+    assert other.status_code == 200
+
+
+class _ClientResource:
+    def on_get(self, req, resp):
+        resp.text = req.context.client
+
+
+@pytest.mark.parametrize(
+    "trusted_hops, header, expected",
+    [
+        (1, "forged, 10.0.0.1", "10.0.0.1"),
+        (2, "forged, 10.0.0.1, 10.0.0.2", "10.0.0.1"),
+        (3, "10.0.0.1, 10.0.0.2", "10.0.0.1"),
+        (1, "", "127.0.0.1"),
+    ],
+)
+def test_clients_are_taken_from_trusted_hops(trusted_hops, header, expected):
+    app = falcon.App(middleware=[ClientRateLimitMiddleware(RateLimiter("client"), "X-Forwarded-For", trusted_hops)])
+    app.add_route("/client", _ClientResource())
+
+    response = falcon.testing.TestClient(app).simulate_get(
+        "/client", headers={"X-Forwarded-For": header}, remote_addr="127.0.0.1"
+    )
+
+    assert response.text == expected
@@ -0,0 +1,123 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import pytest
+from meles.core import RefreshScheduler
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Settings:
+    def __init__(self, top_n, rate=100.0):
+        self.top_n = top_n
+        self.lead_seconds = 5.0
+        self.workers = 2
+        self.rate = rate
+        self.interval = 1.0
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+def _schedule(scheduler, refreshed, key, hits, timeout=10):
+    for _ in range(hits):
+        scheduler.record_access(key)
+    scheduler.register(key, timeout, lambda: refreshed.append(key))
+
+
+def test_disabled_scheduler_ignores_entries(clock):
+    refreshed = []
+    scheduler = RefreshScheduler(clock)
+    scheduler.start(_Settings(top_n=0), background=False)
+    _schedule(scheduler, refreshed, "a", 5)
+    clock.now += 8
+    scheduler.run_pending()
+    assert not scheduler.is_running
+    assert refreshed == []
+
+
+def test_only_entries_close_to_expiry_are_refreshed(clock):
+    refreshed = []
+    scheduler = RefreshScheduler(clock)
+    scheduler.start(_Settings(top_n=5), background=False)
+    _schedule(scheduler, refreshed, "soon", 1, timeout=10)
+    _schedule(scheduler, refreshed, "later", 1, timeout=60)
+    clock.now += 6
+    scheduler.run_pending()
+    scheduler.stop()
+    assert refreshed == ["soon"]
+
+
+def test_hottest_entries_are_refreshed_first(clock):
+    refreshed = []
+    scheduler = RefreshScheduler(clock)
+    scheduler.start(_Settings(top_n=2), background=False)
+    _schedule(scheduler, refreshed, "cold", 1)
+    _schedule(scheduler, refreshed, "warm", 5)
+    _schedule(scheduler, refreshed, "hot", 10)
+    clock.now += 6
+    scheduler.run_pending()
+    scheduler.stop()
+    assert sorted(refreshed) == ["hot", "warm"]
+
+
+def test_unrequested_entries_are_not_refreshed(clock):
+    refreshed = []
+    scheduler = RefreshScheduler(clock)
+    scheduler.start(_Settings(top_n=2), background=False)
+    _schedule(scheduler, refreshed, "unused", 0)
+    clock.now += 6
+    scheduler.run_pending()
+    scheduler.stop()
+    assert refreshed == []
+
+
+def test_budget_limits_refreshes(clock):
+    refreshed = []
+    scheduler = RefreshScheduler(clock)
+    scheduler.start(_Settings(top_n=10, rate=1.0), background=False)
+    for key in "abc":
+        _schedule(scheduler, refreshed, key, 1)
+    clock.now += 6
+    scheduler.run_pending()
+    scheduler.stop()
+    assert len(refreshed) == 1
+
+
+def test_only_the_overall_hottest_entries_are_kept(clock):
+    refreshed = []
+    scheduler = RefreshScheduler(clock)
+    scheduler.start(_Settings(top_n=1), background=False)
+    _schedule(scheduler, refreshed, "hot", 10, timeout=60)
+    _schedule(scheduler, refreshed, "cold", 1, timeout=10)
+    clock.now += 6
+    scheduler.run_pending()
+    clock.now += 50
+    scheduler.run_pending()
+    scheduler.stop()
+    assert refreshed == ["hot"]
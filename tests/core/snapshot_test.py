@@ -0,0 +1,117 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from time import time
+
+from falcon_caching import Cache
+
+from meles.core import CacheSnapshot, register_snapshot_section
+
+
+def _create_cache():
+    return Cache(config={"CACHE_TYPE": "simple"})
+
+
+class _Section:
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+
+    def dump_entries(self):
+        for key, value in self.entries.items():
+            yield key, 0.0, value
+
+    def restore_entry(self, key, expires, payload):
+        self.entries[key] = payload
+
+
+def test_snapshot_restores_cached_badges(tmp_path):
+    cache = _create_cache()
+    cache.set("badge", b"<svg/>", timeout=300)
+    cache.set("expired", b"<svg/>", timeout=300)
+    cache.cache._cache["expired"] = (time() - 1, cache.cache._cache["expired"][1])
+
+    snapshot_path = tmp_path / "cache.snapshot"
+    CacheSnapshot(snapshot_path).save(cache)
+
+    restored = _create_cache()
+    CacheSnapshot(snapshot_path).load(restored)
+
+    assert restored.get("badge") == b"<svg/>"
+    assert restored.get("expired") is None
+    assert restored.cache._cache["badge"][0] == cache.cache._cache["badge"][0]
+
+
+def test_snapshot_keeps_registered_sections(tmp_path):
+    source = _Section({"https://feed/index.json": b"document"})
+    register_snapshot_section("test-section", source)
+    snapshot_path = tmp_path / "cache.snapshot"
+    CacheSnapshot(snapshot_path).save(_create_cache())
+
+    target = _Section()
+    register_snapshot_section("test-section", target)
+    assert CacheSnapshot(snapshot_path).load(_create_cache()) >= 1
+
+    assert bytes(target.entries["https://feed/index.json"]) == b"document"
+
+
+def test_missing_or_foreign_snapshot_is_ignored(tmp_path):
+    snapshot_path = tmp_path / "cache.snapshot"
+    assert CacheSnapshot(snapshot_path).load(_create_cache()) == 0
+
+    snapshot_path.write_bytes(b"not a snapshot at all")
+    assert CacheSnapshot(snapshot_path).load(_create_cache()) == 0
+
+
+def test_snapshot_merges_entries_of_other_workers(tmp_path):
+    snapshot_path = tmp_path / "cache.snapshot"
+    first, second = _create_cache(), _create_cache()
+    first.set("first", b"<svg>1</svg>", timeout=300)
+    second.set("second", b"<svg>2</svg>", timeout=300)
+    second.set("shared", b"<svg>new</svg>", timeout=300)
+    first.set("shared", b"<svg>old</svg>", timeout=300)
+
+    CacheSnapshot(snapshot_path).save(first)
+    CacheSnapshot(snapshot_path).save(second)
+
+    restored = _create_cache()
+    CacheSnapshot(snapshot_path).load(restored)
+
+    assert restored.get("first") == b"<svg>1</svg>"
+    assert restored.get("second") == b"<svg>2</svg>"
+    assert restored.get("shared") == b"<svg>new</svg>"
+
+
+def test_nuget_documents_keep_their_expiry(tmp_path):
+    from meles.sources.nuget import _ConditionalDocumentStore, _StoredDocument
+
+    now = [1000.0]
+    source = _ConditionalDocumentStore(max_age=60, clock=lambda: now[0])
+    source.put("https://feed/index.json", _StoredDocument('"v1"', None, {"resources": []}))
+
+    [(url, expires, payload)] = list(source.dump_entries())
+    assert expires == 1060.0
+
+    target = _ConditionalDocumentStore(max_age=60, clock=lambda: now[0])
+    target.restore_entry(url, expires, memoryview(payload))
+    assert target.get(url).content == {"resources": []}
+
+    now[0] = 1061.0
+    assert target.get(url) is None
+    assert list(source.dump_entries()) == []
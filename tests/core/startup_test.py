@@ -0,0 +1,65 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import subprocess
+import sys
+
+from meles.core import measure_startup
+from meles.core._startup import parse_import_times
+
+# Generous enough for slow CI runners. Boot currently takes about 0.3s.
+STARTUP_BUDGET_SECONDS: float = 2.0
+
+
+def test_startup_within_budget():
+    report = measure_startup()
+
+    assert report.total_seconds < STARTUP_BUDGET_SECONDS, report.format()
+
+
+def test_startup_defers_heavy_imports():
+    lazy_modules = ["pybadges", "jinja2", "yaml", "jsonpath", "simpleicons.all"]
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; import meles.wsgi; "
+            f"print([m for m in {lazy_modules!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert completed.stdout.strip() == "[]"
+
+
+def test_parse_import_times():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   meles.core._log",
+        "import time:      2000 |       2120 | meles.core",
+        "unrelated output",
+    ]
+
+    imports = parse_import_times(lines)
+
+    assert [i.module for i in imports] == ["meles.core._log", "meles.core"]
+    assert imports[1].cumulative_seconds == 0.00212
+    assert imports[0].package == "meles"
@@ -0,0 +1,110 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+from threading import Event, Thread
+
+import falcon
+import falcon.testing
+from falcon_caching import Cache
+
+from meles.core import (
+    AdmissionController,
+    AdmissionMiddleware,
+    BadgeData,
+    BadgeMetrics,
+    ColorValues,
+    RefreshScheduler,
+)
+from meles.resources.base import BadgeResourceBase
+
+
+class _Settings:
+    max_in_flight = 1
+    stale_seconds = 60
+
+
+class _NegativeCache:
+    client_error_ttl = 0
+    server_error_ttl = 0
+
+
+class _SlowResource(BadgeResourceBase):
+    def __init__(self, cache, metrics):
+        super().__init__(
+            cache,
+            refresh_scheduler=RefreshScheduler(),
+            negative_cache=_NegativeCache(),
+            metrics=metrics,
+            admission=_Settings(),
+        )
+        self.started = Event()
+        self.release = Event()
+
+    @property
+    def route_template(self):
+        return "/slow"
+
+    def _process_badge_request(self, request):
+        if request.get("block"):
+            self.started.set()
+            self.release.wait(5)
+        return BadgeData(None, "slow", request["id"], ColorValues.BLUE.value)
+
+
+def test_misses_beyond_the_limit_are_shed():
+    cache = Cache(config={"CACHE_TYPE": "simple"})
+    metrics = BadgeMetrics()
+    resource = _SlowResource(cache, metrics)
+    app = falcon.App(middleware=[AdmissionMiddleware(AdmissionController(1))])
+    app.add_route(resource.route_template, resource)
+    client = falcon.testing.TestClient(app)
+
+    client.simulate_get("/slow", params={"id": "stale"})
+    client.simulate_get("/slow", params={"id": "hit"})
+    cache.delete("_SlowResource:/slow:id=stale")
+
+    blocked = Thread(
+        target=client.simulate_get, args=("/slow",), kwargs={"params": {"id": "slow", "block": "1"}}
+    )
+    blocked.start()
+    try:
+        assert resource.started.wait(5)
+
+        hit = client.simulate_get("/slow", params={"id": "hit"})
+        stale = client.simulate_get("/slow", params={"id": "stale"})
+        rejected = client.simulate_get("/slow", params={"id": "new"})
+    finally:
+        resource.release.set()
+        blocked.join()
+
+    assert hit.status_code == 200
+    assert stale.status_code == 200
+    assert "stale" in stale.text
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+    for result in ("stale", "rejected"):
+        assert metrics.registry.get_sample_value(
+            "meles_badge_shed_requests_total",
+            {"route": "_SlowResource", "reason": "admission", "result": result},
+        ) == 1
+    for result, count in (("hit", 1), ("miss", 4), ("stale", 1)):
+        assert metrics.registry.get_sample_value(
+            "meles_badge_cache_requests_total",
+            {"route": "_SlowResource", "result": result},
+        ) == count
@@ -0,0 +1,311 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+import asyncio
+from threading import Event
+from time import sleep
+
+import falcon
+import falcon.testing
+import pytest
+from falcon_caching import Cache
+
+from meles.core import (
+    AsyncRequestHandler,
+    BackgroundLoop,
+    BadgeMetrics,
+    ColorValues,
+    DeadlineMiddleware,
+    Request,
+    RequestHandler,
+    Response,
+    Url,
+    current_deadline,
+)
+from meles.resources.custom import CustomBackendBadgeResource
+from meles.sources.custom.base import AsyncCustomBackendSource, CustomBackendSource
+
+
+class _Settings:
+    timeout = 0.2
+    max_concurrency = 1
+    queue_depth = 0
+
+
+class _Backend(CustomBackendSource):
+    def __init__(self):
+        self.release = Event()
+        self.blocking = False
+
+    @property
+    def default_color(self):
+        return ColorValues.BLUE.value
+
+    @property
+    def name(self):
+        return "slow"
+
+    @property
+    def label(self):
+        return "slow"
+
+    def process(self, request):
+        if self.blocking:
+            self.release.wait(5)
+        if request.get("fail"):
+            raise KeyError("fail")
+        return "done"
+
+
+@pytest.fixture
+def backend():
+    backend = _Backend()
+    yield backend
+    backend.release.set()
+
+
+@pytest.fixture
+def metrics():
+    return BadgeMetrics()
+
+
+@pytest.fixture
+def client(backend, metrics):
+    resource = CustomBackendBadgeResource(
+        {"slow": backend},
+        Cache(config={"CACHE_TYPE": "null"}),
+        settings=_Settings(),
+        metrics=metrics,
+    )
+    app = falcon.App()
+    app.add_route(resource.route_template, resource)
+    return falcon.testing.TestClient(app)
+
+
+def _count(metrics, result):
+    return metrics.registry.get_sample_value(
+        "meles_custom_backend_calls_total", {"backend": "slow", "result": result}
+    )
+
+
+def test_backend_result_is_rendered(client, metrics):
+    response = client.simulate_get("/custom/backend/slow")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "image/svg+xml"
+    assert "done" in response.text
+    assert _count(metrics, "ok") == 1
+
+
+def test_timeout_renders_error_badge(client, backend, metrics):
+    backend.blocking = True
+    response = client.simulate_get("/custom/backend/slow")
+
+    assert response.status_code == 504
+    assert response.headers["Content-Type"] == "image/svg+xml"
+    assert "timeout" in response.text
+    assert _count(metrics, "timeout") == 1
+
+
+def test_busy_backend_is_rejected(client, backend, metrics):
+    backend.blocking = True
+    client.simulate_get("/custom/backend/slow")
+    response = client.simulate_get("/custom/backend/slow", params={"id": "2"})
+
+    assert response.status_code == 503
+    assert "busy" in response.text
+    assert _count(metrics, "rejected") == 1
+
+
+def test_backend_errors_are_reported(client, metrics):
+    response = client.simulate_get("/custom/backend/slow", params={"fail": "1"})
+
+    assert response.status_code == 400
+    assert _count(metrics, "error") == 1
+
+
+class _SharedBackend(_Backend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    @property
+    def cache_ttl(self):
+        return 60
+
+    def cache_key(self, request):
+        return request.get("package")
+
+    def process(self, request):
+        self.calls += 1
+        return f"v{self.calls}"
+
+
+def test_results_are_shared_by_cache_key(metrics):
+    backend = _SharedBackend()
+    cache = Cache(config={"CACHE_TYPE": "simple"})
+    resource = CustomBackendBadgeResource(
+        {"slow": backend}, cache, settings=_Settings(), metrics=metrics
+    )
+    app = falcon.App()
+    app.add_route(resource.route_template, resource)
+    client = falcon.testing.TestClient(app)
+
+    responses = [
+        client.simulate_get("/custom/backend/slow", params=params)
+        for params in (
+            {"package": "a", "color": "red"},
+            {"package": "a", "color": "blue"},
+            {"package": "b"},
+        )
+    ]
+
+    assert backend.calls == 2
+    assert ["v1" in r.text for r in responses] == [True, True, False]
+    assert cache.get("backend:slow:a") == "v1"
+    assert _count(metrics, "cached") == 1
+
+
+class _AsyncBackend(AsyncCustomBackendSource):
+    def __init__(self, delay):
+        self.delay = delay
+        self.cancelled = Event()
+
+    @property
+    def default_color(self):
+        return ColorValues.BLUE.value
+
+    @property
+    def name(self):
+        return "slow"
+
+    @property
+    def label(self):
+        return "slow"
+
+    async def process(self, request):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        return "async"
+
+
+@pytest.mark.parametrize("delay, status", [(0, 200), (5, 504)])
+def test_async_backends_run_on_the_loop(metrics, delay, status):
+    backend = _AsyncBackend(delay)
+    loop = BackgroundLoop()
+    resource = CustomBackendBadgeResource(
+        {"slow": backend},
+        Cache(config={"CACHE_TYPE": "null"}),
+        settings=_Settings(),
+        metrics=metrics,
+        loop=loop,
+    )
+    app = falcon.App()
+    app.add_route(resource.route_template, resource)
+    try:
+        response = falcon.testing.TestClient(app).simulate_get("/custom/backend/slow")
+        assert response.status_code == status
+        assert ("async" in response.text) is (status == 200)
+        assert backend.cancelled.wait(1 if status == 504 else 0) is (status == 504)
+    finally:
+        loop.stop()
+
+
+class _RecordingHandler(RequestHandler):
+    def __init__(self):
+        self.deadlines = []
+
+    def handle_request(self, request):
+        self.deadlines.append((request.deadline, current_deadline()))
+        return Response(str(request.url), {}, 200, b"")
+
+
+class _RequestingBackend(_AsyncBackend):
+    def __init__(self, handler):
+        super().__init__(0)
+        self.handler = AsyncRequestHandler(handler, 1)
+
+    async def process(self, request):
+        await self.handler.handle_request(Request(Url.static("https://example.test/")))
+        return "async"
+
+
+def test_async_backends_inherit_the_deadline(metrics):
+    handler = _RecordingHandler()
+    loop = BackgroundLoop()
+    resource = CustomBackendBadgeResource(
+        {"slow": _RequestingBackend(handler)},
+        Cache(config={"CACHE_TYPE": "null"}),
+        settings=_Settings(),
+        metrics=metrics,
+        loop=loop,
+    )
+    app = falcon.App(middleware=[DeadlineMiddleware(2.0)])
+    app.add_route(resource.route_template, resource)
+    try:
+        response = falcon.testing.TestClient(app).simulate_get("/custom/backend/slow")
+    finally:
+        loop.stop()
+
+    assert response.status_code == 200
+    [(request_deadline, handler_deadline)] = handler.deadlines
+    assert request_deadline is not None
+    assert handler_deadline is request_deadline
+
+
+class _NegativeCacheConfig:
+    client_error_ttl = 60
+    server_error_ttl = 60
+    custom_backend = _Settings()
+    admission = None
+    rate_limit = None
+
+    @property
+    def negative_cache(self):
+        return self
+
+
+def test_timeouts_are_not_cached_as_errors(backend, metrics):
+    resource = CustomBackendBadgeResource(
+        {"slow": backend},
+        Cache(config={"CACHE_TYPE": "simple"}),
+        metrics=metrics,
+        cfg=_NegativeCacheConfig(),
+    )
+    app = falcon.App()
+    app.add_route(resource.route_template, resource)
+    client = falcon.testing.TestClient(app)
+
+    backend.blocking = True
+    timed_out = client.simulate_get("/custom/backend/slow")
+    backend.blocking = False
+    backend.release.set()
+    # The timed out call keeps the only worker until it returns.
+    for _ in range(50):
+        response = client.simulate_get("/custom/backend/slow")
+        if response.status_code != 503:
+            break
+        sleep(0.05)
+
+    assert timed_out.status_code == 504
+    assert response.status_code == 200
+    assert "done" in response.text
@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import falcon
+import falcon.testing
+from falcon_caching import Cache
+from prometheus_client import generate_latest
+
+from meles.core import BadgeData, BadgeMetrics, ColorValues, RefreshScheduler
+from meles.resources.base import BadgeResourceBase
+
+
+class _StaticResource(BadgeResourceBase):
+    @property
+    def route_template(self):
+        return "/static"
+
+    def _process_badge_request(self, request):
+        return BadgeData(None, "label", "text", ColorValues.GREEN.value)
+
+
+def _sample(metrics, name, **labels):
+    return metrics.registry.get_sample_value(name, labels)
+
+
+def test_stages_and_cache_results_are_recorded():
+    metrics = BadgeMetrics()
+    resource = _StaticResource(
+        Cache(config={"CACHE_TYPE": "simple"}),
+        refresh_scheduler=RefreshScheduler(),
+        metrics=metrics,
+    )
+    app = falcon.App()
+    app.add_route(resource.route_template, resource)
+    client = falcon.testing.TestClient(app)
+    for _ in range(3):
+        assert client.simulate_get("/static").status == falcon.HTTP_200
+
+    route = "_StaticResource"
+    counter = "meles_badge_cache_requests_total"
+    assert _sample(metrics, counter, route=route, result="miss") == 1
+    assert _sample(metrics, counter, route=route, result="hit") == 2
+    for stage in ("process", "render", "cache_write"):
+        count = "meles_badge_stage_seconds_count"
+        assert _sample(metrics, count, route=route, stage=stage) == 1
+    assert (
+        _sample(metrics, "meles_badge_stage_seconds_count", route=route, stage="cache_lookup")
+        == 3
+    )
+
+
+def test_upstream_requests_are_labelled_by_host_and_status():
+    metrics = BadgeMetrics()
+    metrics.add_known_hosts(["https://api.nuget.org/v3/index.json"])
+    with metrics.upstream("api.nuget.org") as status:
+        assert _sample(metrics, "meles_upstream_requests_in_flight", host="api.nuget.org") == 1
+        status.append(404)
+
+    assert _sample(metrics, "meles_upstream_requests_in_flight", host="api.nuget.org") == 0
+    assert (
+        _sample(metrics, "meles_upstream_request_seconds_count", host="api.nuget.org", status="404")
+        == 1
+    )
+    assert b"meles_upstream_request_seconds" in generate_latest(metrics.registry)
+
+
+def test_unknown_upstream_hosts_share_a_label():
+    metrics = BadgeMetrics()
+    metrics.add_known_hosts(["https://api.nuget.org/v3/index.json"])
+    for host in ("a.example", "b.example"):
+        with metrics.upstream(host) as status:
+            status.append(200)
+        metrics.count_upstream_cache(host, "miss")
+
+    assert (
+        _sample(metrics, "meles_upstream_request_seconds_count", host="other", status="200")
+        == 2
+    )
+    assert _sample(metrics, "meles_upstream_cache_requests_total", host="other", result="miss") == 2
+    assert _sample(metrics, "meles_upstream_requests_in_flight", host="a.example") is None
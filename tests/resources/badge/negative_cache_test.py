@@ -0,0 +1,141 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from http import HTTPStatus
+
+import falcon
+import falcon.testing
+import pytest
+from falcon_caching import Cache
+
+from meles.app import get_app
+from meles.core import BadgeMetrics, ProcessingError, RefreshScheduler
+from meles.resources.base import BadgeResourceBase
+
+
+class _Settings:
+    def __init__(self, client_error_ttl, server_error_ttl=0):
+        self.client_error_ttl = client_error_ttl
+        self.server_error_ttl = server_error_ttl
+
+
+class _FailingResource(BadgeResourceBase):
+    def __init__(self, status, negative_cache, cfg=None):
+        super().__init__(
+            Cache(config={"CACHE_TYPE": "simple"}),
+            refresh_scheduler=RefreshScheduler(),
+            negative_cache=negative_cache,
+            metrics=BadgeMetrics(),
+            cfg=cfg,
+        )
+        self.status = status
+        self.calls = 0
+
+    @property
+    def route_template(self):
+        return "/failing"
+
+    def _process_badge_request(self, request):
+        self.calls += 1
+        raise ProcessingError(self.status, "Package not found")
+
+
+def _get_twice(resource):
+    app = falcon.App()
+    app.add_route(resource.route_template, resource)
+    client = falcon.testing.TestClient(app)
+    return [client.simulate_get("/failing", params={"id": "gone"}) for _ in range(2)]
+
+
+@pytest.mark.parametrize(
+    "status,calls", [(HTTPStatus.NOT_FOUND, 1), (HTTPStatus.BAD_GATEWAY, 2)]
+)
+def test_errors_are_cached_per_status_class(status, calls):
+    resource = _FailingResource(status, _Settings(client_error_ttl=30))
+    responses = _get_twice(resource)
+
+    assert resource.calls == calls
+    assert [response.status_code for response in responses] == [status, status]
+    assert responses[0].text == responses[1].text
+    assert responses[1].headers["Content-Type"] == "text/plain"
+
+
+def test_errors_are_not_cached_when_disabled():
+    resource = _FailingResource(HTTPStatus.BAD_REQUEST, _Settings(client_error_ttl=0))
+    _get_twice(resource)
+    assert resource.calls == 2
+
+
+def configure_failing(app):
+    app.add_resource(_FailingResource(HTTPStatus.NOT_FOUND, None, app.config))
+
+
+@pytest.fixture
+def environment(monkeypatch):
+    from meles.core import config
+
+    monkeypatch.setenv("MELES_CONFIGURATION_MODULE", f"{__name__}:configure_failing")
+    monkeypatch.setenv("MELES_NEGATIVE_CACHE_CLIENT_ERROR_TTL", "30")
+    monkeypatch.setenv("MELES_MEMORY_CHECK_INTERVAL", "0")
+    yield
+    monkeypatch.undo()
+    config.reload()
+
+
+def test_resources_use_the_configuration_of_the_app(environment):
+    app = get_app(cache=Cache(config={"CACHE_TYPE": "simple"}))
+    resource = next(r for r in app.resources if isinstance(r, _FailingResource))
+    client = falcon.testing.TestClient(app)
+
+    client.simulate_get("/failing", params={"id": "gone"})
+    client.simulate_get("/failing", params={"id": "gone"})
+
+    assert resource.calls == 1
+
+
+class _FailingFamily:
+    def get_resources(self, cache, generator_class, request_handler_class, cfg=None):
+        yield _FailingResource(HTTPStatus.BAD_GATEWAY, None, cfg)
+
+
+class _FailingDynamicConfig:
+    def setup(self, app):
+        app.add_family(_FailingFamily())
+        return True
+
+
+@pytest.fixture
+def dynamic_config():
+    return _FailingDynamicConfig()
+
+
+def test_families_get_the_configuration_passed_to_the_app(config):
+    config.negative_cache.client_error_ttl = 60
+    config.negative_cache.server_error_ttl = 60
+    app = get_app(config, Cache(config={"CACHE_TYPE": "simple"}))
+    resource = next(r for r in app.resources if isinstance(r, _FailingResource))
+    client = falcon.testing.TestClient(app)
+
+    responses = [
+        client.simulate_get("/failing", params={"id": "gone"}) for _ in range(2)
+    ]
+
+    assert [response.status_code for response in responses] == [502, 502]
+    assert resource.calls == 1
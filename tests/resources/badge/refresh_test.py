@@ -0,0 +1,83 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import falcon
+import falcon.testing
+from falcon_caching import Cache
+
+from meles.core import BadgeData, BadgeMetrics, ColorValues, RefreshScheduler
+from meles.resources.base import BadgeResourceBase
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Settings:
+    top_n = 5
+    lead_seconds = 5.0
+    workers = 1
+    rate = 100.0
+    interval = 1.0
+
+
+class _RecordingResource(BadgeResourceBase):
+    def __init__(self, scheduler):
+        super().__init__(
+            Cache(config={"CACHE_TYPE": "simple"}),
+            refresh_scheduler=scheduler,
+            metrics=BadgeMetrics(),
+        )
+        self.requests = []
+
+    @property
+    def route_template(self):
+        return "/recorded/{name}"
+
+    def _process_badge_request(self, request):
+        self.requests.append(request)
+        return BadgeData(None, "recorded", request["name"], ColorValues.BLUE.value)
+
+
+def test_refreshes_only_keep_the_query_and_route():
+    clock = _Clock()
+    scheduler = RefreshScheduler(clock)
+    scheduler.start(_Settings(), background=False)
+    resource = _RecordingResource(scheduler)
+    app = falcon.App()
+    app.add_route(resource.route_template, resource)
+    client = falcon.testing.TestClient(app)
+
+    client.simulate_get(
+        "/recorded/a",
+        params={"id": "1", "cacheSeconds": "10"},
+        headers={"Authorization": "secret"},
+    )
+    clock.now += 6
+    scheduler.run_pending()
+    scheduler.stop()
+
+    assert len(resource.requests) == 2
+    assert "AUTHORIZATION" in resource.requests[0]
+    assert resource.requests[1] == {"id": "1", "name": "a"}
@@ -0,0 +1,51 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import falcon
+import pytest
+
+_TOKEN = {"X-Meles-Debug-Token": "secret"}
+
+
+@pytest.fixture
+def config(config):
+    config.debug.token = "secret"
+    yield config
+    config.debug.token = None
+
+
+def test_memory_requires_token(client):
+    assert client.get("/debug/memory").status == falcon.HTTP_401
+
+
+def test_memory_reports_caches_and_gc(client):
+    response = client.get("/debug/memory", headers=_TOKEN)
+    assert response.status == falcon.HTTP_200
+    report = response.json
+    assert "icons" in report["caches"]
+    assert "nuget-documents" in report["caches"]
+    assert len(report["gc"]["counts"]) == 3
+    assert "tracemalloc" not in report
+
+
+def test_memory_reports_top_allocators(client):
+    response = client.get("/debug/memory?tracemalloc=5&seconds=1", headers=_TOKEN)
+    assert response.status == falcon.HTTP_200
+    assert len(response.json["tracemalloc"]) <= 5
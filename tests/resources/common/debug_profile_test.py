@@ -0,0 +1,94 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+
+import falcon
+import falcon.testing
+import pytest
+
+_TOKEN = {"X-Meles-Debug-Token": "secret"}
+
+
+@pytest.fixture
+def config(config):
+    config.debug.token = "secret"
+    yield config
+    config.debug.token = None
+
+
+def test_profile_requires_token(client):
+    assert client.get("/debug/profile").status == falcon.HTTP_401
+    response = client.get("/debug/profile", headers={"X-Meles-Debug-Token": "wrong"})
+    assert response.status == falcon.HTTP_401
+
+
+def test_profile_samples_threads(client):
+    response = client.get("/debug/profile?seconds=1", headers=_TOKEN)
+    assert response.status == falcon.HTTP_200
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in response.body.splitlines())
+
+
+def test_profile_next_requests(client):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        profile = executor.submit(
+            client.get,
+            "/debug/profile?requests=2",
+            headers={"Authorization": "Bearer secret"},
+        )
+        while not profile.done():
+            client.get("/health")
+            sleep(0.01)
+
+    response = profile.result()
+    assert response.status == falcon.HTTP_200
+    assert response.body.startswith("Profiled requests: 2")
+    assert "cumulative" in response.body
+
+
+def test_profile_rejects_invalid_parameters(client):
+    response = client.get("/debug/profile?seconds=soon", headers=_TOKEN)
+    assert response.status == falcon.HTTP_400
+
+
+class _SlowResource:
+    def on_get(self, req, resp):
+        sleep(0.05)
+        resp.text = "done"
+
+
+def test_profile_skips_concurrent_requests():
+    from meles.resources.debug import RequestProfiler
+
+    profiler = RequestProfiler()
+    app = falcon.App(middleware=[profiler])
+    app.add_route("/slow", _SlowResource())
+    slow_client = falcon.testing.TestClient(app)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        profile = executor.submit(profiler.profile, 2, 5.0)
+        sleep(0.01)
+        responses = list(executor.map(lambda _: slow_client.simulate_get("/slow"), range(8)))
+        stats, profiled = profile.result()
+
+    assert [response.status_code for response in responses] == [200] * 8
+    assert profiled == 2
+    assert stats is not None
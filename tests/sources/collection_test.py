@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from importlib.metadata import EntryPoint
+from pkgutil import ModuleInfo
+
+from meles.sources import base, custom
+from meles.sources.base import SourcesCollection
+from meles.sources.custom.base import CustomBackendSource
+
+
+def test_abstract_sources_are_skipped():
+    assert SourcesCollection(custom).get_sources(type_to_bind=CustomBackendSource) == {}
+
+
+class _FakeBackend(CustomBackendSource):
+    instances = 0
+
+    def __init__(self):
+        _FakeBackend.instances += 1
+
+    @property
+    def default_color(self):
+        return None
+
+    @property
+    def name(self):
+        return "fake"
+
+    @property
+    def label(self):
+        return "fake"
+
+    def process(self, request):
+        return "fake"
+
+
+def test_entry_points_are_instantiated_on_first_use(monkeypatch):
+    entry_points = [
+        EntryPoint("fake", f"{__name__}:_FakeBackend", "meles.backends"),
+        EntryPoint("broken", f"{__name__}:_missing", "meles.backends"),
+    ]
+    monkeypatch.setattr(base, "entry_points", lambda group: entry_points)
+    _FakeBackend.instances = 0
+    collection = SourcesCollection(custom, "meles.backends")
+
+    sources = collection.get_sources(type_to_bind=CustomBackendSource)
+
+    assert sorted(sources) == ["broken", "fake"]
+    assert "fake" in sources
+    assert _FakeBackend.instances == 0
+    assert sources["fake"] is sources["fake"]
+    assert _FakeBackend.instances == 1
+    assert sources.get("broken") is None
+    assert collection.get_sources(type_to_bind=CustomBackendSource) is sources
+
+
+class _NamedBackend(_FakeBackend):
+    name = "named"
+
+
+def test_module_sources_are_instantiated_on_first_use(monkeypatch):
+    monkeypatch.setattr(base, "iter_modules", lambda path, prefix: [ModuleInfo(None, __name__, False)])
+    _FakeBackend.instances = 0
+    collection = SourcesCollection(custom)
+
+    sources = collection.get_sources(type_to_bind=CustomBackendSource)
+
+    assert sorted(sources) == ["_FakeBackend", "named"]
+    assert _FakeBackend.instances == 0
+    assert isinstance(sources["named"], _NamedBackend)
+    assert _FakeBackend.instances == 1
@@ -0,0 +1,98 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from meles.core import ProcessingError, Response, Url
+from meles.sources.nuget import (
+    LatestPackageDownloadsNugetV3Source,
+    NuGetV3PackageRecord,
+    NuGetV3PackageSearch,
+    NuGetV3SearchBatcher,
+)
+
+
+def _response(*names):
+    return NuGetV3PackageSearch(
+        len(names), [NuGetV3PackageRecord(n, []) for n in names]
+    )
+
+
+class _Fetcher:
+    def __init__(self, known):
+        self.queries = []
+        self.__known = known
+
+    def __call__(self, names):
+        self.queries.append(list(names))
+        return _response(*[n for n in names if n in self.__known])
+
+
+def test_single_lookup():
+    fetcher = _Fetcher({"Foo"})
+    batcher = NuGetV3SearchBatcher(window=0)
+    response = batcher.search("feed", "Foo", fetcher)
+    assert fetcher.queries == [["Foo"]]
+    assert response.find("foo").id == "Foo"
+
+
+def test_concurrent_lookups_are_combined():
+    names = [f"Package{i}" for i in range(5)]
+    fetcher = _Fetcher(set(names))
+    batcher = NuGetV3SearchBatcher(window=0.2)
+    with ThreadPoolExecutor(len(names)) as pool:
+        results = list(pool.map(lambda n: batcher.search("feed", n, fetcher), names))
+
+    assert len(fetcher.queries) == 1
+    assert sorted(fetcher.queries[0]) == sorted(names)
+    assert all(len(r.packages) == len(names) for r in results)
+
+
+def test_missing_batch_member_falls_back_to_plain_query():
+    fetcher = _Fetcher({"Known"})
+    batcher = NuGetV3SearchBatcher(window=0.2)
+    with ThreadPoolExecutor(2) as pool:
+        futures = [
+            pool.submit(batcher.search, "feed", n, fetcher) for n in ("Known", "Other")
+        ]
+        [f.result() for f in futures]
+
+    assert ["Other"] in fetcher.queries
+
+
+def test_errors_are_fanned_out():
+    def _fail(names):
+        raise ProcessingError(502, "upstream failed")
+
+    batcher = NuGetV3SearchBatcher(window=0)
+    with pytest.raises(ProcessingError):
+        batcher.search("feed", "Foo", _fail)
+
+
+def test_failed_search_is_reported_as_bad_gateway():
+    source = LatestPackageDownloadsNugetV3Source(
+        Url.static("https://feed.test/index.json").source
+    )
+    with pytest.raises(ProcessingError) as err:
+        source._parse_nuget_v3_package_search(
+            Response("https://feed.test/query", {}, 503, b"busy"), ["A"]
+        )
+    assert err.value.status == 502
@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+from threading import Barrier
+
+import pytest
+from meles.core import ProcessingError, RequestHandler, Response, Url
+from meles.sources.nuget import LatestPackageVersionNugetV3Source, NuGetV3SearchBatcher
+
+_FEED = "https://feed.test/{kind}/index.json"
+
+
+class _FeedHandler(RequestHandler):
+    def __init__(self, kind, documents, other_kinds=()):
+        self.requests = []
+        self.kind = kind
+        self.__documents = documents
+        self.__kinds = [kind, *other_kinds]
+
+    def handle_request(self, request):
+        url = str(request.url)
+        self.requests.append((url, dict(request.headers or {})))
+        if url == _FEED.format(kind=self.kind):
+            return self.__json(url, {"resources": [{"@id": "https://feed.test/" + kind + "/", "@type": kind} for kind in self.__kinds]})
+        if url not in self.__documents:
+            return Response(url, {}, 404, b"")
+        if (request.headers or {}).get("If-None-Match") == '"v1"':
+            return Response(url, {"ETag": '"v1"'}, 304, b"")
+        return self.__json(url, self.__documents[url])
+
+    @staticmethod
+    def __json(url, document):
+        return Response(url, {"ETag": '"v1"', "Content-Type": "application/json"}, 200, json.dumps(document).encode())
+
+
+def _source(handler):
+    return LatestPackageVersionNugetV3Source(
+        Url.static(_FEED.format(kind=handler.kind)).source,
+        lambda: handler,
+        NuGetV3SearchBatcher(window=0),
+    )
+
+
+@pytest.fixture
+def flat_container():
+    handler = _FeedHandler("PackageBaseAddress/3.0.0", {
+        "https://feed.test/PackageBaseAddress/3.0.0/flat.pkg/index.json": {"versions": ["1.0.0", "1.1.0", "2.0.0-rc.1"]},
+    })
+    return handler
+
+
+@pytest.fixture
+def registration():
+    handler = _FeedHandler("RegistrationsBaseUrl/3.6.0", {
+        "https://feed.test/RegistrationsBaseUrl/3.6.0/reg.pkg/index.json": {"items": [
+            {"@id": "https://feed.test/page/1", "items": [
+                {"catalogEntry": {"version": "1.0.0", "listed": True}},
+                {"catalogEntry": {"version": "3.0.0", "listed": False}},
+            ]},
+            {"@id": "https://feed.test/page/2"},
+        ]},
+        "https://feed.test/page/2": {"items": [{"catalogEntry": {"version": "2.0.0"}}]},
+    })
+    return handler
+
+
+def test_flat_container_stable(flat_container):
+    badge = _source(flat_container).get_data({"packageName": "Flat.Pkg"})
+    assert badge.text == "1.1.0"
+
+
+def test_flat_container_pre_release(flat_container):
+    badge = _source(flat_container).get_data({"packageName": "Flat.Pkg"}, pre_release=True)
+    assert badge.text == "2.0.0-rc.1"
+
+
+def test_flat_container_revalidates(flat_container):
+    source = _source(flat_container)
+    source.get_data({"packageName": "Flat.Pkg"})
+    source.get_data({"packageName": "Flat.Pkg"})
+    headers = [h for u, h in flat_container.requests if u.endswith("flat.pkg/index.json")]
+    assert headers[-1].get("If-None-Match") == '"v1"'
+
+
+def test_flat_container_not_found(flat_container):
+    with pytest.raises(ProcessingError) as err:
+        _source(flat_container).get_data({"packageName": "Missing"})
+    assert err.value.status == 404
+
+
+def test_registration_skips_unlisted_and_loads_pages(registration):
+    badge = _source(registration).get_data({"packageName": "Reg.Pkg"})
+    assert badge.text == "2.0.0"
+
+
+def test_registration_is_preferred_over_flat_container():
+    handler = _FeedHandler("PackageBaseAddress/3.0.0", {
+        "https://feed.test/PackageBaseAddress/3.0.0/both.pkg/index.json": {"versions": ["1.0.0", "3.0.0"]},
+        "https://feed.test/RegistrationsBaseUrl/3.6.0/both.pkg/index.json": {"items": [{"@id": "https://feed.test/page/1", "items": [
+            {"catalogEntry": {"version": "1.0.0"}},
+            {"catalogEntry": {"version": "3.0.0", "listed": False}},
+        ]}]},
+    }, ["RegistrationsBaseUrl/3.6.0"])
+
+    badge = _source(handler).get_data({"packageName": "Both.Pkg"})
+
+    assert badge.text == "1.0.0"
+
+
+def test_services_are_ordered_by_revision(flat_container):
+    resources = [
+        {"@id": "3.6.0", "@type": "RegistrationsBaseUrl/3.6.0"},
+        {"@id": "none", "@type": "RegistrationsBaseUrl"},
+        {"@id": "versioned", "@type": "RegistrationsBaseUrl/Versioned"},
+        {"@id": "3.10.0", "@type": "RegistrationsBaseUrl/3.10.0"},
+    ]
+
+    services = _source(flat_container)._find_services(resources, "RegistrationsBaseUrl")
+
+    assert services == ["3.10.0", "3.6.0", "versioned", "none"]
+
+
+def test_registration_pages_are_kept_with_the_index():
+    handler = _FeedHandler("RegistrationsBaseUrl/3.6.0", {
+        "https://feed.test/RegistrationsBaseUrl/3.6.0/kept.pkg/index.json": {"items": [{"@id": "https://feed.test/kept/1"}]},
+        "https://feed.test/kept/1": {"items": [{"catalogEntry": {"version": "1.0.0"}}]},
+    })
+    source = _source(handler)
+
+    source.get_data({"packageName": "Kept.Pkg"})
+    badge = source.get_data({"packageName": "Kept.Pkg"})
+
+    assert badge.text == "1.0.0"
+    assert [url for url, _ in handler.requests].count("https://feed.test/kept/1") == 1
+
+
+class _ParallelPagesHandler(_FeedHandler):
+    def __init__(self, documents):
+        super().__init__("RegistrationsBaseUrl/3.6.0", documents)
+        self.barrier = Barrier(2, timeout=5)
+
+    def handle_request(self, request):
+        if "/parallel/" in str(request.url):
+            self.barrier.wait()
+        return super().handle_request(request)
+
+
+def test_registration_pages_are_loaded_in_parallel():
+    handler = _ParallelPagesHandler({
+        "https://feed.test/RegistrationsBaseUrl/3.6.0/parallel.pkg/index.json": {"items": [
+            {"@id": "https://feed.test/parallel/1"},
+            {"@id": "https://feed.test/parallel/2"},
+        ]},
+        "https://feed.test/parallel/1": {"items": [{"catalogEntry": {"version": "1.0.0"}}]},
+        "https://feed.test/parallel/2": {"items": [{"catalogEntry": {"version": "2.0.0"}}]},
+    })
+
+    badge = _source(handler).get_data({"packageName": "Parallel.Pkg"})
+
+    assert badge.text == "2.0.0"
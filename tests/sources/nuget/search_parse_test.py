@@ -0,0 +1,46 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from meles.sources.nuget import NuGetV3PackageSearch, NuGetV3SearchResponse
+
+_DOCUMENT = {
+    "totalHits": 2,
+    "data": [
+        {"id": "Foo", "version": "1.0.0", "description": "x", "versions": [{"@id": "u", "version": "1.0.0", "downloads": 7}]},
+        {"id": "Bar", "version": "2.0.0", "versions": [{"@id": "v", "version": "2.0.0", "downloads": 1}]},
+    ],
+}
+
+
+def test_lean_parse_skips_other_packages():
+    search = NuGetV3PackageSearch.parse(_DOCUMENT, ["foo"])
+    assert search.find("Bar") is None
+
+
+def test_lean_parse_keeps_versions_and_downloads():
+    search = NuGetV3PackageSearch.parse(_DOCUMENT, ["foo"])
+    assert [(v.version, v.downloads) for v in search.find("FOO").versions] == [("1.0.0", 7)]
+
+
+def test_lean_parse_matches_full_parse():
+    full = NuGetV3SearchResponse.parse(_DOCUMENT)
+    lean = NuGetV3PackageSearch.parse(_DOCUMENT, ["Foo", "Bar"])
+    for result in full.data:
+        assert [v.version for v in result.versions] == [v.version for v in lean.find(result.id).versions]
@@ -0,0 +1,67 @@
+#
+# Copyright (c) 2024 Carsten Igel.
+#
+# This file is part of meles
+# (see https://github.com/carstencodes/meles).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from meles.sources.nuget import NuGetV3PackageRecord, NuGetV3VersionRecord, parse_version
+
+
+def _package(*versions):
+    return NuGetV3PackageRecord("Foo", [NuGetV3VersionRecord(v, i) for i, v in enumerate(versions)])
+
+
+def _latest(package, *args):
+    latest = package.index.latest(*args)
+    return None if latest is None else str(latest[0])
+
+
+def test_latest_stable():
+    package = _package("1.0.0", "2.1.0", "2.0.0", "3.0.0-beta.1", "not-a-version")
+    assert _latest(package) == "2.1.0"
+
+
+def test_latest_pre_release():
+    package = _package("1.0.0", "2.1.0", "3.0.0-beta.1")
+    assert _latest(package, -1, -1, True) == "3.0.0-beta.1"
+
+
+def test_latest_by_major_and_minor():
+    package = _package("1.0.0", "1.0.5", "1.1.0", "1.2.0-rc.1", "2.0.0")
+    assert _latest(package, 1) == "1.1.0"
+    assert _latest(package, 1, 0) == "1.0.5"
+    assert _latest(package, 1, 2) is None
+    assert _latest(package, 1, 2, True) == "1.2.0-rc.1"
+
+
+def test_minor_is_ignored_without_major():
+    package = _package("1.0.0", "2.0.0")
+    assert _latest(package, -1, 0) == "2.0.0"
+
+
+def test_groups_are_sorted():
+    package = _package("1.0.10", "1.0.2", "1.1.0")
+    assert [str(v) for v, _ in package.index.groups[(1, 0)]] == ["1.0.2", "1.0.10"]
+
+
+def test_index_is_built_once():
+    package = _package("1.0.0")
+    assert package.index is package.index
+
+
+def test_parsed_versions_are_memoized():
+    assert parse_version("4.5.6") is parse_version("4.5.6")